@@ -13,10 +13,11 @@ def birth_year(age):
     x = current_year - age
     return x
 
-#used variables
-name, age = greet()
-x = birth_year(age)
+if __name__ == "__main__":
+    #used variables
+    name, age = greet()
+    x = birth_year(age)
 
-#outputs the results
-print (f"Hey {name}!\nYou are {age} years old\nYou were born in the year {x}")
+    #outputs the results
+    print (f"Hey {name}!\nYou are {age} years old\nYou were born in the year {x}")
 
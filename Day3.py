@@ -6,10 +6,6 @@ def name_checker():
     name = input(f"Hey there!\nYou are WELCOMED to ModiCybbs Age_Verifier.\nCan you tell me your names?\n")
     return name
 
-#exclaim names with expressions
-name = name_checker()
-print (f"You are astounding, {name}!.\n")
-
 #function to verify age of individuals
 def age_checker():
     while True: #ensures the program keeps asking for inputs until the user keys in the valid age
@@ -24,15 +20,35 @@ def age_checker():
             print(f"Invalid value entered") 
     return age
 
-#age variable to call the function
-age = age_checker()
-
-#conditional statements to verify what to do next
-if int(age < 18):
-    print(f"You are {age} years old, therefore ineligible to vote\n")
-
-elif int(age == 18):
-    print(f"You recently turned {age} years. You have legal rights to vote\n")
-
-else: 
-    print(f"You have lived for {age} years, go on and vote")
\ No newline at end of file
+#voting age and the eligibility categories it splits ages into
+VOTING_AGE = 18
+INELIGIBLE = "ineligible"
+NEWLY_ELIGIBLE = "newly eligible"
+ELIGIBLE = "eligible"
+
+#function to sort an age into its eligibility category
+def eligibility(age):
+    if age < VOTING_AGE:
+        return INELIGIBLE
+    elif age == VOTING_AGE:
+        return NEWLY_ELIGIBLE
+    return ELIGIBLE
+
+if __name__ == "__main__":
+    #exclaim names with expressions
+    name = name_checker()
+    print (f"You are astounding, {name}!.\n")
+
+    #age variable to call the function
+    age = age_checker()
+
+    #conditional statements to verify what to do next
+    category = eligibility(age)
+    if category == INELIGIBLE:
+        print(f"You are {age} years old, therefore ineligible to vote\n")
+
+    elif category == NEWLY_ELIGIBLE:
+        print(f"You recently turned {age} years. You have legal rights to vote\n")
+
+    else: 
+        print(f"You have lived for {age} years, go on and vote")
\ No newline at end of file
@@ -12,8 +12,10 @@ print(f"Countdown complete")
 """
 #creating the maximum variable
 count = 10
+first = count #the value the countdown starts from
+start = time.monotonic() #when the countdown started, so printing time doesnt add up as drift
 while count >= 1: #starts counting from in the loop
     print (count) 
-    time.sleep(1) #delays the time by a second
+    time.sleep(max(0, start + (first - count + 1) - time.monotonic())) #sleeps until the next whole second after start
     count -= 1 #dont stop counting when the value isnt 1
 print(f"Countdown complete")
@@ -7,17 +7,42 @@ from openpyxl.chart import PieChart, BarChart, LineChart, Reference
 from datetime import datetime, timedelta
 import os
 
+from sheet_templates import SheetTemplate
+from task_aggregates import Aggregates
+from task_events import EventLog, events_path
+from task_model import FLEXIBLE_CATEGORY, HEADERS, KPIS, plan_month, write_rows, write_updates
+from workbook_writers import Sheet, get_writer, is_path, output, with_extension
+from workbook_profiler import instrument_from_env
+
 class TaskManagerExcel:
-    def __init__(self, filename="TaskManager2025.xlsx"):
+    # Phases timed when profiling is switched on (see workbook_profiler.py)
+    profiled_phases = [
+        "create_workbook",
+        "create_yearly_dashboard",
+        "create_month_template",
+        "create_monthly_sheet",
+        "plan_month",
+        "populate_monthly_tasks",
+        "add_monthly_dashboard",
+        "save_workbook"
+    ]
+
+    def __init__(self, filename="TaskManager2025.xlsx", writer="openpyxl", fixed_tasks=None,
+                 categories=None, year=2025, flexible_blocks=3, flexible_duration="2:00"):
         self.filename = filename
+        # Backend generate_excel uses; see workbook_writers.py for the others
+        self.writer = writer
+        self.year = year
+        self.flexible_blocks = flexible_blocks
+        self.flexible_duration = flexible_duration
         self.status_options = ["Not Started", "In Progress", "Completed"]
-        self.categories = [
+        self.categories = categories or [
             "Core Learning",
             "Personal Development",
             "Essential Activities",
             "Flexible Tasks"
         ]
-        self.fixed_tasks = [
+        self.fixed_tasks = fixed_tasks or [
             ("Project work", "Core Learning", "2:00", "High"),
             ("Cybersecurity practice", "Core Learning", "2:00", "High"),
             ("Reading/revision of slides", "Core Learning", "3:00", "High"),
@@ -31,25 +56,36 @@ class TaskManagerExcel:
             ("Personal care", "Essential Activities", "1:00", "High"),
             ("Rest/break periods", "Essential Activities", "2:00", "Medium")
         ]
+        # Planned tasks per month, written to the month sheets
+        self.tasks = {}
+        # Dashboard totals over self.tasks, updated with every task change
+        self.aggregates = None
+        # Status history, appended to with every task change
+        self.events = EventLog(events_path(filename)) if is_path(filename) else None
+        instrument_from_env(self)
 
     def create_workbook(self):
         wb = Workbook()
         # Remove default sheet
         wb.remove(wb.active)
         
+        # Plan every month up front so the dashboard can report on them
+        if not self.tasks:
+            self.plan_year()
+        
         # Create yearly dashboard first
         self.create_yearly_dashboard(wb)
         
-        # Create monthly sheets
-        for month in range(1, 13):
-            self.create_monthly_sheet(wb, month)
+        # Create monthly sheets from one prepared template
+        template = SheetTemplate(wb, self.create_month_template)
+        for year, month in sorted(self.tasks):
+            self.create_monthly_sheet(wb, month, template, year)
+        template.discard()
         
         return wb
 
-    def create_monthly_sheet(self, wb, month):
-        month_name = datetime(2025, month, 1).strftime("%B")
-        ws = wb.create_sheet(month_name)
-        
+    def create_month_template(self, ws):
+        """Lay out the headers, widths and validations shared by every month"""
         # Setup headers
         headers = [
             'Date',
@@ -89,41 +125,62 @@ class TaskManagerExcel:
         progress_dv.add(f'G2:G1000')
         priority_dv.add(f'H2:H1000')
 
+    def create_monthly_sheet(self, wb, month, template=None, year=None):
+        year = year or self.year
+        month_name = datetime(year, month, 1).strftime("%B")
+        if template is None:
+            template = SheetTemplate(wb, self.create_month_template)
+            ws = template.clone(month_name)
+            template.discard()
+        else:
+            ws = template.clone(month_name)
+
         # Populate daily tasks
-        self.populate_monthly_tasks(ws, month)
+        self.populate_monthly_tasks(ws, month, year)
         
         # Add monthly dashboard
         self.add_monthly_dashboard(ws)
         
         return ws
 
-    def populate_monthly_tasks(self, ws, month):
-        current_row = 2
-        start_date = datetime(2025, month, 1)
-        end_date = (datetime(2025, month + 1, 1) if month < 12 
-                   else datetime(2026, 1, 1))
-        
-        current_date = start_date
-        while current_date < end_date:
-            # Add fixed tasks
-            for task, category, duration, priority in self.fixed_tasks:
-                ws.cell(row=current_row, column=1, value=current_date)
-                ws.cell(row=current_row, column=2, value="Fixed")
-                ws.cell(row=current_row, column=3, value=duration)
-                ws.cell(row=current_row, column=4, value=task)
-                ws.cell(row=current_row, column=5, value=category)
-                ws.cell(row=current_row, column=8, value=priority)
-                current_row += 1
-            
-            # Add flexible blocks
-            for block in range(3):
-                ws.cell(row=current_row, column=1, value=current_date)
-                ws.cell(row=current_row, column=2, value=f"Flexible Block {block + 1}")
-                ws.cell(row=current_row, column=3, value="2:00")
-                ws.cell(row=current_row, column=5, value="Flexible Tasks")
-                current_row += 1
-            
-            current_date += timedelta(days=1)
+    def plan_year(self, year=None):
+        year = year or self.year
+        return self.plan_months([(year, month) for month in range(1, 13)])
+
+    def plan_months(self, periods):
+        """Plan the given (year, month) periods, replacing any planned before"""
+        self.tasks = {(year, month): self.plan_month(month, year) for year, month in periods}
+        self.aggregates = Aggregates.build(self.tasks.values())
+        return self.tasks
+
+    def plan_month(self, month, year=None):
+        """Fixed tasks and the flexible blocks for every day of the month"""
+        flexible_category = FLEXIBLE_CATEGORY if FLEXIBLE_CATEGORY in self.categories else None
+        return plan_month(self.fixed_tasks, year or self.year, month,
+                          self.flexible_blocks, self.flexible_duration, flexible_category)
+
+    def populate_monthly_tasks(self, ws, month, year=None):
+        key = (year or self.year, month)
+        tasks = self.tasks.get(key)
+        if tasks is None:
+            tasks = self.tasks[key] = self.plan_month(month, key[0])
+        write_rows(ws, tasks)
+
+    def update_task(self, ws, month, index, status, progress=None, year=None):
+        """Change the status (and optionally progress) of a month's task and its cells"""
+        tasks = self.tasks[(year or self.year, month)]
+        old = tasks.set_status(index, status)
+        if self.aggregates is not None:
+            self.aggregates.status_changed(tasks, index, old)
+        if self.events is not None:
+            self.events.status_changed(tasks, index, old)
+        if progress is not None:
+            old = tasks.set_progress(index, progress)
+            if self.aggregates is not None:
+                self.aggregates.progress_changed(tasks, index, old)
+            if self.events is not None:
+                self.events.progress_changed(tasks, index, old)
+        write_updates(ws, tasks, [index])
 
     def add_monthly_dashboard(self, ws):
         # Add dashboard section after tasks
@@ -146,7 +203,7 @@ class TaskManagerExcel:
         ws = wb.create_sheet("Yearly Dashboard", 0)
         
         # Add title
-        ws.cell(row=1, column=1, value="2025 Task Management Dashboard")
+        ws.cell(row=1, column=1, value=f"{self.year} Task Management Dashboard")
         ws.cell(row=1, column=1).font = Font(bold=True, size=16)
         
         # Add KPI sections
@@ -158,19 +215,65 @@ class TaskManagerExcel:
             "Consistency Score"
         ]
         
-        for i, title in enumerate(kpi_titles, 2):
+        if self.aggregates is None:
+            self.aggregates = Aggregates.build(self.tasks.values())
+        kpis = self.aggregates.kpis()
+        
+        for i, (title, key) in enumerate(zip(kpi_titles, KPIS), 2):
             ws.cell(row=i, column=1, value=title)
-            ws.cell(row=i, column=2, value="0%")  # Default value
+            ws.cell(row=i, column=2, value=f"{kpis[key]:.0%}")
+        
+        # Monthly summary, kept up to date by workbook_watch.py
+        for col, header in enumerate(["Month", "Tasks", "Completed", "Completion"], 4):
+            ws.cell(row=1, column=col, value=header)
+        for row, (year, month) in enumerate(sorted(self.tasks), 2):
+            tasks, completed = self.aggregates.totals(f"{year:04d}-{month:02d}")
+            ws.cell(row=row, column=4, value=datetime(year, month, 1).strftime("%B"))
+            ws.cell(row=row, column=5, value=tasks)
+            ws.cell(row=row, column=6, value=completed)
+            ws.cell(row=row, column=7, value=f"{completed / max(tasks, 1):.0%}")
         
-        # Add yearly trend chart
+        # Add yearly trend chart, below the monthly summary
         trend_chart = LineChart()
         trend_chart.title = "Monthly Progress Trend"
-        ws.add_chart(trend_chart, "A10")
+        ws.add_chart(trend_chart, f"A{max(len(self.tasks), 12) + 3}")
+
+    def sheets(self):
+        """The month sheets as plain tables, for the workbook_writers backends"""
+        if not self.tasks:
+            self.plan_year()
+        validations = {
+            'E': self.categories,
+            'F': self.status_options,
+            'G': ["Pending", "Done"],
+            'H': ["High", "Medium", "Low"]
+        }
+        return [Sheet.from_tasks(datetime(year, month, 1).strftime("%B"), HEADERS, tasks,
+                                 widths=[15] * len(HEADERS), validations=validations)
+                for (year, month), tasks in sorted(self.tasks.items())]
+
+    def save_workbook(self, wb):
+        with output(self.filename) as f:
+            wb.save(f)
+        if self.aggregates is not None and is_path(self.filename):
+            self.aggregates.save(self.filename)
+
+    def export(self, target=None, writer=None):
+        """Write the month sheets with a workbook_writers backend instead of the full workbook"""
+        writer = get_writer(writer or self.writer)
+        target = with_extension(target or self.filename, writer.extension)
+        writer.write(self.sheets(), target)
+        return target
 
     def generate_excel(self):
-        wb = self.create_workbook()
-        wb.save(self.filename)
-        print(f"Task management Excel file created: {self.filename}")
+        if self.writer == "openpyxl":
+            wb = self.create_workbook()
+            self.save_workbook(wb)
+            target = self.filename
+        else:
+            target = self.export()
+        if is_path(target):
+            print(f"Task management Excel file created: {target}")
 
 if __name__ == "__main__":
     task_manager = TaskManagerExcel()
@@ -1,7 +1,10 @@
 import math
-from typing import List, Union, Dict, Callable
+from typing import List, Union, Dict, Callable, Optional
 from enum import Enum
 
+from calculator_cache import ResultCache, cache_from_env
+from calculator_cost import DEFAULT_MAX_POWER_BITS, guarded_power
+
 class Operation(Enum):
     SUM = ('1', 'sum', 'add')
     SUBTRACT = ('2', 'subtract', 'sub')
@@ -17,7 +20,12 @@ class Operation(Enum):
     LOG = ('12', 'log', 'logarithm')
 
 class Calculator:
-    def __init__(self):
+    def __init__(self, max_power_bits: float = DEFAULT_MAX_POWER_BITS, on_overflow: str = "log",
+                 cache: Optional[ResultCache] = None):
+        self.max_power_bits = max_power_bits
+        self.on_overflow = on_overflow
+        # Optional on-disk store of factorial, power and log results
+        self.cache = cache
         self.operations: Dict[Operation, Callable] = {
             Operation.SUM: self.sum_numbers,
             Operation.SUBTRACT: self.subtract_numbers,
@@ -34,7 +42,7 @@ class Calculator:
         }
         
         self.operation_requirements = {
-            Operation.POWER: 2,
+            Operation.POWER: (2, 3),
             Operation.SQRT: 1,
             Operation.MODULUS: 2,
             Operation.FACTORIAL: 1,
@@ -47,7 +55,11 @@ class Calculator:
             return "Error: No numbers provided."
             
         required_count = self.operation_requirements.get(operation)
-        if required_count and len(numbers) != required_count:
+        if isinstance(required_count, tuple):
+            if len(numbers) not in required_count:
+                counts = " or ".join(str(count) for count in required_count)
+                return f"Error: {operation.name.lower()} operation requires {counts} numbers."
+        elif required_count and len(numbers) != required_count:
             return f"Error: {operation.name.lower()} operation requires exactly {required_count} number(s)."
             
         return ""
@@ -81,8 +93,9 @@ class Calculator:
     def min_number(self, numbers: List[float]) -> float:
         return min(numbers)
 
-    def power_numbers(self, numbers: List[float]) -> float:
-        return numbers[0] ** numbers[1]
+    def power_numbers(self, numbers: List[float]) -> Union[float, str]:
+        """Raise the first number to the second, modulo the optional third."""
+        return guarded_power(*numbers, max_bits=self.max_power_bits, on_overflow=self.on_overflow)
 
     def sqrt_number(self, numbers: List[float]) -> Union[float, str]:
         if numbers[0] < 0:
@@ -104,6 +117,14 @@ class Calculator:
             return "Error: Cannot calculate logarithm of non-positive number."
         return math.log(numbers[0])
 
+    def calculate(self, numbers: List[float], operation: Operation):
+        """Run an operation, reusing a cached result when there is one."""
+        func = self.operations[operation]
+        if self.cache is None:
+            return func(numbers)
+        return self.cache.calculate(operation.value[1], numbers, lambda: func(numbers),
+                                    context=f"{self.max_power_bits!r}:{self.on_overflow}")
+
     def get_operation(self, user_input: str) -> Union[Operation, None]:
         """Match user input to an operation."""
         user_input = user_input.lower().strip()
@@ -113,7 +134,7 @@ class Calculator:
         return None
 
 def main():
-    calculator = Calculator()
+    calculator = Calculator(cache=cache_from_env())
     
     print("Welcome to the Multi-Calculator!")
     print("\nAvailable operations:")
@@ -140,7 +161,7 @@ def main():
             return
 
         # Perform calculation
-        result = calculator.operations[operation](numbers)
+        result = calculator.calculate(numbers, operation)
         print(f"\nResult: {result}")
 
     except ValueError as e:
@@ -1,7 +1,9 @@
 import math
 
+from calculator_cost import DEFAULT_MAX_POWER_BITS, guarded_power
+
 # Function to perform calculations
-def perform_calculations(numbers, operation):
+def perform_calculations(numbers, operation, max_power_bits=DEFAULT_MAX_POWER_BITS, on_overflow="log"):
     try:
         if operation == "sum":
             result = sum(numbers)
@@ -26,9 +28,10 @@ def perform_calculations(numbers, operation):
         elif operation == "min":
             result = min(numbers)
         elif operation == "power":
-            if len(numbers) != 2:
-                return "Error: Power operation requires exactly two numbers."
-            result = numbers[0] ** numbers[1]
+            if len(numbers) not in (2, 3):
+                return "Error: Power operation requires two numbers (three with a modulus)."
+            # Size is checked before computing; a third number is a modulus
+            result = guarded_power(*numbers, max_bits=max_power_bits, on_overflow=on_overflow)
         elif operation == "sqrt":
             if len(numbers) != 1:
                 return "Error: Square root operation requires exactly one number."
@@ -70,7 +73,7 @@ def main():
         print("5. average - Calculate the average of the numbers")
         print("6. max - Find the maximum number")
         print("7. min - Find the minimum number")
-        print("8. power - Raise the first number to the power of the second")
+        print("8. power - Raise the first number to the power of the second (optional third: modulus)")
         print("9. sqrt - Find the square root (only one number allowed)")
         print("10. modulus - Find the remainder of division (requires two numbers)")
         print("11. factorial - Calculate the factorial (only one number allowed)")
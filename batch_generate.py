@@ -0,0 +1,204 @@
+"""Generate a workbook for every plan file in a directory.
+
+Each person on the team has a JSON plan, named after them:
+
+    {
+        "generator": "progress",            # or "enhanced"
+        "year": 2026,
+        "categories": ["Core Learning", "Essential Activities", "Flexible Tasks"],
+        "fixed_tasks": [
+            ["Project work", "Core Learning", "2:00", "High"],
+            {"task": "Sleep", "category": "Essential Activities",
+             "duration": "7:00", "priority": "High"}
+        ],
+        "flexible_blocks": 2,
+        "flexible_duration": "1:30",
+        "filename": "alice_2026.xlsx"        # optional, default <plan name>.xlsx
+    }
+
+Everything except fixed_tasks is optional and falls back to the
+generator's defaults. Workbooks are built in a process pool. Each worker
+loads the generator classes once and keeps them for every plan it is
+given, as the imports (pandas, openpyxl, numpy) cost about as much as
+building a workbook.
+"""
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+from task_model import duration_minutes
+
+GENERATORS = ("progress", "enhanced")
+
+PLAN_KEYS = {"generator", "year", "categories", "fixed_tasks", "flexible_blocks",
+             "flexible_duration", "filename"}
+
+# Generator classes loaded in this process, by name
+_classes: Dict[str, type] = {}
+
+
+def generator_class(name: str) -> type:
+    """The manager class for a generator, imported once per process."""
+    if name not in _classes:
+        if name == "progress":
+            from benchmark_generators import load_progress_checker
+            _classes[name] = load_progress_checker().TaskManagerExcel
+        elif name == "enhanced":
+            from enhanced_routine_checker import EnhancedTaskManager
+            _classes[name] = EnhancedTaskManager
+        else:
+            raise ValueError(f"unknown generator {name!r}; use one of {', '.join(GENERATORS)}")
+    return _classes[name]
+
+
+# First dashboard label of each generator's Yearly Dashboard
+DASHBOARD_LABELS = {"Overall Completion Rate": "progress", "Overall Task Completion Rate": "enhanced"}
+
+
+def detect_generator(path: str) -> Optional[str]:
+    """The generator whose layout a workbook has, or None if its month sheets have neither.
+
+    Both write task_ingest's "2025" month-sheet layout, so they are told
+    apart by the dashboard's labels; older Progress Checker workbooks also
+    name the duration column "Duration (in hrs)".
+    """
+    from openpyxl import load_workbook
+    from task_ingest import MONTH_NAMES, detect_layout
+
+    wb = load_workbook(path, read_only=True)
+    try:
+        month = next((ws for ws in wb.worksheets if ws.title in MONTH_NAMES), None)
+        header = next(month.iter_rows(max_row=1, values_only=True), ()) if month else ()
+        layout = detect_layout(header) if header else None
+        if layout is None or layout.name != "2025":
+            return None
+        if "Duration (in hrs)" in header:
+            return "progress"
+        if "Yearly Dashboard" in wb.sheetnames:
+            for (label,) in wb["Yearly Dashboard"].iter_rows(max_row=10, max_col=1, values_only=True):
+                if label in DASHBOARD_LABELS:
+                    return DASHBOARD_LABELS[label]
+    finally:
+        wb.close()
+    return "enhanced"
+
+
+def _warm_up(names: Tuple[str, ...]):
+    for name in names:
+        generator_class(name)
+
+
+def _check_duration(duration):
+    if not isinstance(duration, str):
+        raise ValueError(f"duration {duration!r} is not H:MM")
+    try:
+        duration_minutes(duration)
+    except ValueError:
+        raise ValueError(f"duration {duration!r} is not H:MM") from None
+
+
+def _fixed_task(entry) -> Tuple[str, str, str, str]:
+    if isinstance(entry, dict):
+        entry = (entry.get("task"), entry.get("category"), entry.get("duration"),
+                 entry.get("priority", "Medium"))
+    if len(entry) != 4 or not all(isinstance(value, str) and value for value in entry):
+        raise ValueError(f"fixed task {entry!r} needs a task, category, duration and priority")
+    _check_duration(entry[2])
+    return tuple(entry)
+
+
+def load_plan(path: str) -> Dict:
+    """Read and check one plan file; raises ValueError when it cannot be used."""
+    with open(path, encoding="utf-8") as f:
+        plan = json.load(f)
+    if not isinstance(plan, dict):
+        raise ValueError("a plan must be a JSON object")
+    unknown = set(plan) - PLAN_KEYS
+    if unknown:
+        raise ValueError(f"unknown keys: {', '.join(sorted(unknown))}")
+    if not plan.get("fixed_tasks"):
+        raise ValueError("fixed_tasks is required")
+    plan["fixed_tasks"] = [_fixed_task(entry) for entry in plan["fixed_tasks"]]
+    plan.setdefault("generator", "progress")
+    if plan["generator"] not in GENERATORS:
+        raise ValueError(f"unknown generator {plan['generator']!r}; use one of {', '.join(GENERATORS)}")
+    if "flexible_duration" in plan:
+        _check_duration(plan["flexible_duration"])
+    plan.setdefault("filename", os.path.splitext(os.path.basename(path))[0] + ".xlsx")
+    filename = plan["filename"]
+    if (not isinstance(filename, str) or filename in ("", ".", "..")
+            or os.path.basename(filename) != filename or "/" in filename or "\\" in filename):
+        raise ValueError(f"filename {filename!r} must be a plain file name, without a directory")
+    return plan
+
+
+def generate(path: str, out_dir: str, writer: str = "openpyxl") -> Tuple[str, float]:
+    """Build the workbook for one plan file; returns its path and the seconds it took."""
+    start = time.perf_counter()
+    plan = load_plan(path)
+    options = {key: plan[key] for key in ("year", "categories", "flexible_blocks", "flexible_duration")
+               if key in plan}
+    target = os.path.join(out_dir, plan["filename"])
+    manager = generator_class(plan["generator"])(target, writer, plan["fixed_tasks"], **options)
+    if writer == "openpyxl":
+        manager.save_workbook(manager.create_workbook())
+    else:
+        target = manager.export()
+    return target, time.perf_counter() - start
+
+
+def generate_all(paths: List[str], out_dir: str, writer: str = "openpyxl",
+                 workers: Optional[int] = None) -> Tuple[List[Tuple[str, str, float]], Dict[str, str]]:
+    """Build every plan in a process pool.
+
+    Returns (plan, workbook, seconds) for each success and the error for
+    each plan that failed.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    done, failed = [], {}
+    names = tuple(GENERATORS)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_warm_up, initargs=(names,)) as pool:
+        futures = {pool.submit(generate, path, out_dir, writer): path for path in paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                target, seconds = future.result()
+            except Exception as e:
+                failed[path] = f"{type(e).__name__}: {e}"
+                print(f"  failed  {os.path.basename(path)}: {failed[path]}")
+                continue
+            done.append((path, target, seconds))
+            print(f"  {seconds:6.2f}s {os.path.basename(path)} -> {target}")
+    return done, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a task workbook for every plan file in a directory.")
+    parser.add_argument("plans", help="directory of per-user .json plan files")
+    parser.add_argument("--out", default="generated", help="directory the workbooks are written to")
+    parser.add_argument("--writer", default="openpyxl", help="output backend (see workbook_writers.py)")
+    parser.add_argument("--workers", type=int, help="processes used to build workbooks")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.plans, "*.json")))
+    if not paths:
+        raise SystemExit(f"No plan files in {args.plans}")
+
+    start = time.perf_counter()
+    done, failed = generate_all(paths, args.out, args.writer, args.workers)
+    elapsed = time.perf_counter() - start
+
+    busy = sum(seconds for _, _, seconds in done)
+    print(f"{len(done)} workbooks in {elapsed:.1f}s: {len(done) / elapsed * 60:.0f} workbooks/minute "
+          f"({busy / max(len(done), 1):.2f}s each, {busy / elapsed:.1f} workers busy on average)")
+    if failed:
+        print(f"{len(failed)} plans failed")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import argparse
+import importlib.util
+import io
+import os
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict
+
+from openpyxl import Workbook
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_progress_checker():
+    """Import "Progress Checker.py", whose name is not a valid module name."""
+    spec = importlib.util.spec_from_file_location(
+        "progress_checker", os.path.join(HERE, "Progress Checker.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def build_progress_checker() -> Workbook:
+    return load_progress_checker().TaskManagerExcel().create_workbook()
+
+
+def build_enhanced() -> Workbook:
+    from enhanced_routine_checker import EnhancedTaskManager
+    return EnhancedTaskManager().create_workbook()
+
+
+def build_routine() -> Workbook:
+    from routine import EnhancedTaskManager
+    return EnhancedTaskManager().create_workbook()
+
+
+def build_refined() -> bytes:
+    # create_task_workbook saves as it goes, so it is timed together with the save
+    from routinerefined import create_task_workbook
+    target = io.BytesIO()
+    create_task_workbook(target)
+    return target.getvalue()
+
+
+GENERATORS: Dict[str, Callable] = {
+    "progress": build_progress_checker,
+    "enhanced": build_enhanced,
+    "routine": build_routine,
+    "refined": build_refined,
+}
+
+
+def measure(build: Callable, repeat: int) -> Dict[str, float]:
+    """Best-of-`repeat` build and save times, plus peak memory and output size."""
+    best_build = best_save = float("inf")
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = build()
+        built = time.perf_counter()
+        if isinstance(result, Workbook):
+            target = io.BytesIO()
+            result.save(target)
+            size = len(target.getvalue())
+            best_save = min(best_save, time.perf_counter() - built)
+        else:
+            size = len(result)
+            best_save = None
+        best_build = min(best_build, built - start)
+
+    tracemalloc.start()
+    result = build()
+    if isinstance(result, Workbook):
+        result.save(io.BytesIO())
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"build": best_build, "save": best_save, "peak": peak, "size": size}
+
+
+def build_enhanced_months(styling: str) -> Workbook:
+    """Enhanced month sheets with priority/status colours as rules or per-cell styles.
+
+    Only the task part of each month is built, so the dashboards do not
+    affect the comparison.
+    """
+    from openpyxl.styles import Font, PatternFill
+    from enhanced_routine_checker import EnhancedTaskManager
+    from sheet_templates import SheetTemplate
+    from task_model import TaskTable
+
+    manager = EnhancedTaskManager()
+    wb = Workbook()
+    wb.remove(wb.active)
+    template = SheetTemplate(wb, manager._create_month_template)
+    statuses = list(manager.status_colors)
+    for month in range(1, 13):
+        ws = template.clone(datetime(2025, month, 1).strftime("%B"))
+        tasks: TaskTable = manager._plan_month(month, 2025)
+        # Give every row a status so both variants have something to colour
+        for i in range(len(tasks)):
+            tasks.set_status(i, statuses[i % len(statuses)])
+        manager.tasks[(2025, month)] = tasks
+        last_row = manager._populate_daily_schedule(ws, month, 2025)
+        if styling == "rules":
+            manager._add_conditional_formatting(ws, last_row)
+            continue
+        for row in range(2, last_row + 1):
+            priority = ws.cell(row=row, column=8)
+            if priority.value in manager.priority_colors:
+                priority.font = Font(color=manager.priority_colors[priority.value], bold=True)
+            status = ws.cell(row=row, column=6)
+            color = manager.status_colors[status.value]
+            status.fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
+    template.discard()
+    return wb
+
+
+def compare_styling(repeat: int):
+    print(f"{'styling':<12}{'build':>10}{'save':>10}{'size KB':>10}{'styles':>8}")
+    for styling in ("rules", "per-cell"):
+        best_build = best_save = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            wb = build_enhanced_months(styling)
+            built = time.perf_counter()
+            target = io.BytesIO()
+            wb.save(target)
+            best_save = min(best_save, time.perf_counter() - built)
+            best_build = min(best_build, built - start)
+        print(f"{styling:<12}{best_build:>9.3f}s{best_save:>9.3f}s"
+              f"{len(target.getvalue()) / 1024:>10.0f}{len(wb._cell_styles):>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the workbook generators.")
+    parser.add_argument("generators", nargs="*", default=list(GENERATORS),
+                        help=f"generators to run (default: all of {', '.join(GENERATORS)})")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--styling", action="store_true",
+                        help="compare conditional-formatting rules with per-cell styles instead")
+    args = parser.parse_args()
+
+    if args.styling:
+        compare_styling(args.repeat)
+        return
+
+    print(f"{'generator':<12}{'build':>10}{'save':>10}{'peak MB':>10}{'size KB':>10}")
+    for name in args.generators:
+        try:
+            stats = measure(GENERATORS[name], args.repeat)
+        except Exception as e:
+            print(f"{name:<12}failed: {type(e).__name__}: {e}")
+            continue
+        save = "incl." if stats["save"] is None else f"{stats['save']:.3f}s"
+        print(f"{name:<12}{stats['build']:>9.3f}s{save:>10}"
+              f"{stats['peak'] / 2**20:>10.1f}{stats['size'] / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+import argparse
+import os
+import sqlite3
+import struct
+import time
+import zlib
+from typing import Callable, List, Optional, Tuple, Union
+
+from calculator_cost import LogNumber, Number, normalize_operation
+
+# Set to a file path to cache results across calculator sessions
+CACHE_ENV = "CALCULATOR_CACHE"
+
+DEFAULT_MAX_BYTES = 256 << 20
+
+# Operations worth a disk lookup; the others cost less than the lookup itself
+CACHED_OPERATIONS = ("factorial", "power", "log")
+
+# Integer results at least this long are stored compressed
+COMPRESS_BYTES = 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY, kind TEXT, data BLOB, size INTEGER, last_used INTEGER, hits INTEGER DEFAULT 0);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER);
+INSERT OR IGNORE INTO stats VALUES ('hits', 0), ('misses', 0), ('evictions', 0);
+"""
+
+_MISSING = object()
+
+
+def _operand(operation: str, number: Number) -> str:
+    """Operands written so that equal inputs give equal keys, without mixing up ints and floats.
+
+    factorial only looks at the integer value and log only at the float
+    value, so their operands are normalized to that; elsewhere 2 and 2.0
+    give different results (2 ** 3 is 8, 2.0 ** 3 is 8.0) and stay apart.
+    """
+    if operation == "factorial" and isinstance(number, float) and number.is_integer():
+        number = int(number)
+    elif operation == "log" and isinstance(number, int):
+        number = float(number)
+    if isinstance(number, bool) or not isinstance(number, (int, float)):
+        raise TypeError
+    return f"i{number}" if isinstance(number, int) else f"f{number!r}"
+
+
+def cache_key(operation: str, numbers: List[Number], context: str = "") -> Optional[str]:
+    """The key for a calculation, or None if it is not cached.
+
+    `context` holds the settings that change power results (the size
+    limit and overflow mode); other operations ignore it.
+    """
+    name = normalize_operation(operation)
+    if name not in CACHED_OPERATIONS:
+        return None
+    try:
+        operands = ",".join(_operand(name, number) for number in numbers)
+    except (TypeError, ValueError):
+        return None
+    if name == "power" and context:
+        operands += f"|{context}"
+    return f"{name}({operands})"
+
+
+def encode(value) -> Optional[Tuple[str, bytes]]:
+    """(kind, data) for a result, or None for results that are not stored (errors)."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        data = value.to_bytes((value.bit_length() + 8) // 8, "little", signed=True)
+        if len(data) >= COMPRESS_BYTES:
+            return "zint", zlib.compress(data, 1)
+        return "int", data
+    if isinstance(value, float):
+        return "float", struct.pack("<d", value)
+    if isinstance(value, LogNumber):
+        return "lognumber", struct.pack("<di", value.log10, value.sign)
+    return None
+
+
+def decode(kind: str, data: bytes):
+    if kind == "zint":
+        return int.from_bytes(zlib.decompress(data), "little", signed=True)
+    if kind == "int":
+        return int.from_bytes(data, "little", signed=True)
+    if kind == "float":
+        return struct.unpack("<d", data)[0]
+    if kind == "lognumber":
+        log10, sign = struct.unpack("<di", data)
+        return LogNumber(log10, sign)
+    raise ValueError(f"unknown cached result kind {kind!r}")
+
+
+class ResultCache:
+    """Calculator results in a SQLite file, evicting the least recently used past max_bytes.
+
+    Any number of processes can share one file.
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def _count(self, name: str):
+        self.db.execute("UPDATE stats SET value = value + 1 WHERE name = ?", (name,))
+
+    def get(self, key: str):
+        """The stored result, or _MISSING."""
+        row = self.db.execute("SELECT kind, data FROM results WHERE key = ?", (key,)).fetchone()
+        with self.db:
+            if row is None:
+                self._count("misses")
+                return _MISSING
+            self._count("hits")
+            self.db.execute("UPDATE results SET last_used = ?, hits = hits + 1 WHERE key = ?",
+                            (time.time_ns(), key))
+        return decode(*row)
+
+    def put(self, key: str, value):
+        encoded = encode(value)
+        if encoded is None or len(encoded[1]) > self.max_bytes:
+            return
+        kind, data = encoded
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO results (key, kind, data, size, last_used) "
+                            "VALUES (?, ?, ?, ?, ?)", (key, kind, data, len(data), time.time_ns()))
+            self._evict()
+
+    def _evict(self):
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self.db.execute("SELECT key, size FROM results ORDER BY last_used").fetchall():
+            if total <= self.max_bytes:
+                break
+            self.db.execute("DELETE FROM results WHERE key = ?", (key,))
+            self._count("evictions")
+            total -= size
+
+    def calculate(self, operation: str, numbers: List[Number], compute: Callable[[], object],
+                  context: str = ""):
+        """compute()'s result, from the cache when this calculation was done before."""
+        key = cache_key(operation, numbers, context)
+        if key is None:
+            return compute()
+        value = self.get(key)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def stats(self) -> dict:
+        counts = dict(self.db.execute("SELECT name, value FROM stats"))
+        entries, size = self.db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        counts.update(entries=entries, bytes=size)
+        return counts
+
+    def most_used(self, limit: int = 10) -> List[Tuple[str, int, int]]:
+        """(key, hits, stored bytes) of the most reused results."""
+        return self.db.execute("SELECT key, hits, size FROM results ORDER BY hits DESC, last_used DESC "
+                               "LIMIT ?", (limit,)).fetchall()
+
+    def clear(self):
+        with self.db:
+            self.db.execute("DELETE FROM results")
+            self.db.execute("UPDATE stats SET value = 0")
+
+
+def cache_from_env() -> Optional[ResultCache]:
+    """A ResultCache on the file named by CALCULATOR_CACHE if it is set; otherwise None."""
+    path = os.environ.get(CACHE_ENV)
+    return ResultCache(path) if path else None
+
+
+def _size(size: Union[int, float]) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear the calculator result cache.")
+    parser.add_argument("command", choices=["stats", "clear"])
+    parser.add_argument("--path", default=os.environ.get(CACHE_ENV, ".calculator_cache.sqlite"),
+                        help=f"cache file (default: ${CACHE_ENV} or .calculator_cache.sqlite)")
+    args = parser.parse_args()
+
+    cache = ResultCache(args.path)
+    try:
+        if args.command == "clear":
+            cache.clear()
+            print(f"Cleared {args.path}")
+            return
+        stats = cache.stats()
+        lookups = stats["hits"] + stats["misses"]
+        print(f"{stats['entries']} results, {_size(stats['bytes'])} of {_size(cache.max_bytes)}")
+        print(f"{stats['hits']} hits, {stats['misses']} misses"
+              + (f" ({stats['hits'] / lookups:.0%} hit rate)" if lookups else "")
+              + f", {stats['evictions']} evictions")
+        for key, hits, size in cache.most_used():
+            shown = key if len(key) <= 60 else key[:57] + "..."
+            print(f"  {hits:>6} hits  {_size(size):>10}  {shown}")
+    finally:
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
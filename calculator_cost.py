@@ -0,0 +1,212 @@
+import math
+import timeit
+from dataclasses import dataclass
+from typing import List, Union
+
+Number = Union[int, float]
+
+# Results at or below this many bits are cheap enough to compute inline
+DEFAULT_INLINE_BITS = 1 << 16
+
+# Largest power result computed exactly (about 1.26 million decimal digits)
+DEFAULT_MAX_POWER_BITS = 1 << 22
+
+# What guarded_power does above the limit: "log" keeps an approximation,
+# "refuse" returns an error message
+OVERFLOW_MODES = ("log", "refuse")
+
+# Floats are fixed-size, so they always cost one machine word
+FLOAT_BITS = 64
+
+# Largest log10 a LogNumber holds; beyond it a float no longer keeps the
+# fraction that gives the mantissa's digits
+MAX_LOG10 = 1e8
+
+
+def normalize_operation(name: str) -> Union[str, None]:
+    """Map any calculator spelling of an operation to its allcalculations name.
+
+    Accepts the allcalculations names ("power"), the advancecalculator
+    aliases ("pow", "8") and the multicalculator menu keys ("8.power").
+    """
+    from advancecalculator import Operation
+
+    name = name.lower().strip()
+    if '.' in name:
+        name = name.split('.', 1)[1]
+    for operation in Operation:
+        if name in operation.value:
+            return operation.value[1]
+    return None
+
+
+def operand_bits(number: Number) -> float:
+    """Size of a single operand in bits."""
+    if isinstance(number, int):
+        return float(max(abs(number).bit_length(), 1))
+    return float(FLOAT_BITS)
+
+
+def factorial_bits(n: int) -> float:
+    """Bit length of n! from Stirling's approximation via lgamma."""
+    if n < 2:
+        return 1.0
+    return math.lgamma(n + 1) / math.log(2) + 1
+
+
+def power_bits(base: Number, exponent: Number) -> float:
+    """Bit length of base ** exponent without computing it."""
+    if not (isinstance(base, int) and isinstance(exponent, int)) or exponent < 0:
+        return float(FLOAT_BITS)
+    if abs(base) <= 1 or exponent == 0:
+        return 1.0
+    return exponent * math.log2(abs(base)) + 1
+
+
+def estimate_result_bits(operation: str, numbers: List[Number]) -> float:
+    """Estimate the bit length of the result of an operation.
+
+    The estimate is what decides whether a job is worth shipping to another
+    process, so it only has to be right to within a small factor.
+    """
+    operation = normalize_operation(operation) or operation
+    if not numbers:
+        return 1.0
+    try:
+        if operation == "factorial":
+            n = numbers[0]
+            if isinstance(n, float) and n.is_integer():
+                n = int(n)
+            return factorial_bits(n) if isinstance(n, int) else float(FLOAT_BITS)
+        if operation == "power" and len(numbers) == 3:
+            return operand_bits(numbers[2])
+        if operation == "power" and len(numbers) == 2:
+            return power_bits(numbers[0], numbers[1])
+        if operation == "multiply":
+            return sum(operand_bits(num) for num in numbers)
+    except (OverflowError, ValueError):
+        return math.inf
+    return max(operand_bits(num) for num in numbers)
+
+
+@dataclass(frozen=True)
+class LogNumber:
+    """A result too large to materialise, kept as its sign and log10 magnitude."""
+    log10: float
+    sign: int = 1
+
+    def __post_init__(self):
+        if not math.isfinite(self.log10) or abs(self.log10) > MAX_LOG10:
+            raise ValueError(f"log10 {self.log10!r} is outside what a LogNumber can represent")
+
+    @property
+    def bits(self) -> float:
+        return self.log10 / math.log10(2) + 1
+
+    def __str__(self) -> str:
+        exponent = math.floor(self.log10)
+        mantissa = 10 ** (self.log10 - exponent)
+        return f"{'-' if self.sign < 0 else ''}{mantissa:.6f}e{exponent:+d}"
+
+
+def _as_int(number: Number) -> Union[int, None]:
+    if isinstance(number, int):
+        return number
+    if isinstance(number, float) and number.is_integer():
+        return int(number)
+    return None
+
+
+def modular_power(base: Number, exponent: Number, modulus: Number) -> Union[int, str]:
+    """(base ** exponent) % modulus through three-argument pow."""
+    base, exponent, modulus = _as_int(base), _as_int(exponent), _as_int(modulus)
+    if None in (base, exponent, modulus):
+        return "Error: Modular exponentiation requires integers."
+    if modulus == 0:
+        return "Error: Modulus cannot be zero."
+    try:
+        return pow(base, exponent, modulus)
+    except ValueError:
+        return "Error: Base is not invertible for this modulus."
+
+
+def log_power(base: Number, exponent: Number) -> Union[LogNumber, str]:
+    """base ** exponent as a LogNumber, for results too big to build."""
+    sign = 1
+    if base < 0:
+        if _as_int(exponent) is None:
+            return "Error: Negative base requires an integer exponent."
+        sign = -1 if _as_int(exponent) % 2 else 1
+    return LogNumber(exponent * math.log10(abs(base)), sign)
+
+
+def _too_large(bits: float, max_bits: float) -> str:
+    size = f"~{bits:.0f} bits, " if math.isfinite(bits) else ""
+    return f"Error: Result too large ({size}limit {max_bits:.0f})."
+
+
+def guarded_power(base: Number, exponent: Number, modulus: Union[Number, None] = None,
+                  max_bits: float = DEFAULT_MAX_POWER_BITS,
+                  on_overflow: str = "log") -> Union[Number, LogNumber, str]:
+    """Raise base to exponent, checking the size of the result first.
+
+    Results estimated above `max_bits` are never built: depending on
+    `on_overflow` they come back as a LogNumber or as an error message.
+    Operands too big for even a LogNumber are always refused.
+    With a modulus the result is always small, so pow(base, exponent,
+    modulus) is used instead.
+    """
+    if on_overflow not in OVERFLOW_MODES:
+        raise ValueError(f"on_overflow must be one of {OVERFLOW_MODES}")
+    if modulus is not None:
+        return modular_power(base, exponent, modulus)
+    try:
+        bits = power_bits(base, exponent)
+    except OverflowError:
+        bits = math.inf
+    if bits <= max_bits:
+        try:
+            return base ** exponent
+        except OverflowError:
+            pass
+    try:
+        approximation = log_power(base, exponent)
+    except (OverflowError, ValueError):
+        return _too_large(math.inf, max_bits)
+    if isinstance(approximation, str):
+        return approximation
+    if on_overflow == "refuse":
+        return _too_large(approximation.bits, max_bits)
+    return approximation
+
+
+def benchmark():
+    """Time the guarded power against plain ** on the same inputs."""
+    cases = [
+        # name, arguments, runs, whether plain ** is feasible
+        ("small int", (3, 100), 10000, True),
+        ("large int", (3, 1_000_000), 3, True),
+        ("float overflow", (10.0, 1e6), 10000, True),
+        ("over limit", (10, 2_000_000), 3, True),
+        ("way over limit", (10, 10**8), 10000, False),
+        ("modular", (3, 1_000_000, 10**9 + 7), 1000, True),
+        ("modular huge", (3, 10**18, 10**9 + 7), 1000, False),
+    ]
+    print(f"{'case':<16}{'guarded':>14}{'unguarded':>14}")
+    for name, args, runs, feasible in cases:
+        guarded = timeit.timeit(lambda: guarded_power(*args), number=runs) / runs
+        plain = "(infeasible)"
+        if feasible:
+            def unguarded():
+                try:
+                    result = args[0] ** args[1]
+                    return result % args[2] if len(args) == 3 else result
+                except OverflowError:
+                    return None
+            plain_runs = min(runs, 3) if len(args) == 3 else runs
+            plain = f"{timeit.timeit(unguarded, number=plain_runs) / plain_runs * 1e6:.1f}us"
+        print(f"{name:<16}{guarded * 1e6:>12.1f}us{plain:>14}")
+
+
+if __name__ == "__main__":
+    benchmark()
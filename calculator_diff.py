@@ -0,0 +1,189 @@
+import argparse
+import math
+import random
+import re
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Tuple
+
+import advancecalculator
+import multicalculator
+from allcalculations import perform_calculations
+
+OPERATIONS = [operation.value[1] for operation in advancecalculator.Operation]
+
+# Values that tend to sit on the edges the implementations disagree about
+EDGE_VALUES = [0.0, -0.0, 1.0, -1.0, 2.0, 0.5, -2.5, 3.0, 10.0, 170.0, 171.0, 1e-300, 1e300]
+
+# Each implementation words its errors differently; these group them by cause
+ERROR_KINDS = [
+    ("operand count", re.compile(r"requires (at least|exactly|one|two|\d)|accepts maximum|no numbers", re.I)),
+    ("division by zero", re.compile(r"by zero|with zero|0\.0 cannot be raised to a negative power", re.I)),
+    ("invalid operand", re.compile(r"negative|positive|integer|invalid value", re.I)),
+]
+
+
+def run_allcalculations() -> Callable:
+    return lambda numbers, operation: perform_calculations(numbers, operation)
+
+
+def run_advancecalculator() -> Callable:
+    calculator = advancecalculator.Calculator()
+
+    def run(numbers, operation):
+        op = calculator.get_operation(operation)
+        error = calculator.validate_numbers(numbers, op)
+        return error or calculator.operations[op](numbers)
+    return run
+
+
+def run_multicalculator() -> Callable:
+    calculator = multicalculator.Calculator()
+    keys = {key.split('.', 1)[1]: key for key in calculator.operations}
+    return lambda numbers, operation: calculator.calculate(numbers, keys[operation])
+
+
+IMPLEMENTATIONS: Dict[str, Callable[[], Callable]] = {
+    "allcalculations": run_allcalculations,
+    "advancecalculator": run_advancecalculator,
+    "multicalculator": run_multicalculator,
+}
+
+
+def random_numbers(rng: random.Random, with_ints: bool = False) -> List[float]:
+    """A list of 0-4 operands, biased towards edge values."""
+    numbers = []
+    for _ in range(rng.choice([0, 1, 1, 2, 2, 2, 3, 4])):
+        if rng.random() < 0.4:
+            number = rng.choice(EDGE_VALUES)
+        elif rng.random() < 0.5:
+            number = float(rng.randint(-20, 200))
+        else:
+            number = rng.uniform(-1000, 1000)
+        if with_ints and number.is_integer() and abs(number) < 1e6 and rng.random() < 0.3:
+            number = int(number)
+        numbers.append(number)
+    return numbers
+
+
+def outcome(run: Callable, numbers: List[float], operation: str) -> Tuple[str, object]:
+    """Classify a call as ('value', result), ('error', message) or ('raise', exception name)."""
+    try:
+        result = run(list(numbers), operation)
+    except Exception as e:
+        return "raise", type(e).__name__
+    if isinstance(result, str) and result.startswith(("Error", "Invalid")):
+        return "error", result
+    return "value", result
+
+
+def error_kind(message: str) -> str:
+    """The cause of an error message, or the message itself if it is not a known one."""
+    return next((kind for kind, pattern in ERROR_KINDS if pattern.search(message)), message)
+
+
+def label(result: Tuple[str, object]) -> str:
+    """'value', the error kind, or the name of the exception raised."""
+    kind, detail = result
+    if kind == "error":
+        return error_kind(detail)
+    if kind == "raise":
+        return f"raise {detail}"
+    return kind
+
+
+def same_outcome(a: Tuple[str, object], b: Tuple[str, object]) -> bool:
+    """Two outcomes agree if both failed the same way, or both returned the same number."""
+    if a[0] != b[0]:
+        return False
+    if a[0] != "value":
+        return label(a) == label(b)
+    x, y = a[1], b[1]
+    if isinstance(x, (int, float)) and isinstance(y, (int, float)):
+        x_nan = isinstance(x, float) and math.isnan(x)
+        y_nan = isinstance(y, float) and math.isnan(y)
+        if x_nan or y_nan:
+            return x_nan and y_nan
+        try:
+            return math.isclose(x, y, rel_tol=1e-9, abs_tol=1e-12)
+        except OverflowError:
+            return x == y
+    return str(x) == str(y)
+
+
+def describe(result: Tuple[str, object]) -> str:
+    kind, detail = result
+    if kind == "value" and isinstance(detail, int) and detail.bit_length() > 64:
+        detail = f"<{detail.bit_length()}-bit int>"
+    text = f"{kind}: {detail}"
+    return text if len(text) <= 60 else text[:57] + "..."
+
+
+def compare(samples: int, seed: int, with_ints: bool = False):
+    """Run every implementation on the same random inputs.
+
+    Returns the per-operation disagreements (grouped by which outcome each
+    implementation produced) and per-operation throughput in calls/second.
+    """
+    rng = random.Random(seed)
+    inputs = {operation: [random_numbers(rng, with_ints) for _ in range(samples)]
+              for operation in OPERATIONS}
+    runners = {name: factory() for name, factory in IMPLEMENTATIONS.items()}
+
+    outcomes: Dict[str, Dict[str, List]] = defaultdict(dict)
+    throughput: Dict[str, Dict[str, float]] = defaultdict(dict)
+    for operation, cases in inputs.items():
+        for name, run in runners.items():
+            start = time.perf_counter()
+            outcomes[operation][name] = [outcome(run, numbers, operation) for numbers in cases]
+            throughput[operation][name] = len(cases) / (time.perf_counter() - start)
+
+    differences: Dict[str, Dict[Tuple, List]] = defaultdict(dict)
+    names = list(runners)
+    for operation, cases in inputs.items():
+        for i, numbers in enumerate(cases):
+            results = [outcomes[operation][name][i] for name in names]
+            if all(same_outcome(results[0], other) for other in results[1:]):
+                continue
+            signature = tuple(label(result) for result in results)
+            group = differences[operation].setdefault(signature, [0, numbers, results])
+            group[0] += 1
+    return names, differences, throughput
+
+
+def report(names: List[str], differences, throughput, samples: int):
+    print("Behavioural differences")
+    print("=" * 50)
+    if not differences:
+        print("All implementations agree on every sample.")
+    for operation, groups in differences.items():
+        total = sum(group[0] for group in groups.values())
+        print(f"\n{operation}: {total}/{samples} samples disagree")
+        for signature, (count, numbers, results) in sorted(groups.items(), key=lambda g: -g[1][0]):
+            print(f"  {count} x {' / '.join(signature)}  e.g. {numbers}")
+            for name, result in zip(names, results):
+                print(f"      {name:<18} {describe(result)}")
+
+    print("\nThroughput (calls/second)")
+    print("=" * 50)
+    print(f"{'operation':<12}" + "".join(f"{name:>20}" for name in names))
+    for operation in OPERATIONS:
+        row = throughput[operation]
+        print(f"{operation:<12}" + "".join(f"{row[name]:>20,.0f}" for name in names))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the three calculator implementations on random inputs.")
+    parser.add_argument("--samples", type=int, default=5000, help="random inputs per operation")
+    parser.add_argument("--seed", type=int, default=2025)
+    parser.add_argument("--ints", action="store_true",
+                        help="also feed Python ints, as calculator_jobs does")
+    args = parser.parse_args()
+
+    names, differences, throughput = compare(args.samples, args.seed, args.ints)
+    report(names, differences, throughput, args.samples)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+import argparse
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, Future, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Union
+
+from allcalculations import perform_calculations
+from calculator_cost import (DEFAULT_INLINE_BITS, Number, estimate_result_bits,
+                             normalize_operation)
+
+# How often a waiting job is checked against its timeout
+POLL_INTERVAL = 0.05
+
+# Integers longer than this are summarised instead of printed in full
+MAX_PRINTED_BITS = 4096
+
+
+@dataclass
+class Job:
+    """A single (operation, operands) calculator job."""
+    operation: str
+    numbers: List[Number]
+    line: int = 0
+    error: str = ""  # set when the line could not be parsed
+    cost: float = field(init=False)
+
+    def __post_init__(self):
+        self.operation = normalize_operation(self.operation) or self.operation
+        self.cost = estimate_result_bits(self.operation, self.numbers)
+
+
+@dataclass
+class JobResult:
+    """Outcome of a job, in the order the job was read."""
+    index: int
+    job: Job
+    value: object = None
+    error: str = ""
+    elapsed: float = 0.0
+    where: str = "inline"
+
+
+def parse_number(text: str) -> Number:
+    """Parse an operand, keeping integers exact so big-integer jobs stay exact."""
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def parse_jobs(lines: Iterable[str]) -> Iterator[Job]:
+    """Read jobs written as "operation n1 n2 ...", one per line.
+
+    Blank lines and lines starting with '#' are skipped.
+    """
+    for line_no, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        operation, *operands = line.split()
+        try:
+            numbers = [parse_number(x) for x in operands]
+        except ValueError:
+            bad = next(x for x in operands if not _is_number(x))
+            yield Job(operation, [], line_no, error=f"Error: Invalid number {bad!r}")
+            continue
+        yield Job(operation, numbers, line_no)
+
+
+def _is_number(text: str) -> bool:
+    try:
+        parse_number(text)
+    except ValueError:
+        return False
+    return True
+
+
+# In a pool worker, where each job reports (index, pid, wall time) as it starts
+_started = None
+
+
+def _init_worker(started):
+    global _started
+    _started = started
+
+
+def evaluate(operation: str, numbers: List[Number], index: Union[int, None] = None):
+    """Run one job and time it. Must stay module-level so it can be pickled."""
+    if _started is not None and index is not None:
+        _started.put((index, os.getpid(), time.time()))
+    start = time.perf_counter()
+    try:
+        value = perform_calculations(numbers, operation)
+    except Exception as e:
+        value = f"Error: {type(e).__name__}: {e}"
+    return value, time.perf_counter() - start
+
+
+class _WorkerPool:
+    """ProcessPoolExecutor that can be torn down and rebuilt after a timeout.
+
+    A running call cannot be cancelled, so the only way to stop a
+    pathological job is to kill the worker processes and resubmit whatever
+    had not finished yet. Workers report each job as they start it, so a
+    job's timeout runs from its start in the worker, not from when it was
+    queued.
+    """
+
+    def __init__(self, workers: Union[int, None] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.futures: Dict[int, Future] = {}
+        self.jobs: Dict[int, Job] = {}
+        self._start_executor()
+
+    def _start_executor(self):
+        # SimpleQueue writes in the calling thread; Queue's feeder thread would
+        # not get to run until a CPU-bound job gave up the GIL
+        self.started_queue = multiprocessing.SimpleQueue()
+        self.started: Dict[int, float] = {}  # wall time each job started, by index
+        self.pids = set()
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                            initargs=(self.started_queue,))
+
+    def _collect_started(self):
+        while not self.started_queue.empty():
+            index, pid, started = self.started_queue.get()
+            self.started[index] = started
+            self.pids.add(pid)
+
+    def submit(self, index: int, job: Job):
+        self.jobs[index] = job
+        self.futures[index] = self.executor.submit(evaluate, job.operation, job.numbers, index)
+
+    def recycle(self, keep: int):
+        """Kill every worker and resubmit unfinished jobs after `keep`."""
+        terminate = getattr(self.executor, "terminate_workers", None)
+        if terminate:
+            terminate()
+        else:
+            # Killing the workers seen running jobs breaks the pool, which stops the rest
+            self._collect_started()
+            for pid in self.pids:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except OSError:
+                    pass
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.started_queue.close()
+        self._start_executor()
+        for index, future in self.futures.items():
+            if index <= keep:
+                continue
+            lost = (not future.done() or future.cancelled()
+                    or isinstance(future.exception(), BrokenProcessPool))
+            if lost:
+                self.submit(index, self.jobs[index])
+
+    def result(self, index: int, timeout: Union[float, None]) -> JobResult:
+        """Wait for a job, timing it out `timeout` seconds after a worker started it."""
+        future = self.futures.pop(index)
+        job = self.jobs.pop(index)
+        while True:
+            done, _ = wait([future], timeout=POLL_INTERVAL)
+            if done:
+                break
+            if timeout is None:
+                continue
+            self._collect_started()
+            if index in self.started and time.time() - self.started[index] >= timeout:
+                self.recycle(index)
+                return JobResult(index, job, error=f"Error: timed out after {timeout}s",
+                                 elapsed=timeout, where="pool")
+        try:
+            value, elapsed = future.result()
+        except BrokenProcessPool:
+            self.recycle(index)
+            return JobResult(index, job, error="Error: worker process died", where="pool")
+        return JobResult(index, job, value=value, elapsed=elapsed, where="pool")
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.started_queue.close()
+
+
+def run_jobs(jobs: Iterable[Job], inline_bits: float = DEFAULT_INLINE_BITS,
+             timeout: Union[float, None] = None,
+             workers: Union[int, None] = None) -> Iterator[JobResult]:
+    """Run jobs, yielding results in input order.
+
+    Jobs whose estimated result is larger than `inline_bits` go to a process
+    pool up front; cheap ones are computed inline as their turn comes, while
+    the heavy ones are already running in the background.
+    """
+    jobs = list(jobs)
+    heavy = [i for i, job in enumerate(jobs) if job.cost > inline_bits and not job.error]
+    pool = _WorkerPool(workers) if heavy else None
+    try:
+        for index in heavy:
+            pool.submit(index, jobs[index])
+        for index, job in enumerate(jobs):
+            if job.error:
+                yield JobResult(index, job, error=job.error)
+            elif pool and index in pool.futures:
+                yield pool.result(index, timeout)
+            else:
+                value, elapsed = evaluate(job.operation, job.numbers)
+                yield JobResult(index, job, value=value, elapsed=elapsed)
+    finally:
+        if pool:
+            pool.shutdown()
+
+
+def format_value(value) -> str:
+    """Render a result, summarising integers too long to print usefully."""
+    if isinstance(value, int) and value.bit_length() > MAX_PRINTED_BITS:
+        return f"<{value.bit_length()}-bit integer>"
+    return str(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run a file of calculator jobs, sending big-integer work to a process pool.")
+    parser.add_argument("jobs", help="file with one 'operation n1 n2 ...' job per line ('-' for stdin)")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="seconds a pooled job may run before it is killed")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size")
+    parser.add_argument("--inline-bits", type=float, default=DEFAULT_INLINE_BITS,
+                        help="jobs with smaller estimated results run inline")
+    args = parser.parse_args()
+
+    source = sys.stdin if args.jobs == '-' else open(args.jobs)
+    with source:
+        jobs = list(parse_jobs(source))
+
+    start = time.perf_counter()
+    for result in run_jobs(jobs, args.inline_bits, args.timeout, args.workers):
+        job = result.job
+        outcome = result.error or format_value(result.value)
+        print(f"{job.line}: {job.operation} {' '.join(map(str, job.numbers))} "
+              f"[{result.where}, ~{job.cost:.0f} bits, {result.elapsed:.3f}s] = {outcome}")
+    print(f"\n{len(jobs)} job(s) in {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+import argparse
+import asyncio
+import json
+import math
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple, Union
+
+from calculator_cost import (DEFAULT_INLINE_BITS, DEFAULT_MAX_POWER_BITS, estimate_result_bits,
+                             normalize_operation)
+from multicalculator import Calculator
+
+# Largest integer sent back as a JSON number (Python refuses to print ones
+# beyond 4300 digits)
+MAX_JSON_BITS = 12000
+
+# Largest estimated result accepted at all; bigger requests are refused
+# rather than tying up a worker for minutes
+DEFAULT_MAX_RESULT_BITS = DEFAULT_MAX_POWER_BITS
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           500: "Internal Server Error"}
+
+
+def resolve_operation(calculator: Calculator, name: str) -> Union[str, None]:
+    """Find the menu key for '8', 'power', 'pow' or '8.power'."""
+    name = str(name).strip().lower()
+    name = normalize_operation(name) or name
+    for key in calculator.operations:
+        number, label = key.split('.', 1)
+        if name in (key, number, label):
+            return key
+    return None
+
+
+def to_json_value(value):
+    """Make a calculator result safe to put in a JSON document."""
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, int):
+        if value.bit_length() > MAX_JSON_BITS:
+            return f"<{value.bit_length()}-bit integer>"
+        return value
+    if isinstance(value, float) and math.isfinite(value):
+        return value
+    return str(value)
+
+
+def calculate_in_worker(numbers: List[float], operation: str, max_power_bits: float, on_overflow: str):
+    """Run one expensive request in a pool process. Must stay module-level so it can be pickled."""
+    return Calculator(max_power_bits, on_overflow).calculate(numbers, operation)
+
+
+class MicroBatcher:
+    """Collects concurrent requests and evaluates them as one batch.
+
+    Each batch costs a single hop to a worker thread, so the event loop keeps
+    accepting requests while a batch is being calculated, and whatever
+    arrives in the meantime forms the next batch.
+    """
+
+    def __init__(self, calculator: Calculator, max_batch: int = 256, max_delay: float = 0.001):
+        self.calculator = calculator
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.batches = 0
+        self.requests = 0
+
+    async def submit(self, numbers: List[float], operation: str):
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((numbers, operation, future))
+        return await future
+
+    def evaluate(self, batch: List[Tuple]) -> List:
+        return [self.calculator.calculate(numbers, operation) for numbers, operation, _ in batch]
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            if self.max_delay and self.queue.qsize() < self.max_batch:
+                await asyncio.sleep(self.max_delay)
+            while len(batch) < self.max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            try:
+                results = await loop.run_in_executor(None, self.evaluate, batch)
+            except Exception as e:
+                results = [f"Error: {e}"] * len(batch)
+            self.batches += 1
+            self.requests += len(batch)
+            for (_, _, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+
+class CalculatorService:
+    """Minimal HTTP/1.1 JSON service around multicalculator.Calculator.
+
+    POST /calculate takes {"numbers": [...], "operation": "power"} or a list
+    of such objects. GET /operations lists the menu and GET /stats reports
+    how well requests are being batched. Connections are kept alive.
+
+    Requests whose estimated result is above `inline_bits` run in a process
+    pool, so a big factorial does not hold up the batches of cheap ones;
+    above `max_bits` they are refused.
+    """
+
+    def __init__(self, max_batch: int = 256, max_delay: float = 0.001,
+                 inline_bits: float = DEFAULT_INLINE_BITS, max_bits: float = DEFAULT_MAX_RESULT_BITS,
+                 workers: Union[int, None] = None):
+        self.calculator = Calculator()
+        self.batcher = MicroBatcher(self.calculator, max_batch, max_delay)
+        self.inline_bits = inline_bits
+        self.max_bits = max_bits
+        self.workers = workers
+        self.pool: Union[ProcessPoolExecutor, None] = None
+        self.pooled = 0
+        self.refused = 0
+        self._batch_task = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765,
+                    unix_path: Union[str, None] = None) -> asyncio.AbstractServer:
+        self._batch_task = asyncio.create_task(self.batcher.run())
+        if unix_path:
+            return await asyncio.start_unix_server(self.handle, path=unix_path)
+        return await asyncio.start_server(self.handle, host, port)
+
+    def close(self):
+        if self.pool:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def cost(self, numbers: List[float], operation: str) -> float:
+        """Estimated result bits; powers past the calculator's limit are cheap log results or errors."""
+        bits = estimate_result_bits(operation, numbers)
+        if normalize_operation(operation) == "power":
+            bits = min(bits, self.calculator.max_power_bits)
+        return bits
+
+    async def evaluate_in_pool(self, numbers: List[float], operation: str):
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self.pooled += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.pool, calculate_in_worker, numbers, operation,
+                self.calculator.max_power_bits, self.calculator.on_overflow)
+        except Exception as e:
+            return f"Error: {e}"
+
+    async def calculate_one(self, request: Dict) -> Dict:
+        """The reply to one calculation; any failure becomes an error reply."""
+        try:
+            return await self._calculate(request)
+        except Exception as e:
+            return {"error": f"Error: {type(e).__name__}: {e}"}
+
+    async def _calculate(self, request: Dict) -> Dict:
+        if not isinstance(request, dict):
+            return {"error": "Error: Request must be an object"}
+        operation = resolve_operation(self.calculator, request.get("operation", ""))
+        if not operation:
+            return {"error": "Error: Invalid operation"}
+        numbers = request.get("numbers", [])
+        if not isinstance(numbers, list):
+            return {"error": "Error: numbers must be a list"}
+        try:
+            # Same float parsing as multicalculator.get_numbers
+            numbers = [float(x) for x in numbers]
+        except (TypeError, ValueError, OverflowError):
+            return {"error": "Error: Invalid number format"}
+        cost = self.cost(numbers, operation)
+        if cost > self.max_bits:
+            self.refused += 1
+            return {"operation": operation,
+                    "error": f"Error: Result too large (about {cost:,.0f} bits, limit {self.max_bits:,.0f})"}
+        if cost > self.inline_bits:
+            result = await self.evaluate_in_pool(numbers, operation)
+        else:
+            result = await self.batcher.submit(numbers, operation)
+        if isinstance(result, str) and result.startswith("Error"):
+            return {"operation": operation, "error": result}
+        return {"operation": operation, "result": to_json_value(result)}
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, object]:
+        if path == "/operations":
+            return 200, {key: op.description for key, op in self.calculator.operations.items()}
+        if path == "/stats":
+            batches = self.batcher.batches
+            return 200, {"requests": self.batcher.requests, "batches": batches,
+                         "mean_batch": self.batcher.requests / batches if batches else 0,
+                         "pooled": self.pooled, "refused": self.refused}
+        if path != "/calculate":
+            return 404, {"error": "Not found"}
+        if method != "POST":
+            return 405, {"error": "Use POST"}
+        try:
+            payload = json.loads(body or b"null")
+        except ValueError:
+            return 400, {"error": "Body is not valid JSON"}
+        if isinstance(payload, list):
+            return 200, list(await asyncio.gather(*(self.calculate_one(r) for r in payload)))
+        return 200, await self.calculate_one(payload)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                method, path, version = request_line.split(" ", 2)
+                headers = {}
+                for line in header_lines:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip().lower()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                connection = headers.get("connection", "")
+                keep_alive = connection == "keep-alive" or (version == "HTTP/1.1" and connection != "close")
+
+                try:
+                    status, payload = await self.dispatch(method, path, body)
+                except Exception as e:
+                    status, payload = 500, {"error": f"Error: {type(e).__name__}: {e}"}
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _client(host: str, port: int, requests: List[Dict], latencies: List[float]):
+    """One keep-alive connection sending requests back to back."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for request in requests:
+            body = json.dumps(request).encode()
+            start = time.perf_counter()
+            writer.write(f"POST /calculate HTTP/1.1\r\nHost: {host}\r\n"
+                         f"Content-Type: application/json\r\n"
+                         f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = next(int(line.split(b":")[1]) for line in head.split(b"\r\n")
+                          if line.lower().startswith(b"content-length"))
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def load_test(host: str, port: int, connections: int, requests_per_connection: int):
+    """Drive the service from many keep-alive connections and report latency."""
+    operations = ["sum", "multiply", "divide", "average", "power", "sqrt", "factorial", "log"]
+    latencies: List[float] = []
+    workloads = [
+        [{"numbers": [i % 97 + 1, j % 13 + 2], "operation": operations[(i + j) % len(operations)]}
+         if operations[(i + j) % len(operations)] not in ("sqrt", "factorial", "log")
+         else {"numbers": [(i + j) % 50 + 1], "operation": operations[(i + j) % len(operations)]}
+         for j in range(requests_per_connection)]
+        for i in range(connections)
+    ]
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, work, latencies) for work in workloads))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p50 = statistics.median(latencies)
+    p99 = latencies[min(len(latencies) - 1, math.ceil(len(latencies) * 0.99) - 1)]
+    print(f"{len(latencies)} requests over {connections} connections in {elapsed:.2f}s")
+    print(f"Throughput: {len(latencies) / elapsed:,.0f} requests/s")
+    print(f"Latency p50: {p50 * 1000:.2f} ms, p99: {p99 * 1000:.2f} ms")
+
+
+async def benchmark(connections: int, requests_per_connection: int, max_batch: int, max_delay: float):
+    service = CalculatorService(max_batch, max_delay)
+    server = await service.start("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        async with server:
+            await load_test("127.0.0.1", port, connections, requests_per_connection)
+    finally:
+        service.close()
+    batcher = service.batcher
+    print(f"Batches: {batcher.batches}, mean batch size: {batcher.requests / max(batcher.batches, 1):.1f}")
+
+
+async def serve(host: str, port: int, unix_path: Union[str, None], max_batch: int, max_delay: float,
+                max_bits: float, workers: Union[int, None]):
+    service = CalculatorService(max_batch, max_delay, max_bits=max_bits, workers=workers)
+    server = await service.start(host, port, unix_path)
+    print(f"Calculator service listening on {unix_path or f'http://{host}:{port}'}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local JSON calculator service with request batching.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--max-batch", type=int, default=256, help="largest batch evaluated at once")
+    parser.add_argument("--max-delay", type=float, default=0.001,
+                        help="seconds to wait for a batch to fill up")
+    parser.add_argument("--max-bits", type=float, default=DEFAULT_MAX_RESULT_BITS,
+                        help="refuse requests whose estimated result is larger")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size for expensive requests")
+    parser.add_argument("--bench", action="store_true",
+                        help="start a server and measure it with a built-in load generator")
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=200, help="requests per connection")
+    args = parser.parse_args()
+
+    try:
+        if args.bench:
+            asyncio.run(benchmark(args.connections, args.requests, args.max_batch, args.max_delay))
+        else:
+            asyncio.run(serve(args.host, args.port, args.unix, args.max_batch, args.max_delay,
+                              args.max_bits, args.workers))
+    except KeyboardInterrupt:
+        print("\nCalculator service stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Birth years and voting eligibility for a whole registration list.
+
+Applies the same rules as the interactive scripts to every row of a CSV:
+the birth year is the current year minus the age (Day2.birth_year), and
+the age is sorted into Day3's categories around VOTING_AGE. Rows give an
+age, a birthdate (YYYY-MM-DD), or both; a birthdate gives the exact age
+on the as-of day and takes precedence. Rows without a usable age are
+marked "invalid".
+
+The file is streamed in chunks with pandas' C parser, and each chunk is
+annotated with whole-column NumPy operations and appended to the output,
+so memory stays at one chunk however long the list is:
+
+    python eligibility_batch.py registrations.csv -o annotated.csv
+    python eligibility_batch.py sample.csv --sample 10000000   # write a test file first
+"""
+import argparse
+import sys
+import time
+from datetime import date
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from Day3 import ELIGIBLE, INELIGIBLE, NEWLY_ELIGIBLE, VOTING_AGE
+
+INVALID = "invalid"
+CATEGORIES = [INELIGIBLE, NEWLY_ELIGIBLE, ELIGIBLE, INVALID]
+
+AGE_COLUMNS = ("age",)
+BIRTHDATE_COLUMNS = ("birthdate", "birth_date", "date_of_birth", "dob")
+
+# Ages above this are taken as typing mistakes
+MAX_AGE = 130
+
+CHUNK_ROWS = 500_000
+
+
+def find_column(columns, names) -> Optional[str]:
+    lookup = {str(column).strip().lower(): column for column in columns}
+    return next((lookup[name] for name in names if name in lookup), None)
+
+
+def annotate(chunk: pd.DataFrame, as_of: date, age_column: Optional[str],
+             birth_column: Optional[str]) -> pd.DataFrame:
+    """Add birth_year, age and eligibility columns to a chunk of rows."""
+    age = np.full(len(chunk), np.nan)
+    birth_year = np.full(len(chunk), np.nan)
+    if age_column:
+        age = pd.to_numeric(chunk[age_column], errors="coerce").to_numpy(dtype=float)
+        birth_year = as_of.year - age
+    if birth_column:
+        born = pd.to_datetime(chunk[birth_column], errors="coerce", format="%Y-%m-%d")
+        known = born.notna().to_numpy()
+        year = born.dt.year.to_numpy(dtype=float, na_value=np.nan)
+        # One year younger until this year's birthday has passed
+        day_of_year = (born.dt.month * 100 + born.dt.day).to_numpy(dtype=float, na_value=np.nan)
+        exact = as_of.year - year - (day_of_year > as_of.month * 100 + as_of.day)
+        age = np.where(known, exact, age)
+        birth_year = np.where(known, year, birth_year)
+
+    valid = np.isfinite(age) & (age >= 0) & (age <= MAX_AGE) & (age == np.floor(age))
+    category = np.select([~valid, age < VOTING_AGE, age == VOTING_AGE],
+                         [INVALID, INELIGIBLE, NEWLY_ELIGIBLE], ELIGIBLE)
+    chunk["birth_year"] = pd.array(np.where(valid, birth_year, np.nan), dtype="Int64")
+    chunk["age"] = pd.array(np.where(valid, age, np.nan), dtype="Int64")
+    chunk["eligibility"] = category
+    return chunk
+
+
+def process(source: str, target: str, as_of: Optional[date] = None,
+            chunk_rows: int = CHUNK_ROWS) -> Dict[str, int]:
+    """Annotate every row of source into target; returns the rows per category."""
+    as_of = as_of or date.today()
+    counts = dict.fromkeys(CATEGORIES, 0)
+    reader = pd.read_csv(source, chunksize=chunk_rows, dtype=str, keep_default_na=False)
+    with reader, open(target, "w", newline="", encoding="utf-8") as out:
+        for number, chunk in enumerate(reader):
+            age_column = find_column(chunk.columns, AGE_COLUMNS)
+            birth_column = find_column(chunk.columns, BIRTHDATE_COLUMNS)
+            if number == 0 and not (age_column or birth_column):
+                raise ValueError(f"{source} needs an age or birthdate column "
+                                 f"({', '.join(AGE_COLUMNS + BIRTHDATE_COLUMNS)})")
+            if age_column is not None and str(age_column).strip().lower() == "age":
+                # The age column is rewritten with the validated age
+                chunk = chunk.rename(columns={age_column: "age_given"})
+                age_column = "age_given"
+            chunk = annotate(chunk, as_of, age_column, birth_column)
+            chunk.to_csv(out, header=number == 0, index=False)
+            for category, count in zip(*np.unique(chunk["eligibility"].to_numpy(), return_counts=True)):
+                counts[category] += int(count)
+    return counts
+
+
+def write_sample(path: str, rows: int, chunk_rows: int = CHUNK_ROWS, seed: int = 0):
+    """A synthetic registration list: names, birthdates, and ages for a tenth of the rows."""
+    rng = np.random.default_rng(seed)
+    first = np.datetime64("1920-01-01")
+    span = int((np.datetime64("2015-12-31") - first).astype(int))
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        for start in range(0, rows, chunk_rows):
+            n = min(chunk_rows, rows - start)
+            born = first + rng.integers(0, span, n).astype("timedelta64[D]")
+            ages = np.where(rng.random(n) < 0.1, rng.integers(0, 100, n).astype(str), "")
+            frame = pd.DataFrame({
+                "name": np.char.add("Person ", np.arange(start, start + n).astype(str)),
+                "birthdate": np.where(ages == "", born.astype(str), ""),
+                "age": ages,
+            })
+            frame.to_csv(f, header=start == 0, index=False)
+
+
+def peak_memory_mb() -> Optional[float]:
+    """Peak resident memory of this process, or None where it is not available (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Add birth years and voting eligibility to a CSV of people.")
+    parser.add_argument("source", help="CSV with a name column and an age and/or birthdate column")
+    parser.add_argument("-o", "--output", help="annotated CSV (default: SOURCE with _annotated)")
+    parser.add_argument("--as-of", type=date.fromisoformat, help="date ages are taken on (default: today)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="rows held in memory at once")
+    parser.add_argument("--sample", type=int, metavar="ROWS", help="write a synthetic SOURCE with this many rows")
+    args = parser.parse_args()
+
+    if args.sample:
+        start = time.perf_counter()
+        write_sample(args.source, args.sample, args.chunk_rows)
+        print(f"Wrote {args.sample:,} sample rows to {args.source} in {time.perf_counter() - start:.1f}s")
+        return
+
+    target = args.output or args.source.rsplit(".", 1)[0] + "_annotated.csv"
+    start = time.perf_counter()
+    counts = process(args.source, target, args.as_of, args.chunk_rows)
+    elapsed = time.perf_counter() - start
+
+    rows = sum(counts.values())
+    for category, count in counts.items():
+        print(f"{category:<16}{count:>14,}")
+    peak = peak_memory_mb()
+    memory = f", peak memory {peak:.0f} MB" if peak is not None else ""
+    print(f"{rows:,} rows in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s){memory} -> {target}")
+
+
+if __name__ == "__main__":
+    main()
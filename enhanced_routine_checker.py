@@ -4,6 +4,7 @@ from openpyxl import Workbook
 from openpyxl.styles import PatternFill, Font, Alignment, Border, Side, Color
 from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.datavalidation import DataValidation
+from openpyxl.formatting.rule import CellIsRule
 from openpyxl.chart import (BarChart, Reference, LineChart, PieChart, 
                            ScatterChart, BubbleChart, RadarChart)
 from openpyxl.chart.series import DataPoint
@@ -14,9 +15,40 @@ import os
 import schedule
 from plyer import notification
 
+from sheet_templates import SheetTemplate
+from task_aggregates import Aggregates
+from task_events import EventLog, events_path
+from task_model import FLEXIBLE_CATEGORY, HEADERS, KPIS, plan_month, write_rows, write_updates
+from weekly_progress import CompletionMatrix, weekly_table
+from workbook_writers import Sheet, get_writer, is_path, output, with_extension
+from workbook_profiler import instrument_from_env
+
 class EnhancedTaskManager:
-    def __init__(self, filename="TaskManager2025.xlsx"):
+    # Phases timed when profiling is switched on (see workbook_profiler.py)
+    profiled_phases = [
+        "create_workbook",
+        "create_yearly_dashboard",
+        "_create_month_template",
+        "_setup_sheet_formatting",
+        "_add_data_validations",
+        "create_monthly_sheet",
+        "_plan_month",
+        "_populate_daily_schedule",
+        "_add_conditional_formatting",
+        "_create_monthly_dashboard",
+        "_create_weekly_progress_section",
+        "save_workbook",
+        "create_backup"
+    ]
+
+    def __init__(self, filename="TaskManager2025.xlsx", writer="openpyxl", fixed_tasks=None,
+                 categories=None, year=2025, flexible_blocks=3, flexible_duration="2:00"):
         self.filename = filename
+        # Backend create_excel_template uses; see workbook_writers.py for the others
+        self.writer = writer
+        self.year = year
+        self.flexible_blocks = flexible_blocks
+        self.flexible_duration = flexible_duration
         self.status_options = ["Not Started", "In Progress", "Completed"]
         self.progress_options = ["Pending", "Done"]
         self.priority_colors = {
@@ -24,7 +56,12 @@ class EnhancedTaskManager:
             "Medium": "FFA500",  # Orange
             "Low": "008000"      # Green
         }
-        self.categories = [
+        self.status_colors = {
+            "Not Started": "F2F2F2",  # Light grey
+            "In Progress": "FFEB9C",  # Light yellow
+            "Completed": "C6EFCE"     # Light green
+        }
+        self.categories = categories or [
             "Core Learning",
             "Personal Development",
             "Essential Activities",
@@ -35,7 +72,7 @@ class EnhancedTaskManager:
             "Research & Study"
         ]
         
-        self.fixed_tasks = [
+        self.fixed_tasks = fixed_tasks or [
             ("Project work", "Core Learning", "2:00", "High"),
             ("Cybersecurity practice", "Core Learning", "2:00", "High"),
             ("Reading/revision of slides", "Core Learning", "3:00", "High"),
@@ -49,12 +86,34 @@ class EnhancedTaskManager:
             ("Personal care", "Essential Activities", "1:00", "High"),
             ("Rest/break periods", "Essential Activities", "2:00", "Medium")
         ]
+        # Planned tasks per (year, month), written to the month sheets
+        self.tasks = {}
+        # Dashboard totals over self.tasks, updated with every task change
+        self.aggregates = None
+        # Status history, appended to with every task change
+        self.events = EventLog(events_path(filename)) if is_path(filename) else None
+        instrument_from_env(self)
 
-    def create_monthly_sheet(self, wb, month, year=2025):
+    def create_monthly_sheet(self, wb, month, year=None, template=None):
         """Create a sheet for a specific month with fixed tasks and time blocks"""
+        year = year or self.year
         month_name = datetime(year, month, 1).strftime("%B")
-        ws = wb.create_sheet(month_name)
+        if template is None:
+            template = SheetTemplate(wb, self._create_month_template)
+            ws = template.clone(month_name)
+            template.discard()
+        else:
+            ws = template.clone(month_name)
         
+        last_row = self._populate_daily_schedule(ws, month, year)
+        self._add_conditional_formatting(ws, last_row)
+        self._create_monthly_dashboard(ws)
+        self._create_weekly_progress_section(ws)
+        
+        return ws
+
+    def _create_month_template(self, ws):
+        """Set up the headers, formatting and validations shared by every month"""
         # Define headers
         headers = [
             'Date',
@@ -70,11 +129,6 @@ class EnhancedTaskManager:
         
         self._setup_sheet_formatting(ws, headers)
         self._add_data_validations(ws)
-        self._populate_daily_schedule(ws, month, year)
-        self._create_monthly_dashboard(ws)
-        self._create_weekly_progress_section(ws)
-        
-        return ws
 
     def _setup_sheet_formatting(self, ws, headers):
         """Set up sheet formatting with improved styles"""
@@ -97,33 +151,82 @@ class EnhancedTaskManager:
             cell.border = border
             ws.column_dimensions[get_column_letter(col)].width = 18
 
+    def _validation_lists(self):
+        """Dropdown options for the category, status, progress and priority columns"""
+        return {
+            'E': self.categories,
+            'F': self.status_options,
+            'G': self.progress_options,
+            'H': list(self.priority_colors.keys())
+        }
+
+    def _add_data_validations(self, ws):
+        """Add dropdown validations for the status, category, progress and priority columns"""
+        for column, options in self._validation_lists().items():
+            dv = DataValidation(
+                type="list",
+                formula1=f'"{",".join(options)}"',
+                allow_blank=True
+            )
+            ws.add_data_validation(dv)
+            dv.add(f'{column}2:{column}1000')
+
+    def plan_year(self, year=None):
+        """Plan every month of the year"""
+        year = year or self.year
+        return self.plan_months([(year, month) for month in range(1, 13)])
+
+    def plan_months(self, periods):
+        """Plan the given (year, month) periods, replacing any planned before"""
+        self.tasks = {(year, month): self._plan_month(month, year) for year, month in periods}
+        self.aggregates = Aggregates.build(self.tasks.values())
+        return self.tasks
+
+    def _plan_month(self, month, year):
+        """Fixed tasks plus the flexible time blocks for every day of the month"""
+        flexible_category = FLEXIBLE_CATEGORY if FLEXIBLE_CATEGORY in self.categories else None
+        return plan_month(self.fixed_tasks, year, month, self.flexible_blocks, self.flexible_duration,
+                          flexible_category)
+
     def _populate_daily_schedule(self, ws, month, year):
         """Populate daily schedule with fixed tasks and flexible time blocks"""
-        current_row = 2
-        start_date = datetime(year, month, 1)
-        days_in_month = (datetime(year, month % 12 + 1, 1) if month < 12 
-                        else datetime(year + 1, 1, 1)) - start_date
-        
-        for day in range(days_in_month.days):
-            current_date = start_date + timedelta(days=day)
-            
-            # Add fixed tasks
-            for task, category, duration, priority in self.fixed_tasks:
-                ws.cell(row=current_row, column=1, value=current_date).number_format = 'YYYY-MM-DD'
-                ws.cell(row=current_row, column=2, value="Fixed")
-                ws.cell(row=current_row, column=3, value=duration)
-                ws.cell(row=current_row, column=4, value=task)
-                ws.cell(row=current_row, column=5, value=category)
-                ws.cell(row=current_row, column=8, value=priority)
-                current_row += 1
-            
-            # Add flexible time blocks
-            for block in range(3):  # 3 flexible time blocks of 2 hours each
-                ws.cell(row=current_row, column=1, value=current_date).number_format = 'YYYY-MM-DD'
-                ws.cell(row=current_row, column=2, value=f"Flexible Block {block + 1}")
-                ws.cell(row=current_row, column=3, value="2:00")
-                ws.cell(row=current_row, column=5, value="Flexible Tasks")
-                current_row += 1
+        tasks = self.tasks.get((year, month))
+        if tasks is None:
+            tasks = self.tasks[(year, month)] = self._plan_month(month, year)
+        write_rows(ws, tasks, date_format='YYYY-MM-DD')
+        return tasks.first_row + len(tasks) - 1
+
+    def _add_conditional_formatting(self, ws, last_row):
+        """Colour priorities and statuses with one rule per value over the task rows
+        
+        Rules keep the style table to a handful of entries however many rows
+        there are, and Excel re-applies them whenever a value is changed.
+        """
+        if last_row < 2:
+            return
+        for value, color in self.priority_colors.items():
+            ws.conditional_formatting.add(f'H2:H{last_row}', CellIsRule(
+                operator='equal', formula=[f'"{value}"'], font=Font(color=color, bold=True)))
+        for value, color in self.status_colors.items():
+            ws.conditional_formatting.add(f'F2:F{last_row}', CellIsRule(
+                operator='equal', formula=[f'"{value}"'],
+                fill=PatternFill(start_color=color, end_color=color, fill_type='solid')))
+
+    def update_task(self, ws, month, index, status, progress=None, year=None):
+        """Change the status (and optionally progress) of a month's task and its cells"""
+        tasks = self.tasks[(year or self.year, month)]
+        old = tasks.set_status(index, status)
+        if self.aggregates is not None:
+            self.aggregates.status_changed(tasks, index, old)
+        if self.events is not None:
+            self.events.status_changed(tasks, index, old)
+        if progress is not None:
+            old = tasks.set_progress(index, progress)
+            if self.aggregates is not None:
+                self.aggregates.progress_changed(tasks, index, old)
+            if self.events is not None:
+                self.events.progress_changed(tasks, index, old)
+        write_updates(ws, tasks, [index])
 
     def _create_monthly_dashboard(self, ws):
         """Create monthly dashboard with enhanced visualizations"""
@@ -141,6 +244,81 @@ class EnhancedTaskManager:
         self._add_category_progress_chart(ws, dashboard_row + 2)
         self._add_kpi_metrics(ws, dashboard_row + 2)
 
+    def _sheet_period(self, ws):
+        """The (year, month) a month sheet holds, read from its first date"""
+        first = ws.cell(row=2, column=1).value
+        return first.year, first.month
+
+    def _write_table(self, ws, row, column, headers, rows, percent_columns=()):
+        """Write a small data table for the charts; returns its last row"""
+        header_font = Font(bold=True)
+        header_fill = PatternFill(start_color='DDEBF7', end_color='DDEBF7', fill_type='solid')
+        for offset, header in enumerate(headers):
+            cell = ws.cell(row=row, column=column + offset, value=header)
+            cell.font = header_font
+            cell.fill = header_fill
+        for r, values in enumerate(rows, row + 1):
+            for offset, value in enumerate(values):
+                cell = ws.cell(row=r, column=column + offset, value=value)
+                if offset in percent_columns:
+                    cell.number_format = '0%'
+        return row + len(rows)
+
+    def _month_categories(self, ws):
+        year, month = self._sheet_period(ws)
+        totals = self.aggregates.by_category(f"{year:04d}-{month:02d}")
+        return sorted(totals.items())
+
+    def _add_task_completion_chart(self, ws, row):
+        """Tasks per status, as a table and a pie chart"""
+        year, month = self._sheet_period(ws)
+        counts = self.aggregates.by_status(f"{year:04d}-{month:02d}")
+        last = self._write_table(ws, row, 4, ["Status", "Tasks"],
+                                 [(status, counts.get(status, 0)) for status in self.status_options])
+        chart = PieChart()
+        chart.title = "Task Completion Status"
+        chart.add_data(Reference(ws, min_col=5, min_row=row, max_row=last), titles_from_data=True)
+        chart.set_categories(Reference(ws, min_col=4, min_row=row + 1, max_row=last))
+        chart.height = 6
+        ws.add_chart(chart, f"K{row}")
+
+    def _add_time_allocation_chart(self, ws, row):
+        """Planned hours per category, as a table and a pie chart"""
+        categories = self._month_categories(ws)
+        last = self._write_table(ws, row, 7, ["Category", "Planned Hours"],
+                                 [(category or "Uncategorised", totals[2] / 60)
+                                  for category, totals in categories])
+        chart = PieChart()
+        chart.title = "Time Allocation"
+        chart.add_data(Reference(ws, min_col=8, min_row=row, max_row=last), titles_from_data=True)
+        chart.set_categories(Reference(ws, min_col=7, min_row=row + 1, max_row=last))
+        chart.height = 6
+        ws.add_chart(chart, f"U{row}")
+
+    def _add_category_progress_chart(self, ws, row):
+        """Completion per category, next to the time allocation table, as a bar chart"""
+        categories = self._month_categories(ws)
+        last = self._write_table(ws, row, 9, ["Completion"],
+                                 [(totals[1] / totals[0] if totals[0] else 0.0,)
+                                  for _, totals in categories], percent_columns=(0,))
+        chart = BarChart()
+        chart.title = "Category Progress"
+        chart.y_axis.number_format = '0%'
+        chart.add_data(Reference(ws, min_col=9, min_row=row, max_row=last), titles_from_data=True)
+        chart.set_categories(Reference(ws, min_col=7, min_row=row + 1, max_row=last))
+        chart.height = 6
+        ws.add_chart(chart, f"AE{row}")
+
+    def _add_kpi_metrics(self, ws, row):
+        """The dashboard KPIs for this month"""
+        year, month = self._sheet_period(ws)
+        values = self.aggregates.kpis(f"{year:04d}-{month:02d}")
+        labels = ["Completion Rate", "Core Learning", "Personal Development",
+                  "Time Utilization", "Consistency"]
+        self._write_table(ws, row, 1, ["Metric", "Value"],
+                          [(label, values[key]) for label, key in zip(labels, KPIS)],
+                          percent_columns=(1,))
+
     def _create_weekly_progress_section(self, ws):
         """Create weekly progress tracking section"""
         weekly_row = ws.max_row + 5
@@ -152,8 +330,50 @@ class EnhancedTaskManager:
         title_cell.alignment = Alignment(horizontal='center')
         
         # Add weekly metrics and mini-charts
-        self._add_weekly_metrics(ws, weekly_row + 2)
-        self._add_weekly_charts(ws, weekly_row + 2)
+        weeks = self._add_weekly_metrics(ws, weekly_row + 2)
+        self._add_weekly_charts(ws, weekly_row + 2, weeks)
+
+    def _add_weekly_metrics(self, ws, row):
+        """ISO-week completion with rolling consistency, and per-task streaks; returns the week count
+        
+        Streaks run over the whole planned year, as of the end of this month
+        or today, whichever is earlier.
+        """
+        year, month = self._sheet_period(ws)
+        first = datetime(year, month, 1).date()
+        last = (datetime(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)).date()
+        matrix = CompletionMatrix(self.tasks.values())
+        weeks = weekly_table(matrix, first, last)
+        self._write_table(ws, row, 1, ["Week", "Planned", "Completed", "Completion",
+                                       "7-Day Consistency", "28-Day Consistency"],
+                          weeks, percent_columns=(3, 4, 5))
+        streaks = matrix.streaks(min(last, datetime.now().date()))
+        self._write_table(ws, row, 8, ["Task", "Current Streak", "Longest Streak"], streaks)
+        return len(weeks)
+
+    def _add_weekly_charts(self, ws, row, weeks):
+        """Weekly completion and rolling consistency charts over the weekly table"""
+        if not weeks:
+            return
+        last = row + weeks
+        labels = Reference(ws, min_col=1, min_row=row + 1, max_row=last)
+
+        completion_chart = BarChart()
+        completion_chart.title = "Weekly Completion"
+        completion_chart.y_axis.number_format = '0%'
+        completion_chart.add_data(Reference(ws, min_col=4, min_row=row, max_row=last), titles_from_data=True)
+        completion_chart.set_categories(labels)
+        completion_chart.height = 6
+        ws.add_chart(completion_chart, f"L{row}")
+
+        consistency_chart = LineChart()
+        consistency_chart.title = "Rolling Consistency"
+        consistency_chart.y_axis.number_format = '0%'
+        consistency_chart.add_data(Reference(ws, min_col=5, max_col=6, min_row=row, max_row=last),
+                                   titles_from_data=True)
+        consistency_chart.set_categories(labels)
+        consistency_chart.height = 6
+        ws.add_chart(consistency_chart, f"V{row}")
 
     def create_yearly_dashboard(self, wb):
         """Create comprehensive yearly dashboard"""
@@ -177,26 +397,111 @@ class EnhancedTaskManager:
             "Consistency Score"
         ]
         
-        for i, kpi in enumerate(kpis, 2):
+        if self.aggregates is None:
+            self.aggregates = Aggregates.build(self.tasks.values())
+        values = self.aggregates.kpis()
+        
+        for i, (kpi, key) in enumerate(zip(kpis, KPIS), 2):
             ws.cell(row=i, column=1, value=kpi)
-            # Add formulas for KPI calculations
-            ws.cell(row=i, column=2, value="=YOURFORMULA")  # Replace with actual formulas
+            ws.cell(row=i, column=2, value=values[key]).number_format = '0%'
 
-    def create_excel_template(self):
-        """Create the complete Excel template"""
+    def _create_yearly_trends_section(self, ws):
+        """Monthly totals in D1:G13 (kept up to date by workbook_watch.py) and their trend"""
+        rows = []
+        for year, month in sorted(self.tasks):
+            tasks, completed = self.aggregates.totals(f"{year:04d}-{month:02d}")
+            rows.append((datetime(year, month, 1).strftime("%B"), tasks, completed,
+                         completed / tasks if tasks else 0.0))
+        last = self._write_table(ws, 1, 4, ["Month", "Tasks", "Completed", "Completion"], rows,
+                                 percent_columns=(3,))
+        chart = LineChart()
+        chart.title = "Monthly Completion Trend"
+        chart.y_axis.number_format = '0%'
+        chart.add_data(Reference(ws, min_col=7, min_row=1, max_row=last), titles_from_data=True)
+        chart.set_categories(Reference(ws, min_col=4, min_row=2, max_row=last))
+        ws.add_chart(chart, "A20")
+
+    def _create_yearly_category_analysis(self, ws):
+        """Planned and completed hours per category over the year"""
+        rows = [(category or "Uncategorised", planned / 60, done / 60, completed / tasks if tasks else 0.0)
+                for category, (tasks, completed, planned, done)
+                in sorted(self.aggregates.by_category().items())]
+        last = self._write_table(ws, 1, 9, ["Category", "Planned Hours", "Completed Hours", "Completion"],
+                                 rows, percent_columns=(3,))
+        chart = BarChart()
+        chart.title = "Hours by Category"
+        chart.add_data(Reference(ws, min_col=10, max_col=11, min_row=1, max_row=last), titles_from_data=True)
+        chart.set_categories(Reference(ws, min_col=9, min_row=2, max_row=last))
+        ws.add_chart(chart, "J20")
+
+    def _create_productivity_patterns(self, ws):
+        """Completion by day of the week"""
+        matrix = CompletionMatrix(self.tasks.values())
+        rows = [(weekday, planned, completed, completed / planned if planned else 0.0)
+                for weekday, planned, completed in matrix.weekday_completion()]
+        last = self._write_table(ws, 1, 14, ["Weekday", "Planned", "Completed", "Completion"], rows,
+                                 percent_columns=(3,))
+        chart = BarChart()
+        chart.title = "Completion by Weekday"
+        chart.y_axis.number_format = '0%'
+        chart.add_data(Reference(ws, min_col=17, min_row=1, max_row=last), titles_from_data=True)
+        chart.set_categories(Reference(ws, min_col=14, min_row=2, max_row=last))
+        ws.add_chart(chart, "S20")
+
+    def create_workbook(self):
+        """Build the complete workbook in memory"""
         wb = Workbook()
         wb.remove(wb.active)  # Remove default sheet
         
+        # Plan every month up front so the dashboard can report on them
+        if not self.tasks:
+            self.plan_year()
+        
         # Create yearly dashboard
         self.create_yearly_dashboard(wb)
         
-        # Create monthly sheets
-        for month in range(1, 13):
-            self.create_monthly_sheet(wb, month)
+        # Create monthly sheets from one prepared template
+        template = SheetTemplate(wb, self._create_month_template)
+        for year, month in sorted(self.tasks):
+            self.create_monthly_sheet(wb, month, year, template=template)
+        template.discard()
+        
+        return wb
+
+    def create_excel_template(self):
+        """Create the complete Excel template"""
+        if self.writer != "openpyxl":
+            self.export()
+            return
+        wb = self.create_workbook()
         
-        # Save and backup
-        wb.save(self.filename)
-        self.create_backup()
+        # Save and backup (only a file on disk can be backed up)
+        self.save_workbook(wb)
+        if is_path(self.filename):
+            self.create_backup()
+
+    def sheets(self):
+        """The month sheets as plain tables, for the workbook_writers backends"""
+        if not self.tasks:
+            self.plan_year()
+        return [Sheet.from_tasks(datetime(year, month, 1).strftime("%B"), HEADERS, tasks,
+                                 widths=[18] * len(HEADERS), validations=self._validation_lists(),
+                                 date_format='YYYY-MM-DD')
+                for (year, month), tasks in sorted(self.tasks.items())]
+
+    def save_workbook(self, wb):
+        """Save the workbook to the configured filename"""
+        with output(self.filename) as f:
+            wb.save(f)
+        if self.aggregates is not None and is_path(self.filename):
+            self.aggregates.save(self.filename)
+
+    def export(self, target=None, writer=None):
+        """Write the month sheets with a workbook_writers backend instead of the full workbook"""
+        writer = get_writer(writer or self.writer)
+        target = with_extension(target or self.filename, writer.extension)
+        writer.write(self.sheets(), target)
+        return target
 
     def create_backup(self):
         """Create backup with timestamp"""
@@ -205,7 +510,8 @@ class EnhancedTaskManager:
             os.makedirs(backup_dir)
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_file = f"{backup_dir}/TaskManager2025_backup_{timestamp}.xlsx"
+        name = os.path.splitext(os.path.basename(self.filename))[0]
+        backup_file = f"{backup_dir}/{name}_backup_{timestamp}.xlsx"
         shutil.copy2(self.filename, backup_file)
 
 def main():
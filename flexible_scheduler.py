@@ -0,0 +1,298 @@
+"""Fill the empty flexible blocks of a task workbook from a backlog.
+
+The backlog is a CSV with a task, a priority (High, Medium or Low), an
+estimate (minutes, or H:MM) and an optional deadline (YYYY-MM-DD):
+
+    task,priority,estimate,deadline
+    Write the OSPF lab report,High,1:30,2025-03-14
+    Sort the photo archive,Low,45,
+
+Days are filled in order, each from two heaps. Items whose deadline is
+less than URGENT_DAYS away move to the urgent heap, which is ordered by
+deadline and drained first. All other items wait in a heap ordered by
+priority, then deadline. Items are packed first-fit into the day's free
+blocks, so one block can take several short items. Items longer than a
+block are split into block-sized parts, scheduled in order; an item only
+counts as scheduled, and is only written, once all of its parts are
+placed. Blocks that already have a description, or are completed, are
+left alone.
+
+Assigned items are written into the block's Task Description (joined
+with "; ") and its Priority, and the workbook is rebuilt by the generator
+whose layout it has, as rolling_workbook does:
+
+    python flexible_scheduler.py backlog.csv                      # TaskManager2025.xlsx
+    python flexible_scheduler.py backlog.csv --start 2025-03-01 --dry-run
+    python flexible_scheduler.py backlog.csv --sample 10000       # write a test backlog
+"""
+import argparse
+import csv
+import heapq
+import os
+import random
+import time
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from task_model import BLOCKS, COMPLETED, DESCRIPTIONS, PRIORITIES, TaskTable, duration_minutes
+
+PRIORITY_RANK = {"High": 0, "Medium": 1, "Low": 2}
+
+# Items due within this many days are scheduled ahead of higher priorities
+URGENT_DAYS = 7
+
+# Items a day may pass over because they do not fit before it is left partly empty
+MAX_SKIPS = 32
+
+NO_DEADLINE = date.max.toordinal()
+
+
+class BacklogItem(NamedTuple):
+    task: str
+    priority: str
+    minutes: int
+    deadline: Optional[date] = None
+
+
+class Schedule(NamedTuple):
+    """The outcome of a run: each item's day (None if unscheduled), by backlog position."""
+    items: List[BacklogItem]
+    days: List[Optional[date]]
+    blocks: int
+    free_minutes: int
+
+    @property
+    def scheduled(self) -> int:
+        return sum(day is not None for day in self.days)
+
+    @property
+    def late(self) -> List[BacklogItem]:
+        """Items scheduled after their deadline, or not at all before it."""
+        return [item for item, day in zip(self.items, self.days)
+                if item.deadline and (day is None or day > item.deadline)]
+
+
+def _estimate(value: str) -> int:
+    value = value.strip()
+    return duration_minutes(value) if ":" in value else int(value)
+
+
+def load_backlog(path: str) -> List[BacklogItem]:
+    """Read a backlog CSV; raises ValueError naming the first bad line."""
+    items = []
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames or []]
+        missing = {"task", "priority", "estimate"} - set(reader.fieldnames)
+        if missing:
+            raise ValueError(f"{path} needs the columns task, priority, estimate (and optionally deadline)")
+        for line, row in enumerate(reader, start=2):
+            try:
+                priority = row["priority"].strip().title()
+                if priority not in PRIORITY_RANK:
+                    raise ValueError(f"priority {row['priority']!r} is not High, Medium or Low")
+                minutes = _estimate(row["estimate"])
+                if minutes <= 0:
+                    raise ValueError(f"estimate {row['estimate']!r} is not a positive duration")
+                deadline = (row.get("deadline") or "").strip()
+                items.append(BacklogItem(row["task"].strip(), priority, minutes,
+                                         date.fromisoformat(deadline) if deadline else None))
+            except ValueError as e:
+                raise ValueError(f"{path} line {line}: {e}") from None
+    return items
+
+
+def free_blocks(tables: Iterable[TaskTable], start: date) -> Dict[int, List[Tuple[TaskTable, int]]]:
+    """Empty flexible blocks from `start` on, by day ordinal, in sheet order."""
+    flexible = {code for code, name in enumerate(BLOCKS.values) if name and name.startswith("Flexible")}
+    first = start.toordinal()
+    days: Dict[int, List[Tuple[TaskTable, int]]] = {}
+    for table in tables:
+        for i in range(len(table)):
+            if (table.block[i] in flexible and not table.description[i]
+                    and table.status[i] != COMPLETED and table.day[i] >= first):
+                days.setdefault(table.day[i], []).append((table, i))
+    return days
+
+
+def split_items(items: List[BacklogItem], size: int) -> Tuple[List[BacklogItem], List[int]]:
+    """Items no longer than `size` minutes, and the backlog position each part came from."""
+    parts, origin = [], []
+    for position, item in enumerate(items):
+        count = -(-item.minutes // size)
+        for part in range(count):
+            minutes = min(size, item.minutes - part * size)
+            task = item.task if count == 1 else f"{item.task} ({part + 1}/{count})"
+            parts.append(item._replace(task=task, minutes=minutes))
+            origin.append(position)
+    return parts, origin
+
+
+def _place(days: Dict[int, List[Tuple[TaskTable, int]]], items: List[BacklogItem], capacity: int):
+    """One placement pass: (parts, the item each came from, each part's day, every block's parts)."""
+    parts, origin = split_items(items, capacity)
+    deadlines = [item.deadline.toordinal() if item.deadline else NO_DEADLINE for item in parts]
+    ranks = [PRIORITY_RANK[item.priority] for item in parts]
+    shortest = min((item.minutes for item in parts), default=capacity)
+
+    # Parts of one item keep their order: a part is only offered once the one before it is placed
+    first_parts = {p for p in range(len(parts)) if p == 0 or origin[p - 1] != origin[p]}
+    normal = [(ranks[p], deadlines[p], p) for p in first_parts]
+    heapq.heapify(normal)
+    by_deadline = sorted((deadlines[p], p) for p in range(len(parts)) if deadlines[p] != NO_DEADLINE)
+    urgent: List[Tuple[int, int, int]] = []
+    waiting: Dict[int, Tuple[int, int, int]] = {}  # urgent part, by the part it waits for
+    next_due = 0
+    part_days: List[Optional[int]] = [None] * len(parts)
+    filled = []
+
+    def place(p: int, day: int):
+        part_days[p] = day
+        following = p + 1
+        if following < len(parts) and origin[following] == origin[p]:
+            heapq.heappush(normal, (ranks[following], deadlines[following], following))
+            if p in waiting:
+                heapq.heappush(urgent, waiting.pop(p))
+
+    for day in sorted(days):
+        while next_due < len(by_deadline) and by_deadline[next_due][0] - day < URGENT_DAYS:
+            p = by_deadline[next_due][1]
+            heapq.heappush(urgent, (deadlines[p], ranks[p], p))
+            next_due += 1
+        blocks = [[table, i, table.minutes[i], []] for table, i in days[day]]
+        skipped = []
+        for heap in (urgent, normal):
+            while heap and len(skipped) < MAX_SKIPS and max(block[2] for block in blocks) >= shortest:
+                entry = heapq.heappop(heap)
+                p = entry[2]
+                if part_days[p] is not None:
+                    continue  # already placed from the other heap
+                if p not in first_parts and part_days[p - 1] is None:
+                    waiting[p - 1] = entry
+                    continue
+                block = next((block for block in blocks if block[2] >= parts[p].minutes), None)
+                if block is None:
+                    skipped.append((heap, entry))
+                    continue
+                block[2] -= parts[p].minutes
+                block[3].append(p)
+                place(p, day)
+        for heap, entry in skipped:
+            heapq.heappush(heap, entry)
+        filled.append(blocks)
+    return parts, origin, part_days, [block for blocks in filled for block in blocks]
+
+
+def schedule(tables: Iterable[TaskTable], items: List[BacklogItem],
+             start: Optional[date] = None) -> Schedule:
+    """Assign backlog items to the free flexible blocks of the tables, updating them in place.
+
+    Items that only partly fit are left unscheduled, and placement runs
+    again without them so the time they held goes to other items.
+    """
+    days = free_blocks(tables, start or date.today())
+    capacity = max((table.minutes[i] for blocks in days.values() for table, i in blocks), default=0)
+    if not capacity:
+        return Schedule(items, [None] * len(items), 0, 0)
+
+    candidates = list(range(len(items)))  # backlog positions still being placed
+    while True:
+        parts, origin, part_days, filled = _place(days, [items[n] for n in candidates], capacity)
+        complete = [True] * len(candidates)
+        placed = [False] * len(candidates)
+        for p, day in enumerate(part_days):
+            if day is None:
+                complete[origin[p]] = False
+            else:
+                placed[origin[p]] = True
+        partial = {n for n in range(len(candidates)) if placed[n] and not complete[n]}
+        if not partial:
+            break
+        candidates = [position for n, position in enumerate(candidates) if n not in partial]
+
+    # An item is scheduled on the day its last part is
+    item_days: List[Optional[date]] = [None] * len(items)
+    for p, day in enumerate(part_days):
+        if day is not None:
+            item_days[candidates[origin[p]]] = date.fromordinal(day)
+
+    free_minutes = 0
+    for table, i, remaining, assigned in filled:
+        free_minutes += remaining
+        if assigned:
+            table.description[i] = DESCRIPTIONS.code("; ".join(parts[p].task for p in assigned))
+            table.priority[i] = PRIORITIES.code(min((parts[p].priority for p in assigned),
+                                                    key=PRIORITY_RANK.get))
+    return Schedule(items, item_days, sum(map(len, days.values())), free_minutes)
+
+
+def write_sample(path: str, items: int, start: date, seed: int = 0):
+    """A synthetic backlog: mixed priorities and estimates, a third with deadlines in the next year."""
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["task", "priority", "estimate", "deadline"])
+        for n in range(items):
+            deadline = start + timedelta(days=rng.randrange(365)) if rng.random() < 0.3 else None
+            writer.writerow([f"Backlog item {n + 1}", rng.choice(list(PRIORITY_RANK)),
+                             rng.choice([15, 30, 45, 60, 90, 150, 240]),
+                             deadline.isoformat() if deadline else ""])
+
+
+def main():
+    from batch_generate import GENERATORS, detect_generator, generator_class
+    from rolling_workbook import workbook_months
+
+    parser = argparse.ArgumentParser(description="Fill a workbook's empty flexible blocks from a backlog.")
+    parser.add_argument("backlog", help="CSV with task, priority, estimate and deadline columns")
+    parser.add_argument("--workbook", default="TaskManager2025.xlsx",
+                        help="workbook to fill (a new year is planned if it does not exist)")
+    parser.add_argument("--generator", choices=GENERATORS,
+                        help="generator that rebuilds the workbook (default: the one whose layout it has, "
+                             "or enhanced for a new workbook)")
+    parser.add_argument("--year", type=int, default=date.today().year, help="year planned for a new workbook")
+    parser.add_argument("--start", type=date.fromisoformat, help="first day filled (default: today)")
+    parser.add_argument("--dry-run", action="store_true", help="report the schedule without saving")
+    parser.add_argument("--sample", type=int, metavar="ITEMS", help="write a synthetic BACKLOG of this many items")
+    args = parser.parse_args()
+
+    start = args.start or date.today()
+    if args.sample:
+        write_sample(args.backlog, args.sample, start)
+        print(f"Wrote {args.sample:,} backlog items to {args.backlog}")
+        return
+
+    items = load_backlog(args.backlog)
+    exists = os.path.exists(args.workbook)
+    generator = args.generator
+    if generator is None and exists:
+        generator = detect_generator(args.workbook)
+        if generator is None:
+            parser.error(f"{args.workbook} has no month sheets in a layout the generators write")
+    manager = generator_class(generator or "enhanced")(args.workbook, year=args.year)
+    if exists:
+        months = workbook_months(args.workbook)
+    else:
+        months = manager.plan_months([(args.year, month) for month in range(1, 13)])
+
+    begin = time.perf_counter()
+    result = schedule(months.values(), items, start)
+    elapsed = time.perf_counter() - begin
+
+    late = result.late
+    print(f"Scheduled {result.scheduled:,} of {len(items):,} items into {result.blocks:,} free blocks "
+          f"in {elapsed * 1000:.0f} ms ({result.free_minutes / 60:,.0f} hours left free)")
+    print(f"{len(late):,} items miss their deadline")
+    for item in late[:10]:
+        print(f"  {item.deadline}  {item.priority:<7}{item.task}")
+    if args.dry_run or not result.scheduled:
+        return
+
+    manager.tasks = months
+    manager.aggregates = None
+    manager.save_workbook(manager.create_workbook())
+    print(f"Saved {args.workbook}")
+
+
+if __name__ == "__main__":
+    main()
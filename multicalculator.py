@@ -1,7 +1,10 @@
 import math
-from typing import List, Union, Dict, Callable
+from typing import List, Union, Dict, Callable, Optional
 from dataclasses import dataclass
 
+from calculator_cache import ResultCache, cache_from_env
+from calculator_cost import DEFAULT_MAX_POWER_BITS, guarded_power
+
 @dataclass
 class Operation:
     """Defines a calculator operation with its requirements and function."""
@@ -13,8 +16,18 @@ class Operation:
 class Calculator:
     """Advanced calculator with multiple mathematical operations."""
     
-    def __init__(self):
-        """Initialize calculator with available operations."""
+    def __init__(self, max_power_bits: float = DEFAULT_MAX_POWER_BITS, on_overflow: str = "log",
+                 cache: Optional[ResultCache] = None):
+        """Initialize calculator with available operations.
+
+        Powers estimated above max_power_bits are not computed exactly;
+        on_overflow chooses between a log-scale result ("log") and an
+        error message ("refuse"). With a cache, factorial, power and log
+        results are kept on disk and reused by later sessions.
+        """
+        self.max_power_bits = max_power_bits
+        self.on_overflow = on_overflow
+        self.cache = cache
         self.operations: Dict[str, Operation] = {
             '1.sum': Operation(
                 lambda nums: sum(nums),
@@ -46,8 +59,9 @@ class Calculator:
                 1, float('inf'), "Find the minimum number"
             ),
             '8.power': Operation(
-                lambda nums: nums[0] ** nums[1],
-                2, 2, "Raise first number to power of second"
+                lambda nums: guarded_power(*nums, max_bits=self.max_power_bits,
+                                           on_overflow=self.on_overflow),
+                2, 3, "Raise first number to power of second (optional third: modulus)"
             ),
             '9.sqrt': Operation(
                 lambda nums: math.sqrt(nums[0]) if nums[0] >= 0 
@@ -91,7 +105,11 @@ class Calculator:
             return validation_error
 
         try:
-            return self.operations[operation].func(numbers)
+            func = self.operations[operation].func
+            if self.cache is None:
+                return func(numbers)
+            return self.cache.calculate(operation, numbers, lambda: func(numbers),
+                                        context=f"{self.max_power_bits!r}:{self.on_overflow}")
         except Exception as e:
             return f"Error: {str(e)}"
 
@@ -114,7 +132,7 @@ def get_numbers() -> Union[List[float], str]:
 
 def main():
     """Main program loop."""
-    calculator = Calculator()
+    calculator = Calculator(cache=cache_from_env())
     empty_input_count = 0
     
     print("Welcome to the Advanced Calculator!")
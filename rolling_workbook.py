@@ -0,0 +1,146 @@
+"""Keep one live task workbook rolling forward instead of one file per year.
+
+Each run reads the task rows of every month sheet and keeps a window of
+`keep` months ending `ahead` months after the current one. Months missing
+from the window after the last one already in the workbook are planned,
+so it has no gaps, and every month before the window is moved into an
+archive next to the workbook ("TaskManager2025.xlsx" archives to
+"TaskManager2025.archive.csv.gz").
+The workbook is then rebuilt by its generator from the kept months, so
+statuses, progress and notes carry over and the dashboards cover the
+months that are live. However long it is used, it never holds more than
+`keep` month sheets.
+
+Month sheets keep their plain month names ("January"), which the other
+tools look for; the year comes from the dates in each sheet. That is why
+`keep` is at most 12.
+
+The archive is a gzip CSV in the month-sheet layout, with one gzip member
+appended per run, so archiving never rewrites what is already there.
+"""
+import argparse
+import csv
+import gzip
+import io
+import os
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+from batch_generate import GENERATORS, generator_class
+from task_aggregates import read_month_tables
+from task_model import HEADERS, TaskTable, read_rows
+
+Period = Tuple[int, int]
+
+
+def archive_path(workbook: str) -> str:
+    return os.path.splitext(workbook)[0] + ".archive.csv.gz"
+
+
+def _add_months(period: Period, months: int) -> Period:
+    index = period[0] * 12 + period[1] - 1 + months
+    return index // 12, index % 12 + 1
+
+
+def workbook_months(workbook: str) -> Dict[Period, TaskTable]:
+    """Task rows of every month sheet, keyed by the (year, month) of their dates."""
+    months = {}
+    for name, table in read_month_tables(workbook).items():
+        if len(table):
+            first = date.fromordinal(table.day[0])
+            months[(first.year, first.month)] = table
+    return months
+
+
+def archive_months(path: str, months: Dict[Period, TaskTable]):
+    """Append month tables to the archive as one gzip member."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if not os.path.exists(path):
+        writer.writerow(HEADERS)
+    for _, table in sorted(months.items()):
+        for row in table.rows():
+            writer.writerow([row[0].date().isoformat()] + ["" if v is None else v for v in row[1:]])
+    with gzip.open(path, "at", encoding="utf-8", newline="") as f:
+        f.write(buffer.getvalue())
+
+
+def read_archive(path: str) -> Dict[Period, TaskTable]:
+    """Every archived month, keyed by (year, month)."""
+    by_period: Dict[Period, List[Tuple]] = {}
+    with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            day = datetime.fromisoformat(row[0])
+            by_period.setdefault((day.year, day.month), []).append(
+                (day,) + tuple(value or None for value in row[1:]))
+    return {period: read_rows(rows) for period, rows in sorted(by_period.items())}
+
+
+def roll(path: str, generator: str = "enhanced", ahead: int = 2, keep: int = 12,
+         today: Optional[date] = None, **options) -> Tuple[List[Period], List[Period]]:
+    """Bring the workbook up to date; returns the months added and the months archived.
+
+    `options` are passed to the generator (fixed_tasks, categories, ...).
+    """
+    if not 1 <= keep <= 12:
+        raise ValueError("keep must be between 1 and 12 months, as month sheets are named by month")
+    if ahead >= keep:
+        raise ValueError("ahead must be smaller than keep, or the current month would be archived")
+    today = today or date.today()
+    current = (today.year, today.month)
+    months = workbook_months(path) if os.path.exists(path) else {}
+
+    manager = generator_class(generator)(path, year=today.year, **options)
+    # The window ends at the last planned month, which may be further out than `ahead`
+    # if an earlier run planned more, so no two kept months share a sheet name
+    last = max([_add_months(current, ahead)] + list(months))
+    first = _add_months(last, 1 - keep)
+    start = max(first, _add_months(max(months), 1)) if months else max(first, current)
+    added = []
+    period = start
+    while period <= last:
+        if period not in months:
+            added.append(period)
+        period = _add_months(period, 1)
+    for year, month in added:
+        months[(year, month)] = manager.plan_months([(year, month)])[(year, month)]
+
+    archived = [period for period in sorted(months) if period < first]
+    if current in archived:
+        raise ValueError(f"{path} has months planned more than {keep - 1} months ahead; "
+                         "rolling would archive the current month")
+    if not added and not archived:
+        return added, archived
+    if archived:
+        archive_months(archive_path(path), {period: months.pop(period) for period in archived})
+
+    manager.tasks = months
+    manager.aggregates = None
+    manager.save_workbook(manager.create_workbook())
+    return added, archived
+
+
+def _describe(periods: List[Period]) -> str:
+    return ", ".join(f"{year}-{month:02d}" for year, month in periods) or "none"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Roll a task workbook forward, archiving old months.")
+    parser.add_argument("path", nargs="?", default="TaskManager2025.xlsx")
+    parser.add_argument("--generator", choices=GENERATORS, default="enhanced")
+    parser.add_argument("--ahead", type=int, default=2, help="months planned beyond the current one")
+    parser.add_argument("--keep", type=int, default=12, help="most month sheets kept in the workbook")
+    parser.add_argument("--today", type=date.fromisoformat, help="roll as of this date (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    added, archived = roll(args.path, args.generator, args.ahead, args.keep, args.today)
+    print(f"Added months: {_describe(added)}")
+    print(f"Archived months: {_describe(archived)}"
+          + (f" (to {archive_path(args.path)})" if archived else ""))
+    print(f"{os.path.getsize(args.path) / 1024:.0f} KB: {args.path}")
+
+
+if __name__ == "__main__":
+    main()
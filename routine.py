@@ -12,6 +12,8 @@ import os
 import schedule
 from plyer import notification
 
+from sheet_templates import SheetTemplate
+
 class EnhancedTaskManager:
     def __init__(self, filename="TaskManager2025.xlsx"):
         self.filename = filename
@@ -42,11 +44,37 @@ class EnhancedTaskManager:
         backup_file = f"{backup_dir}/TaskManager2025_backup_{timestamp}.xlsx"
         shutil.copy2(self.filename, backup_file)
         
-    def create_monthly_sheet(self, wb, month, year=2025):
+    def create_monthly_sheet(self, wb, month, year=2025, template=None):
         """Create a sheet for a specific month"""
         month_name = datetime(year, month, 1).strftime("%B")
-        ws = wb.create_sheet(month_name)
+        if template is None:
+            template = SheetTemplate(wb, self._create_month_template)
+            ws = template.clone(month_name)
+            template.discard()
+        else:
+            ws = template.clone(month_name)
+        
+        # Pre-fill dates for the month
+        start_date = datetime(year, month, 1)
+        next_month = month + 1 if month < 12 else 1
+        next_year = year if month < 12 else year + 1
+        end_date = datetime(next_year, next_month, 1) - timedelta(days=1)
         
+        current_date = start_date
+        row = 2
+        while current_date <= end_date:
+            ws.cell(row=row, column=1, value=current_date).number_format = 'YYYY-MM-DD'
+            ws.cell(row=row, column=2, value='09:00').number_format = 'HH:MM'
+            row += 1
+            current_date += timedelta(days=1)
+            
+        # Add progress dashboard
+        self._create_progress_dashboard(ws, row + 2)
+        
+        return ws
+    
+    def _create_month_template(self, ws):
+        """Set up the styled header row and validations shared by every month"""
         # Define headers
         headers = [
             'Date',
@@ -82,25 +110,6 @@ class EnhancedTaskManager:
         
         # Add data validations
         self._add_data_validations(ws)
-        
-        # Pre-fill dates for the month
-        start_date = datetime(year, month, 1)
-        next_month = month + 1 if month < 12 else 1
-        next_year = year if month < 12 else year + 1
-        end_date = datetime(next_year, next_month, 1) - timedelta(days=1)
-        
-        current_date = start_date
-        row = 2
-        while current_date <= end_date:
-            ws.cell(row=row, column=1, value=current_date).number_format = 'YYYY-MM-DD'
-            ws.cell(row=row, column=2, value='09:00').number_format = 'HH:MM'
-            row += 1
-            current_date += timedelta(days=1)
-            
-        # Add progress dashboard
-        self._create_progress_dashboard(ws, row + 2)
-        
-        return ws
     
     def _add_data_validations(self, ws):
         """Add data validations to the worksheet"""
@@ -160,20 +169,28 @@ class EnhancedTaskManager:
         # Add chart to worksheet
         ws.add_chart(chart, f"K{row}")
     
-    def create_excel_template(self):
-        """Create the main Excel template"""
+    def create_workbook(self):
+        """Build the workbook in memory"""
         wb = Workbook()
         
         # Remove default sheet
         wb.remove(wb.active)
         
-        # Create monthly sheets
+        # Create monthly sheets from one prepared template
+        template = SheetTemplate(wb, self._create_month_template)
         for month in range(1, 13):
-            self.create_monthly_sheet(wb, month)
+            self.create_monthly_sheet(wb, month, template=template)
+        template.discard()
         
         # Create summary dashboard
         self._create_summary_dashboard(wb)
         
+        return wb
+    
+    def create_excel_template(self):
+        """Create the main Excel template"""
+        wb = self.create_workbook()
+        
         # Save the workbook
         wb.save(self.filename)
         
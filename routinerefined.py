@@ -3,145 +3,120 @@ from openpyxl.styles import PatternFill, Font, Alignment
 from openpyxl.worksheet.datavalidation import DataValidation
 from datetime import datetime, timedelta
 import calendar
+import itertools
 
-def create_task_workbook():
+from sheet_templates import SheetTemplate
+from workbook_writers import Sheet, get_writer, output, with_extension
+
+HEADERS = ['Date', 'Day', 'Week', 'Task Description', 'Status', 'Priority', 'Category', 'Due Time', 'Notes']
+COLUMN_WIDTHS = [15, 12, 8, 40, 15, 10, 15, 10, 40]
+
+# Dropdown options per column
+VALIDATIONS = {
+    'E': ["Not Started", "In Progress", "Completed", "Delayed", "Cancelled"],
+    'F': ["High", "Medium", "Low"],
+    'G': ["Work", "Personal", "Health", "Family", "Finance", "Education", "Other"]
+}
+
+# Recurring tasks templates
+DAILY_TASKS = [
+    ("Daily Team Standup", "High", "Work", "09:00"),
+    ("Check Emails", "Medium", "Work", "09:30"),
+    ("Review Tasks", "Medium", "Work", "17:00")
+]
+
+WEEKLY_TASKS = [
+    ("Team Meeting", "High", "Work", "14:00"),
+    ("Weekly Report", "High", "Work", "16:00"),
+    ("Planning Session", "Medium", "Work", "10:00")
+]
+
+MONTHLY_TASKS = [
+    ("Monthly Review", "High", "Work", "15:00"),
+    ("Budget Update", "High", "Finance", "11:00"),
+    ("Team Assessment", "Medium", "Work", "14:00")
+]
+
+def month_rows(year, month):
+    """Task rows for a month: daily tasks, weekly tasks on Mondays, monthly tasks on the 1st"""
+    num_days = calendar.monthrange(year, month)[1]
+    for day in range(1, num_days + 1):
+        date = datetime(year, month, day)
+        tasks = DAILY_TASKS
+        if date.weekday() == 0:  # Monday
+            tasks = tasks + WEEKLY_TASKS
+        if day == 1:
+            tasks = tasks + MONTHLY_TASKS
+        for task, priority, category, time in tasks:
+            yield (date, date.strftime('%A'), date.isocalendar()[1], task, "Not Started",
+                   priority, category, time)
+
+def task_sheets(year=2024):
+    """The Tasks sheet and month sheets as plain tables, for the workbook_writers backends"""
+    def sheet(title, rows):
+        return Sheet(title, HEADERS, rows, widths=COLUMN_WIDTHS, validations=VALIDATIONS)
+    sheets = [sheet("Tasks", itertools.chain.from_iterable(
+        month_rows(year, month) for month in range(1, 13)))]
+    for month in range(1, 13):
+        sheets.append(sheet(calendar.month_name[month], month_rows(year, month)))
+    return sheets
+
+def create_task_workbook(filename='Task_Management_2024.xlsx', writer='openpyxl', year=2024):
+    if writer != 'openpyxl':
+        writer = get_writer(writer)
+        writer.write(task_sheets(year), with_extension(filename, writer.extension))
+        return
+    
     wb = Workbook()
     
     # Create the main worksheet
     ws = wb.active
     ws.title = "Tasks"
     
-    # Define headers
-    headers = ['Date', 'Day', 'Week', 'Task Description', 'Status', 'Priority', 'Category', 'Due Time', 'Notes']
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col)
-        cell.value = header
-        cell.font = Font(bold=True)
-    
     # Set up dropdown validations
     def create_data_validation(type, formula1):
         return DataValidation(type=type, formula1=formula1, allow_blank=True)
 
-    status_dv = create_data_validation("list", '"Not Started,In Progress,Completed,Delayed,Cancelled"')
-    priority_dv = create_data_validation("list", '"High,Medium,Low"')
-    category_dv = create_data_validation("list", '"Work,Personal,Health,Family,Finance,Education,Other"')
+    # Headers, validations and column widths shared by the main and monthly worksheets
+    def setup_sheet(sheet):
+        for col, header in enumerate(HEADERS, 1):
+            cell = sheet.cell(row=1, column=col)
+            cell.value = header
+            cell.font = Font(bold=True)
+        
+        for column, options in VALIDATIONS.items():
+            dv = create_data_validation("list", f'"{",".join(options)}"')
+            sheet.add_data_validation(dv)
+            dv.add(f'{column}2:{column}1000')
+        
+        for i, width in enumerate(COLUMN_WIDTHS, 1):
+            sheet.column_dimensions[chr(64 + i)].width = width
     
-    # Add validations to the main worksheet
-    ws.add_data_validation(status_dv)
-    ws.add_data_validation(priority_dv)
-    ws.add_data_validation(category_dv)
-    status_dv.add('E2:E1000')
-    priority_dv.add('F2:F1000')
-    category_dv.add('G2:G1000')
+    setup_sheet(ws)
     
-    # Set column widths
-    column_widths = [15, 12, 8, 40, 15, 10, 15, 10, 40]
-    for i, width in enumerate(column_widths, 1):
-        ws.column_dimensions[chr(64 + i)].width = width
+    # Monthly worksheets are cloned from one prepared copy of that layout
+    template = SheetTemplate(wb, setup_sheet)
     
     # Generate dates for the year
     current_row = 2
-    year = 2024
-    
-    # Recurring tasks templates
-    daily_tasks = [
-        ("Daily Team Standup", "High", "Work", "09:00"),
-        ("Check Emails", "Medium", "Work", "09:30"),
-        ("Review Tasks", "Medium", "Work", "17:00")
-    ]
-    
-    weekly_tasks = [
-        ("Team Meeting", "High", "Work", "14:00"),
-        ("Weekly Report", "High", "Work", "16:00"),
-        ("Planning Session", "Medium", "Work", "10:00")
-    ]
-    
-    monthly_tasks = [
-        ("Monthly Review", "High", "Work", "15:00"),
-        ("Budget Update", "High", "Finance", "11:00"),
-        ("Team Assessment", "Medium", "Work", "14:00")
-    ]
     
     for month in range(1, 13):
-        # Create monthly worksheet
-        monthly_ws = wb.create_sheet(title=calendar.month_name[month])
-        
-        # Copy headers to monthly worksheet
-        for col, header in enumerate(headers, 1):
-            cell = monthly_ws.cell(row=1, column=col)
-            cell.value = header
-            cell.font = Font(bold=True)
-        
-        # Create new data validations for the monthly worksheet
-        monthly_status_dv = create_data_validation("list", '"Not Started,In Progress,Completed,Delayed,Cancelled"')
-        monthly_priority_dv = create_data_validation("list", '"High,Medium,Low"')
-        monthly_category_dv = create_data_validation("list", '"Work,Personal,Health,Family,Finance,Education,Other"')
-        
-        # Add validations to the monthly worksheet
-        monthly_ws.add_data_validation(monthly_status_dv)
-        monthly_ws.add_data_validation(monthly_priority_dv)
-        monthly_ws.add_data_validation(monthly_category_dv)
-        monthly_status_dv.add('E2:E1000')
-        monthly_priority_dv.add('F2:F1000')
-        monthly_category_dv.add('G2:G1000')
-        
-        # Set column widths for the monthly worksheet
-        for i, width in enumerate(column_widths, 1):
-            monthly_ws.column_dimensions[chr(64 + i)].width = width
-        
-        # Fill dates for the month
-        num_days = calendar.monthrange(year, month)[1]
+        # Create monthly worksheet with headers, validations and column widths
+        monthly_ws = template.clone(calendar.month_name[month])
         monthly_row = 2
         
-        for day in range(1, num_days + 1):
-            date = datetime(year, month, day)
-            
-            # Add daily tasks
-            for task, priority, category, time in daily_tasks:
-                for ws in [ws, monthly_ws]:
-                    ws.cell(row=current_row, column=1, value=date)
-                    ws.cell(row=current_row, column=2, value=date.strftime('%A'))
-                    ws.cell(row=current_row, column=3, value=date.isocalendar()[1])
-                    ws.cell(row=current_row, column=4, value=task)
-                    ws.cell(row=current_row, column=5, value="Not Started")
-                    ws.cell(row=current_row, column=6, value=priority)
-                    ws.cell(row=current_row, column=7, value=category)
-                    ws.cell(row=current_row, column=8, value=time)
-                current_row += 1
-                monthly_row += 1
-            
-            # Add weekly tasks for Mondays
-            if date.weekday() == 0:  # Monday
-                for task, priority, category, time in weekly_tasks:
-                    for ws in [ws, monthly_ws]:
-                        ws.cell(row=current_row, column=1, value=date)
-                        ws.cell(row=current_row, column=2, value=date.strftime('%A'))
-                        ws.cell(row=current_row, column=3, value=date.isocalendar()[1])
-                        ws.cell(row=current_row, column=4, value=task)
-                        ws.cell(row=current_row, column=5, value="Not Started")
-                        ws.cell(row=current_row, column=6, value=priority)
-                        ws.cell(row=current_row, column=7, value=category)
-                        ws.cell(row=current_row, column=8, value=time)
-                    current_row += 1
-                    monthly_row += 1
-            
-            # Add monthly tasks for first day of the month
-            if day == 1:
-                for task, priority, category, time in monthly_tasks:
-                    for ws in [ws, monthly_ws]:
-                        ws.cell(row=current_row, column=1, value=date)
-                        ws.cell(row=current_row, column=2, value=date.strftime('%A'))
-                        ws.cell(row=current_row, column=3, value=date.isocalendar()[1])
-                        ws.cell(row=current_row, column=4, value=task)
-                        ws.cell(row=current_row, column=5, value="Not Started")
-                        ws.cell(row=current_row, column=6, value=priority)
-                        ws.cell(row=current_row, column=7, value=category)
-                        ws.cell(row=current_row, column=8, value=time)
-                    current_row += 1
-                    monthly_row += 1
+        for row in month_rows(year, month):
+            for ws in [ws, monthly_ws]:
+                for col, value in enumerate(row, 1):
+                    ws.cell(row=current_row, column=col, value=value)
+            current_row += 1
+            monthly_row += 1
+    
+    template.discard()
     
     # Save the workbook
-    wb.save('Task_Management_2024.xlsx')
+    with output(filename) as f:
+        wb.save(f)
 
 if __name__ == "__main__":
     create_task_workbook()
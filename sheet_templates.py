@@ -0,0 +1,51 @@
+from copy import copy
+from typing import Callable
+
+from openpyxl.workbook import Workbook
+from openpyxl.worksheet.worksheet import Worksheet
+
+
+def clone_worksheet(wb: Workbook, template: Worksheet, title: str) -> Worksheet:
+    """Copy a prepared sheet, including the parts copy_worksheet leaves out.
+
+    openpyxl's copy_worksheet copies cells, styles and dimensions but not
+    data validations or conditional formatting, so those are carried over
+    here.
+    """
+    ws = wb.copy_worksheet(template)
+    ws.title = title
+    for dv in template.data_validations.dataValidation:
+        ws.add_data_validation(copy(dv))
+    for cf_range in template.conditional_formatting:
+        for rule in cf_range.rules:
+            ws.conditional_formatting.add(cf_range.sqref, copy(rule))
+    return ws
+
+
+class SheetTemplate:
+    """A sheet prepared once and cloned for every month.
+
+    `build(ws)` lays out what is the same in every month: header row, column
+    widths, fills, borders and data validations. Rows are left to the caller,
+    since every data row carries a date. The template is built on first use;
+    call discard() once all months are cloned so it does not end up in the
+    saved workbook.
+    """
+
+    def __init__(self, wb: Workbook, build: Callable[[Worksheet], None],
+                 title: str = "Month Template"):
+        self.wb = wb
+        self.build = build
+        self.title = title
+        self.sheet: Worksheet = None
+
+    def clone(self, title: str) -> Worksheet:
+        if self.sheet is None:
+            self.sheet = self.wb.create_sheet(self.title)
+            self.build(self.sheet)
+        return clone_worksheet(self.wb, self.sheet, title)
+
+    def discard(self):
+        if self.sheet is not None:
+            self.wb.remove(self.sheet)
+            self.sheet = None
@@ -0,0 +1,294 @@
+"""Dashboard totals kept up to date one status change at a time.
+
+Aggregates holds task counts and minutes by (month, category, status,
+priority), task counts by (month, progress), and tasks and completed tasks
+per day, with a running count of consistent days. Changing a task's status
+or progress moves one task between two groups and adjusts its day, so it
+costs the same however many rows the workbook has. KPIs are then summed
+over the groups, a few hundred at most, instead of every task row.
+
+The totals are saved next to the workbook ("TaskManager2025.xlsx" keeps
+them in "TaskManager2025.aggregates.json") together with the workbook's
+size and modification time. If the workbook was saved by something else
+since, the file is stale and must be rebuilt, which reads every month
+sheet:
+
+    python task_aggregates.py TaskManager2025.xlsx            # totals and KPIs
+    python task_aggregates.py TaskManager2025.xlsx --rebuild  # full recompute
+    python task_aggregates.py TaskManager2025.xlsx --check    # incremental vs full
+"""
+import argparse
+import calendar
+import json
+import os
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from task_model import (CATEGORIES, COMPLETED, CONSISTENCY_THRESHOLD, HEADERS, KPIS, PRIORITIES,
+                        PROGRESS, STATUSES, TaskTable, read_rows)
+
+AGGREGATES_VERSION = 1
+
+# Group key: (period "YYYY-MM", category, status, priority); blanks are ""
+GroupKey = Tuple[str, str, str, str]
+
+
+def sidecar_path(workbook: str) -> str:
+    return os.path.splitext(workbook)[0] + ".aggregates.json"
+
+
+def _period(ordinal: int) -> str:
+    day = date.fromordinal(ordinal)
+    return f"{day.year:04d}-{day.month:02d}"
+
+
+def _consistent(day: List[int]) -> bool:
+    return day[0] > 0 and day[1] / day[0] >= CONSISTENCY_THRESHOLD
+
+
+class Aggregates:
+    """Materialized totals over a set of task tables."""
+
+    def __init__(self):
+        self.groups: Dict[GroupKey, List[int]] = {}          # key -> [tasks, minutes]
+        self.progress: Dict[Tuple[str, str], int] = {}       # (period, progress) -> tasks
+        self.days: Dict[int, List[int]] = {}                 # ordinal -> [tasks, completed]
+        self.consistent_days = 0
+
+    @classmethod
+    def build(cls, tables: Iterable[TaskTable]) -> "Aggregates":
+        """Full recompute from the task tables."""
+        aggregates = cls()
+        for table in tables:
+            aggregates.add_table(table)
+        return aggregates
+
+    def add_table(self, table: TaskTable):
+        for i in range(len(table)):
+            self._add_task(table, i, 1)
+
+    def _add_task(self, table: TaskTable, i: int, sign: int):
+        period = _period(table.day[i])
+        self._add_group((period, CATEGORIES.values[table.category[i]] or "",
+                         STATUSES.values[table.status[i]] or "",
+                         PRIORITIES.values[table.priority[i]] or ""),
+                        sign, sign * table.minutes[i])
+        self._add_progress((period, PROGRESS.values[table.progress[i]] or ""), sign)
+        self._add_day(table.day[i], sign, sign * (table.status[i] == COMPLETED))
+
+    def _add_group(self, key: GroupKey, tasks: int, minutes: int):
+        group = self.groups.setdefault(key, [0, 0])
+        group[0] += tasks
+        group[1] += minutes
+        if not group[0]:
+            del self.groups[key]
+
+    def _add_progress(self, key: Tuple[str, str], tasks: int):
+        count = self.progress.get(key, 0) + tasks
+        if count:
+            self.progress[key] = count
+        else:
+            self.progress.pop(key, None)
+
+    def _add_day(self, ordinal: int, tasks: int, completed: int):
+        day = self.days.setdefault(ordinal, [0, 0])
+        before = _consistent(day)
+        day[0] += tasks
+        day[1] += completed
+        self.consistent_days += _consistent(day) - before
+        if not day[0]:
+            del self.days[ordinal]
+
+    def status_changed(self, table: TaskTable, i: int, old: int):
+        """Apply a status change of row i, given the status code it had before."""
+        new = table.status[i]
+        if new == old:
+            return
+        period = _period(table.day[i])
+        category = CATEGORIES.values[table.category[i]] or ""
+        priority = PRIORITIES.values[table.priority[i]] or ""
+        minutes = table.minutes[i]
+        self._add_group((period, category, STATUSES.values[old] or "", priority), -1, -minutes)
+        self._add_group((period, category, STATUSES.values[new] or "", priority), 1, minutes)
+        if (old == COMPLETED) != (new == COMPLETED):
+            self._add_day(table.day[i], 0, 1 if new == COMPLETED else -1)
+
+    def progress_changed(self, table: TaskTable, i: int, old: int):
+        """Apply a progress change of row i, given the progress code it had before."""
+        new = table.progress[i]
+        if new != old:
+            period = _period(table.day[i])
+            self._add_progress((period, PROGRESS.values[old] or ""), -1)
+            self._add_progress((period, PROGRESS.values[new] or ""), 1)
+
+    def periods(self) -> List[str]:
+        return sorted({key[0] for key in self.groups})
+
+    def totals(self, period: Optional[str] = None) -> Tuple[int, int]:
+        """(tasks, completed tasks), for one "YYYY-MM" period or overall."""
+        tasks = completed = 0
+        for (key_period, _, status, _), (count, _) in self.groups.items():
+            if period is None or key_period == period:
+                tasks += count
+                if status == "Completed":
+                    completed += count
+        return tasks, completed
+
+    def by_status(self, period: Optional[str] = None) -> Dict[str, int]:
+        """Tasks per status; blank statuses are ""."""
+        counts: Dict[str, int] = {}
+        for (key_period, _, status, _), (count, _) in self.groups.items():
+            if period is None or key_period == period:
+                counts[status] = counts.get(status, 0) + count
+        return counts
+
+    def by_category(self, period: Optional[str] = None) -> Dict[str, List[int]]:
+        """[tasks, completed, planned minutes, completed minutes] per category."""
+        totals: Dict[str, List[int]] = {}
+        for (key_period, category, status, _), (count, minutes) in self.groups.items():
+            if period is None or key_period == period:
+                total = totals.setdefault(category, [0, 0, 0, 0])
+                total[0] += count
+                total[2] += minutes
+                if status == "Completed":
+                    total[1] += count
+                    total[3] += minutes
+        return totals
+
+    def kpis(self, period: Optional[str] = None) -> Dict[str, float]:
+        """The same KPIs as TaskTable.kpis(), from the groups."""
+        tasks = done = planned_minutes = done_minutes = 0
+        categories = {"Core Learning": [0, 0], "Personal Development": [0, 0]}
+        for (key_period, category, status, _), (count, minutes) in self.groups.items():
+            if period is not None and key_period != period:
+                continue
+            completed = status == "Completed"
+            tasks += count
+            planned_minutes += minutes
+            if completed:
+                done += count
+                done_minutes += minutes
+            if category in categories:
+                categories[category][0] += count * completed
+                categories[category][1] += count
+        if not tasks:
+            return dict.fromkeys(KPIS, 0.0)
+        if period is None:
+            days, consistent = len(self.days), self.consistent_days
+        else:
+            in_period = [day for ordinal, day in self.days.items() if _period(ordinal) == period]
+            days, consistent = len(in_period), sum(map(_consistent, in_period))
+        core, personal = categories["Core Learning"], categories["Personal Development"]
+        return {
+            "completion": done / tasks,
+            "core_learning": core[0] / max(core[1], 1),
+            "personal_development": personal[0] / max(personal[1], 1),
+            "time_utilization": done_minutes / max(planned_minutes, 1),
+            "consistency": consistent / days,
+        }
+
+    def differences(self, other: "Aggregates") -> List[str]:
+        """What differs from another set of totals; empty when they agree."""
+        problems = []
+        for name in ("groups", "progress", "days"):
+            mine, theirs = getattr(self, name), getattr(other, name)
+            for key in sorted(set(mine) | set(theirs), key=str):
+                if mine.get(key) != theirs.get(key):
+                    problems.append(f"{name} {key}: {mine.get(key)} != {theirs.get(key)}")
+        if self.consistent_days != other.consistent_days:
+            problems.append(f"consistent days: {self.consistent_days} != {other.consistent_days}")
+        return problems
+
+    def to_json(self) -> Dict:
+        return {
+            "groups": [list(key) + values for key, values in sorted(self.groups.items())],
+            "progress": [list(key) + [count] for key, count in sorted(self.progress.items())],
+            "days": [[date.fromordinal(ordinal).isoformat()] + day
+                     for ordinal, day in sorted(self.days.items())],
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict) -> "Aggregates":
+        aggregates = cls()
+        for period, category, status, priority, tasks, minutes in data["groups"]:
+            aggregates.groups[(period, category, status, priority)] = [tasks, minutes]
+        for period, progress, tasks in data["progress"]:
+            aggregates.progress[(period, progress)] = tasks
+        for day, tasks, completed in data["days"]:
+            aggregates.days[date.fromisoformat(day).toordinal()] = [tasks, completed]
+        aggregates.consistent_days = sum(map(_consistent, aggregates.days.values()))
+        return aggregates
+
+    def save(self, workbook: str):
+        """Write the totals next to the workbook, stamped with its current size and mtime."""
+        stat = os.stat(workbook)
+        data = {"version": AGGREGATES_VERSION, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        data.update(self.to_json())
+        with open(sidecar_path(workbook), "w") as f:
+            json.dump(data, f)
+
+    @classmethod
+    def load(cls, workbook: str) -> Optional["Aggregates"]:
+        """The saved totals, or None if missing or older than the workbook."""
+        try:
+            with open(sidecar_path(workbook)) as f:
+                data = json.load(f)
+            stat = os.stat(workbook)
+        except (OSError, ValueError):
+            return None
+        if (data.get("version") != AGGREGATES_VERSION or data.get("size") != stat.st_size
+                or data.get("mtime_ns") != stat.st_mtime_ns):
+            return None
+        return cls.from_json(data)
+
+
+def read_month_tables(workbook: str) -> Dict[str, TaskTable]:
+    """The task rows of every month sheet in a workbook."""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(workbook, read_only=True, data_only=True)
+    try:
+        return {name: read_rows(wb[name].iter_rows(min_row=2, max_col=len(HEADERS), values_only=True))
+                for name in calendar.month_name[1:] if name in wb.sheetnames}
+    finally:
+        wb.close()
+
+
+def rebuild(workbook: str) -> Aggregates:
+    """Recompute the totals from the workbook and save them."""
+    aggregates = Aggregates.build(read_month_tables(workbook).values())
+    aggregates.save(workbook)
+    return aggregates
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show, rebuild or check a workbook's stored totals.")
+    parser.add_argument("path", nargs="?", default="TaskManager2025.xlsx")
+    parser.add_argument("--rebuild", action="store_true", help="recompute from every month sheet")
+    parser.add_argument("--check", action="store_true",
+                        help="compare the stored totals with a full recompute")
+    args = parser.parse_args()
+
+    stored = Aggregates.load(args.path)
+    if args.check:
+        if stored is None:
+            raise SystemExit(f"No up-to-date totals for {args.path}; run with --rebuild")
+        problems = stored.differences(Aggregates.build(read_month_tables(args.path).values()))
+        for problem in problems:
+            print(problem)
+        print(f"{len(problems)} differences between the stored totals and a full recompute")
+        raise SystemExit(1 if problems else 0)
+    if args.rebuild or stored is None:
+        print(f"Rebuilding totals for {args.path}")
+        stored = rebuild(args.path)
+
+    print(f"{'period':<10}{'tasks':>8}{'done':>8}{'rate':>8}")
+    for period in stored.periods():
+        tasks, completed = stored.totals(period)
+        print(f"{period:<10}{tasks:>8}{completed:>8}{completed / max(tasks, 1):>8.0%}")
+    for key, value in stored.kpis().items():
+        print(f"{key:<22}{value:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""An append-only log of every task status and progress change.
+
+Each change is one 16-byte record in a binary file next to the workbook
+("TaskManager2025.xlsx" logs to "TaskManager2025.events.bin"):
+
+    time    int64   microseconds since the Unix epoch
+    day     int32   the task's date, as a proleptic ordinal
+    slot    uint8   the task's position among that day's tasks
+    field   uint8   0 status, 1 progress
+    old     uint8   value before the change } codes in STATUS_NAMES or
+    new     uint8   value after the change  } PROGRESS_NAMES, OTHER if neither
+
+The codes are fixed here rather than taken from task_model's CodeTables,
+whose codes only hold within one process. Records are only ever appended,
+so earlier history is never rewritten. The file is read through mmap as a
+NumPy structured array, so replaying or analysing years of changes never
+opens a workbook:
+
+    python task_events.py TaskManager2025.xlsx                     # summary
+    python task_events.py TaskManager2025.xlsx --at 2025-03-01T18:00
+    python task_events.py sample.xlsx --sample 1000000             # write a test log
+"""
+import argparse
+import mmap
+import os
+import time
+from bisect import bisect_left
+from datetime import date, datetime
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from task_model import PROGRESS, STATUSES, TaskTable
+
+MAGIC = b"TEVT"
+EVENTS_VERSION = 1
+
+EVENT_DTYPE = np.dtype([("time", "<i8"), ("day", "<i4"), ("slot", "u1"),
+                        ("field", "u1"), ("old", "u1"), ("new", "u1")])
+HEADER = np.dtype([("magic", "S4"), ("version", "<u4"), ("record_size", "<u4"), ("reserved", "<u4")])
+
+STATUS, PROGRESS_FIELD = 0, 1
+STATUS_NAMES = (None, "Not Started", "In Progress", "Completed")
+PROGRESS_NAMES = (None, "Pending", "Done")
+OTHER = 255
+COMPLETED_CODE = STATUS_NAMES.index("Completed")
+
+_STATUS_CODES = {name: code for code, name in enumerate(STATUS_NAMES)}
+_PROGRESS_CODES = {name: code for code, name in enumerate(PROGRESS_NAMES)}
+
+
+def events_path(workbook: str) -> str:
+    return os.path.splitext(workbook)[0] + ".events.bin"
+
+
+def _now() -> int:
+    return time.time_ns() // 1000
+
+
+def task_slot(table: TaskTable, i: int) -> int:
+    """Position of row i among the rows of its day; days are in order within a month table."""
+    return i - bisect_left(table.day, table.day[i])
+
+
+class EventLog:
+    """Appends to and reads an event file; nothing is created until the first append."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._mmap: Optional[mmap.mmap] = None
+        self._file = None
+
+    def _check_header(self, data: bytes):
+        header = np.frombuffer(data, HEADER, count=1)[0]
+        if (header["magic"] != MAGIC or header["version"] != EVENTS_VERSION
+                or header["record_size"] != EVENT_DTYPE.itemsize):
+            raise ValueError(f"{self.path} is not a version {EVENTS_VERSION} task event log")
+
+    def append(self, events: np.ndarray):
+        """Append records of EVENT_DTYPE in a single write."""
+        events = np.asarray(events, dtype=EVENT_DTYPE)
+        new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, "ab") as f:
+            data = events.tobytes()
+            if new:
+                header = np.array([(MAGIC, EVENTS_VERSION, EVENT_DTYPE.itemsize, 0)], dtype=HEADER)
+                data = header.tobytes() + data
+            f.write(data)
+
+    def record(self, day: int, slot: int, field: int, old: int, new: int, when: Optional[int] = None):
+        self.append(np.array([(when or _now(), day, slot, field, old, new)], dtype=EVENT_DTYPE))
+
+    def status_changed(self, table: TaskTable, i: int, old: int):
+        """Log a status change of row i, given the status code it had before."""
+        if table.status[i] != old:
+            self.record(table.day[i], task_slot(table, i), STATUS,
+                        _STATUS_CODES.get(STATUSES.values[old], OTHER),
+                        _STATUS_CODES.get(STATUSES.values[table.status[i]], OTHER))
+
+    def progress_changed(self, table: TaskTable, i: int, old: int):
+        """Log a progress change of row i, given the progress code it had before."""
+        if table.progress[i] != old:
+            self.record(table.day[i], task_slot(table, i), PROGRESS_FIELD,
+                        _PROGRESS_CODES.get(PROGRESS.values[old], OTHER),
+                        _PROGRESS_CODES.get(PROGRESS.values[table.progress[i]], OTHER))
+
+    def read(self) -> np.ndarray:
+        """Every record, as a read-only array over the memory-mapped file.
+
+        A record cut short by an interrupted write is left out.
+        """
+        self.close()
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return np.zeros(0, dtype=EVENT_DTYPE)
+        self._file = open(self.path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._check_header(self._mmap[:HEADER.itemsize])
+        count = (len(self._mmap) - HEADER.itemsize) // EVENT_DTYPE.itemsize
+        return np.frombuffer(self._mmap, EVENT_DTYPE, count=count, offset=HEADER.itemsize)
+
+    def close(self):
+        """Release the mapping; arrays returned by read() must not be used afterwards."""
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass  # still referenced by an array; the mapping is freed with it
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _task_keys(events: np.ndarray) -> np.ndarray:
+    return events["day"].astype(np.int64) * 256 + events["slot"]
+
+
+def _by_task(events: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Events sorted by task and time, their task keys, and where each task's events start."""
+    keys = _task_keys(events)
+    order = np.lexsort((events["time"], keys))
+    keys, events = keys[order], events[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.zeros(0, dtype=np.int64)
+    return events, keys, starts
+
+
+def replay(events: np.ndarray, field: int = STATUS,
+           until: Optional[datetime] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(day, slot, value code) of every logged task as of a moment (default: now).
+
+    A task whose first change comes later still has the value that change
+    started from.
+    """
+    events, keys, starts = _by_task(events[events["field"] == field])
+    if not len(keys):
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+    if until is None:
+        applied = np.diff(np.r_[starts, len(keys)])
+    else:
+        # A task's events up to the moment are a prefix of its (time-ordered) events
+        applied = np.add.reduceat(events["time"] <= int(until.timestamp() * 1_000_000), starts)
+    values = np.where(applied > 0, events["new"][starts + np.maximum(applied, 1) - 1], events["old"][starts])
+    task = keys[starts]
+    return task // 256, task % 256, values.astype(np.int64)
+
+
+def apply_state(tables: Dict[Tuple[int, int], TaskTable], events: np.ndarray,
+                until: Optional[datetime] = None) -> int:
+    """Set the statuses and progress of month tables to a moment's; returns the rows changed."""
+    rows: Dict[Tuple[int, int], Tuple[TaskTable, int]] = {}
+    for table in tables.values():
+        for i in range(len(table)):
+            rows[(table.day[i], task_slot(table, i))] = (table, i)
+    changed = 0
+    for field, names, target in ((STATUS, STATUS_NAMES, "status"),
+                                 (PROGRESS_FIELD, PROGRESS_NAMES, "progress")):
+        codes = STATUSES if field == STATUS else PROGRESS
+        for day, slot, value in zip(*(a.tolist() for a in replay(events, field, until))):
+            row = rows.get((day, slot))
+            if row is None or value == OTHER:
+                continue
+            table, i = row
+            code = codes.code(names[value])
+            if getattr(table, target)[i] != code:
+                getattr(table, target)[i] = code
+                changed += 1
+    return changed
+
+
+def _completions(events: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(task key, first status change, first completion) of every completed task, in microseconds."""
+    events, keys, starts = _by_task(events[events["field"] == STATUS])
+    if not len(keys):
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+    group = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(keys)]))
+    done = events["new"] == COMPLETED_CODE
+    never = np.iinfo(np.int64).max
+    completed_at = np.full(len(starts), never)
+    np.minimum.at(completed_at, group[done], events["time"][done])
+    finished = completed_at != never
+    return keys[starts][finished], events["time"][starts][finished], completed_at[finished]
+
+
+def time_to_complete(events: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(day, slot, seconds) from each completed task's first status change to its first completion."""
+    task, started, completed_at = _completions(events)
+    return task // 256, task % 256, (completed_at - started) / 1e6
+
+
+def completion_delay(events: np.ndarray) -> np.ndarray:
+    """Hours from the start of each completed task's day (local time) to its first completion."""
+    task, _, completed_at = _completions(events)
+    days, day = np.unique(task // 256, return_inverse=True)
+    midnight = np.array([datetime.fromordinal(d).timestamp() for d in days.tolist()])
+    return (completed_at / 1e6 - midnight[day]) / 3600
+
+
+def write_sample(path: str, events: int, first: date = date(2025, 1, 1), seed: int = 0):
+    """A synthetic log of about `events` changes to a year of 15 tasks a day.
+
+    Tasks are started on the day they are due, and 70% of the starts are
+    followed by a completion a few hours later.
+    """
+    rng = np.random.default_rng(seed)
+    tasks = round(events / 1.7)
+    day = first.toordinal() + rng.integers(0, 365, tasks)
+    slot = rng.integers(0, 15, tasks)
+    start = ((np.array([datetime.fromordinal(d).timestamp() for d in range(first.toordinal(), first.toordinal() + 365)])
+              [day - first.toordinal()] + rng.integers(6 * 3600, 20 * 3600, tasks)) * 1_000_000).astype(np.int64)
+    finish = start + rng.exponential(3 * 3600e6, tasks).astype(np.int64)
+    completed = rng.random(tasks) < 0.7
+    started = np.zeros(tasks, dtype=EVENT_DTYPE)
+    started["time"], started["day"], started["slot"] = start, day, slot
+    started["old"], started["new"] = STATUS_NAMES.index("Not Started"), STATUS_NAMES.index("In Progress")
+    done = started[completed].copy()
+    done["time"] = finish[completed]
+    done["old"], done["new"] = STATUS_NAMES.index("In Progress"), COMPLETED_CODE
+    events = np.concatenate([started, done])
+    events = events[np.argsort(events["time"], kind="stable")]
+    if os.path.exists(path):
+        os.remove(path)
+    EventLog(path).append(events)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay and analyse a workbook's task status history.")
+    parser.add_argument("workbook", nargs="?", default="TaskManager2025.xlsx",
+                        help="workbook whose event log is read (its .events.bin sidecar)")
+    parser.add_argument("--at", type=datetime.fromisoformat, help="show the statuses as of this moment")
+    parser.add_argument("--sample", type=int, metavar="EVENTS", help="write a synthetic log of about this many events")
+    args = parser.parse_args()
+
+    path = events_path(args.workbook)
+    if args.sample:
+        write_sample(path, args.sample)
+        print(f"Wrote {os.path.getsize(path):,} bytes of sample events to {path}")
+        return
+
+    log = EventLog(path)
+    start = time.perf_counter()
+    events = log.read()
+    if not len(events):
+        raise SystemExit(f"No events in {path}")
+    day, _, status = replay(events, STATUS, args.at)
+    _, _, seconds = time_to_complete(events)
+    elapsed = time.perf_counter() - start
+
+    first, last = (datetime.fromtimestamp(t / 1e6) for t in (events["time"].min(), events["time"].max()))
+    print(f"{len(events):,} events for {len(day):,} tasks, {first:%Y-%m-%d %H:%M} to {last:%Y-%m-%d %H:%M}")
+    print(f"Statuses as of {args.at or 'now'}:")
+    counts = np.bincount(status, minlength=OTHER + 1)
+    for code, name in enumerate(STATUS_NAMES):
+        print(f"  {name or '(blank)':<14}{counts[code]:>10,}")
+    if counts[OTHER]:
+        print(f"  {'(other)':<14}{counts[OTHER]:>10,}")
+    if len(seconds):
+        hours = np.percentile(seconds / 3600, [50, 90, 99])
+        print(f"Time to complete ({len(seconds):,} tasks): median {hours[0]:.1f} h, "
+              f"90th percentile {hours[1]:.1f} h, 99th {hours[2]:.1f} h")
+        delay = np.percentile(completion_delay(events), [50, 90])
+        print(f"Completed {delay[0]:.1f} h into the task's day (median), {delay[1]:.1f} h (90th percentile)")
+    print(f"Read and analysed in {elapsed * 1000:.0f} ms")
+    del events, day, status
+    log.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""Completion history across every task workbook and backup.
+
+Each workbook is read once, in a process pool, into a small per-month
+summary (tasks, completed tasks, and planned/completed minutes per
+category). Summaries are cached in a JSON file keyed by path, size and
+modification time, so a new backup only costs reading that one file.
+
+Task rows are read with task_ingest, so every workbook layout is
+summarized the same way.
+"""
+import argparse
+import glob
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from task_ingest import TaskRecord, workbook_records
+
+HISTORY_PATTERNS = ("*.xlsx", os.path.join("backups", "*.xlsx"))
+CACHE_FILE = ".task_history_cache.json"
+CACHE_VERSION = 2
+
+# TaskManager2025_backup_20250129_112459.xlsx is a snapshot of TaskManager2025.xlsx
+BACKUP_NAME = re.compile(r"^(?P<source>.+)_backup_(?P<taken>\d{8}_\d{6})\.xlsx$")
+
+
+@dataclass
+class Snapshot:
+    """One workbook's summary: `months` maps "YYYY-MM" to its totals."""
+    path: str
+    source: str
+    taken: datetime
+    months: Dict[str, Dict]
+
+    @property
+    def tasks(self) -> int:
+        return sum(month["tasks"] for month in self.months.values())
+
+    @property
+    def completed(self) -> int:
+        return sum(month["completed"] for month in self.months.values())
+
+
+def discover(root: str = ".") -> List[str]:
+    """Every task workbook and backup under root, skipping Excel lock files."""
+    paths = []
+    for pattern in HISTORY_PATTERNS:
+        paths.extend(p for p in glob.glob(os.path.join(root, pattern))
+                     if not os.path.basename(p).startswith("~$"))
+    return sorted(paths)
+
+
+def snapshot_source(path: str) -> Tuple[str, datetime]:
+    """The workbook a file is a snapshot of, and when the snapshot was taken."""
+    name = os.path.basename(path)
+    match = BACKUP_NAME.match(name)
+    if match:
+        return match["source"] + ".xlsx", datetime.strptime(match["taken"], "%Y%m%d_%H%M%S")
+    return name, datetime.fromtimestamp(os.path.getmtime(path))
+
+
+def _add_record(months: Dict[str, Dict], record: TaskRecord):
+    month = months.setdefault(f"{record.date.year:04d}-{record.date.month:02d}",
+                              {"tasks": 0, "completed": 0, "minutes": {}})
+    completed = record.status == "Completed"
+    month["tasks"] += 1
+    month["completed"] += completed
+    if record.minutes is not None and record.category is not None:
+        planned = month["minutes"].setdefault(record.category, [0, 0])
+        planned[0] += record.minutes
+        if completed:
+            planned[1] += record.minutes
+
+
+def summarize_workbook(path: str) -> Dict[str, Dict]:
+    """Per-month totals for one workbook, from its task rows in any layout."""
+    months: Dict[str, Dict] = {}
+    for record in workbook_records(path):
+        _add_record(months, record)
+    return months
+
+
+class HistoryCache:
+    """Per-file summaries on disk, valid while a file's size and mtime are unchanged."""
+
+    def __init__(self, path: Optional[str] = CACHE_FILE):
+        self.path = path
+        self.files: Dict[str, Dict] = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+                if data.get("version") == CACHE_VERSION:
+                    self.files = data["files"]
+            except (OSError, ValueError, KeyError):
+                self.files = {}
+
+    @staticmethod
+    def _key(path: str) -> Tuple[str, int, int]:
+        stat = os.stat(path)
+        return os.path.abspath(path), stat.st_size, stat.st_mtime_ns
+
+    def get(self, path: str) -> Optional[Dict[str, Dict]]:
+        key, size, mtime = self._key(path)
+        entry = self.files.get(key)
+        if entry and entry["size"] == size and entry["mtime_ns"] == mtime:
+            return entry["months"]
+        return None
+
+    def put(self, path: str, months: Dict[str, Dict]):
+        key, size, mtime = self._key(path)
+        self.files[key] = {"size": size, "mtime_ns": mtime, "months": months}
+
+    def save(self, keep: List[str]):
+        """Write the cache, dropping files that are no longer part of the history."""
+        if not self.path:
+            return
+        keep = {os.path.abspath(p) for p in keep}
+        self.files = {k: v for k, v in self.files.items() if k in keep}
+        with open(self.path, "w") as f:
+            json.dump({"version": CACHE_VERSION, "files": self.files}, f)
+
+
+def load_history(paths: List[str], cache: HistoryCache,
+                 workers: Optional[int] = None) -> Tuple[List[Snapshot], int]:
+    """Summaries of every path, reading only files missing from the cache.
+
+    Files that cannot be read are reported and left out. Returns the
+    snapshots in path order and how many files were read.
+    """
+    summaries = {path: cache.get(path) for path in paths}
+    missing = [path for path, months in summaries.items() if months is None]
+    failed = {}
+    if len(missing) == 1:
+        try:
+            summaries[missing[0]] = summarize_workbook(missing[0])
+        except Exception as e:
+            failed[missing[0]] = e
+    elif missing:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {path: pool.submit(summarize_workbook, path) for path in missing}
+            for path, future in futures.items():
+                try:
+                    summaries[path] = future.result()
+                except Exception as e:
+                    failed[path] = e
+    for path, error in failed.items():
+        print(f"Skipped {path}: {type(error).__name__}: {error}")
+    for path in missing:
+        if path not in failed:
+            cache.put(path, summaries[path])
+    cache.save(paths)
+
+    snapshots = []
+    for path in paths:
+        if path in failed:
+            continue
+        source, taken = snapshot_source(path)
+        snapshots.append(Snapshot(path, source, taken, summaries[path]))
+    return snapshots, len(missing) - len(failed)
+
+
+def latest_per_source(snapshots: List[Snapshot]) -> List[Snapshot]:
+    """The newest snapshot of every workbook, so backups are not counted twice."""
+    latest: Dict[str, Snapshot] = {}
+    for snapshot in snapshots:
+        current = latest.get(snapshot.source)
+        if current is None or snapshot.taken > current.taken:
+            latest[snapshot.source] = snapshot
+    return list(latest.values())
+
+
+def combine(snapshots: List[Snapshot]) -> Dict[str, Dict]:
+    """Per-month totals summed over several snapshots."""
+    months: Dict[str, Dict] = {}
+    for snapshot in snapshots:
+        for period, totals in snapshot.months.items():
+            month = months.setdefault(period, {"tasks": 0, "completed": 0, "minutes": {}})
+            month["tasks"] += totals["tasks"]
+            month["completed"] += totals["completed"]
+            for category, (planned, done) in totals["minutes"].items():
+                minutes = month["minutes"].setdefault(category, [0, 0])
+                minutes[0] += planned
+                minutes[1] += done
+    return months
+
+
+def _rate(completed: int, tasks: int) -> float:
+    return completed / tasks if tasks else 0.0
+
+
+def completion_table(months: Dict[str, Dict], by_year: bool) -> List[Tuple]:
+    """(period, tasks, completed, rate, change from the previous period) rows."""
+    totals: Dict[str, List[int]] = {}
+    for period, month in months.items():
+        total = totals.setdefault(period[:4] if by_year else period, [0, 0])
+        total[0] += month["tasks"]
+        total[1] += month["completed"]
+    rows = []
+    previous = None
+    for period in sorted(totals):
+        tasks, completed = totals[period]
+        rate = _rate(completed, tasks)
+        rows.append((period, tasks, completed, rate, None if previous is None else rate - previous))
+        previous = rate
+    return rows
+
+
+def category_hours_table(months: Dict[str, Dict]) -> Tuple[List[str], List[Tuple]]:
+    """Years, and (category, [(planned, completed) hours per year]) rows."""
+    years = sorted({period[:4] for period, month in months.items() if month["minutes"]})
+    hours: Dict[str, Dict[str, List[int]]] = {}
+    for period, month in months.items():
+        for category, (planned, done) in month["minutes"].items():
+            year = hours.setdefault(category, {}).setdefault(period[:4], [0, 0])
+            year[0] += planned
+            year[1] += done
+    rows = [(category, [tuple(m / 60 for m in by_year.get(year, [0, 0])) for year in years])
+            for category, by_year in sorted(hours.items())]
+    return years, rows
+
+
+def report(snapshots: List[Snapshot], root: str = "."):
+    print("Snapshots")
+    print("=" * 78)
+    print(f"{'file':<52}{'taken':<18}{'tasks':>8}{'rate':>8}")
+    for snapshot in sorted(snapshots, key=lambda s: (s.source, s.taken)):
+        print(f"{os.path.relpath(snapshot.path, root):<52}{snapshot.taken:%Y-%m-%d %H:%M}  "
+              f"{snapshot.tasks:>8}{_rate(snapshot.completed, snapshot.tasks):>8.0%}")
+
+    months = combine(latest_per_source(snapshots))
+    for title, by_year in (("Year over year", True), ("Month over month", False)):
+        print(f"\n{title} (latest snapshot of each workbook)")
+        print("=" * 50)
+        print(f"{'period':<10}{'tasks':>8}{'done':>8}{'rate':>8}{'change':>10}")
+        for period, tasks, completed, rate, change in completion_table(months, by_year):
+            change = "" if change is None else f"{change * 100:+.1f} pp"
+            print(f"{period:<10}{tasks:>8}{completed:>8}{rate:>8.0%}{change:>10}")
+
+    years, rows = category_hours_table(months)
+    print("\nCategory hours, planned / completed")
+    print("=" * 50)
+    if not rows:
+        print("No workbook has a Duration column.")
+        return
+    print(f"{'category':<24}" + "".join(f"{year:>18}" for year in years))
+    for category, by_year in rows:
+        print(f"{category:<24}" + "".join(f"{f'{p:.0f} / {d:.0f}':>18}" for p, d in by_year))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare task completion across workbooks and backups.")
+    parser.add_argument("paths", nargs="*", help="workbooks to load (default: discover under --root)")
+    parser.add_argument("--root", default=".", help="directory holding the workbooks and backups/")
+    parser.add_argument("--workers", type=int, help="processes used to read workbooks")
+    parser.add_argument("--cache", default=None, help=f"cache file (default: ROOT/{CACHE_FILE})")
+    parser.add_argument("--no-cache", action="store_true", help="read every workbook again")
+    args = parser.parse_args()
+
+    paths = sorted(args.paths) or discover(args.root)
+    if not paths:
+        print("No task workbooks found.")
+        return
+    cache = HistoryCache(None if args.no_cache else args.cache or os.path.join(args.root, CACHE_FILE))
+    snapshots, read = load_history(paths, cache, args.workers)
+    report(snapshots, args.root)
+    print(f"\nRead {read} of {len(paths)} workbooks; {len(snapshots) - read} came from the cache.")
+
+
+if __name__ == "__main__":
+    main()
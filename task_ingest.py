@@ -0,0 +1,218 @@
+"""Read task rows from every workbook layout into one schema.
+
+Three layouts are in use:
+
+    2025     Date, Time Block, Duration, Task Description, Category, Status,
+             Progress, Priority, Notes (TaskManagerExcel, EnhancedTaskManager)
+    2024     Date, Day, Week, Task Description, Status, Priority, Category,
+             Due Time, Notes (create_task_workbook, Task_Management_2025.xlsx)
+    routine  Date, Time, Task Type, Task Description, Category, Status,
+             Progress, Priority, Tags (routine.py)
+
+A sheet's layout is told from its header row, which is compiled once into
+the position of every field, so each row is mapped with a single
+itemgetter call. Columns are found by name, not position, and fields a
+layout lacks are None. Every sheet is streamed once with openpyxl's
+read-only reader:
+
+    python task_ingest.py                          # every workbook and backup
+    python task_ingest.py Task_Management_2024.xlsx --csv tasks.csv
+"""
+import argparse
+import calendar
+import csv
+import os
+import time
+from datetime import date, datetime
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from task_model import duration_minutes
+
+# Header names accepted for each field, in order of preference
+FIELD_ALIASES = {
+    "date": ("Date",),
+    "time": ("Time Block", "Time", "Due Time"),
+    "duration": ("Duration", "Duration (in hrs)"),
+    "task": ("Task Description", "Task"),
+    "task_type": ("Task Type",),
+    "category": ("Category",),
+    "status": ("Status",),
+    "progress": ("Progress",),
+    "priority": ("Priority",),
+    "notes": ("Notes",),
+    "tags": ("Tags",),
+}
+FIELDS = tuple(FIELD_ALIASES)
+
+# A header holding all of a layout's marker columns has that layout
+LAYOUTS = {
+    "2025": ("Date", "Time Block"),
+    "2024": ("Date", "Due Time"),
+    "routine": ("Date", "Task Type"),
+}
+
+MONTH_NAMES = set(calendar.month_name[1:])
+
+
+class TaskRecord(NamedTuple):
+    """One task row in the normalized schema; minutes is None without a duration column."""
+    workbook: str
+    sheet: str
+    row: int
+    layout: str
+    date: date
+    time: Optional[str]
+    minutes: Optional[int]
+    task: Optional[str]
+    task_type: Optional[str]
+    category: Optional[str]
+    status: Optional[str]
+    progress: Optional[str]
+    priority: Optional[str]
+    notes: Optional[str]
+    tags: Optional[str]
+
+
+class SheetLayout(NamedTuple):
+    """A compiled header: the layout's name and a getter for the fields of a row."""
+    name: str
+    width: int
+    fields: itemgetter
+    timed: bool  # has a duration column
+
+
+def detect_layout(header: Iterable) -> Optional[SheetLayout]:
+    """Compile a header row, or None if the sheet holds no task rows.
+
+    Headers with a Date and a Task Description column that match no known
+    layout are read as "other".
+    """
+    positions: Dict[str, int] = {}
+    for i, value in enumerate(header):
+        if value is not None:
+            positions.setdefault(str(value).strip(), i)
+    name = next((name for name, markers in LAYOUTS.items()
+                 if all(marker in positions for marker in markers)), None)
+    if name is None:
+        if "Date" not in positions or not any(alias in positions for alias in FIELD_ALIASES["task"]):
+            return None
+        name = "other"
+    width = max(positions.values()) + 1
+    # Fields the layout lacks read the None appended past the header's last column
+    indices = [next((positions[alias] for alias in aliases if alias in positions), width)
+               for aliases in FIELD_ALIASES.values()]
+    return SheetLayout(name, width, itemgetter(*indices), indices[FIELDS.index("duration")] < width)
+
+
+def _text(value) -> Optional[str]:
+    if value is None:
+        return None
+    if hasattr(value, "strftime") and not isinstance(value, (datetime, date)):
+        return value.strftime("%H:%M")
+    return str(value).strip() or None
+
+
+def _minutes(value) -> Optional[int]:
+    try:
+        return duration_minutes(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def sheet_records(rows: Iterable[Tuple], workbook: str = "", sheet: str = "") -> Iterator[TaskRecord]:
+    """The task rows of one sheet, header row included in `rows`.
+
+    Rows without a date, such as dashboard sections under the tasks, and
+    dated rows with nothing planned in them (empty time slots) are skipped.
+    """
+    rows = iter(rows)
+    header = next(rows, None)
+    layout = detect_layout(header) if header else None
+    if layout is None:
+        return
+    pad = (None,) * (layout.width + 1)
+    for number, row in enumerate(rows, start=2):
+        # Cells past the header (helper columns, stray notes) must not reach the missing fields
+        row = (tuple(row[:layout.width]) + pad)[:layout.width + 1]
+        (day, slot, duration, task, task_type, category, status,
+         progress, priority, notes, tags) = layout.fields(row)
+        if not isinstance(day, (datetime, date)):
+            continue
+        task, category, status, notes = _text(task), _text(category), _text(status), _text(notes)
+        if not (task or category or status or notes or duration):
+            continue
+        yield TaskRecord(workbook, sheet, number, layout.name,
+                         day.date() if isinstance(day, datetime) else day, _text(slot),
+                         _minutes(duration) if layout.timed else None, task, _text(task_type),
+                         category, status, _text(progress), _text(priority), notes, _text(tags))
+
+
+def workbook_records(path: str) -> Iterator[TaskRecord]:
+    """Every task row of a workbook, each sheet read once.
+
+    Month sheets are read first. Other task sheets (such as "Tasks") are
+    only read when the month sheets hold no tasks, so layouts that repeat
+    every task on two sheets are not counted twice.
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        found = 0
+        for ws in wb.worksheets:
+            if ws.title in MONTH_NAMES:
+                for record in sheet_records(ws.iter_rows(values_only=True), path, ws.title):
+                    found += 1
+                    yield record
+        if not found:
+            for ws in wb.worksheets:
+                if ws.title not in MONTH_NAMES:
+                    yield from sheet_records(ws.iter_rows(values_only=True), path, ws.title)
+    finally:
+        wb.close()
+
+
+def ingest(paths: Iterable[str]) -> Iterator[TaskRecord]:
+    """Every task row of every workbook, in one pass."""
+    for path in paths:
+        yield from workbook_records(path)
+
+
+def main():
+    from task_history import discover
+
+    parser = argparse.ArgumentParser(description="Read task rows from every workbook layout into one table.")
+    parser.add_argument("paths", nargs="*", help="workbooks (default: every workbook and backup here)")
+    parser.add_argument("--csv", help="write the normalized rows to this CSV file")
+    args = parser.parse_args()
+
+    paths = args.paths or discover(".")
+    counts: Dict[Tuple[str, str], List[int]] = {}
+    start = time.perf_counter()
+    out = open(args.csv, "w", newline="", encoding="utf-8") if args.csv else None
+    try:
+        writer = csv.writer(out) if out else None
+        if writer:
+            writer.writerow(TaskRecord._fields)
+        for record in ingest(paths):
+            count = counts.setdefault((os.path.basename(record.workbook), record.layout), [0, 0])
+            count[0] += 1
+            count[1] += record.status == "Completed"
+            if writer:
+                writer.writerow(record)
+    finally:
+        if out:
+            out.close()
+    elapsed = time.perf_counter() - start
+
+    print(f"{'workbook':<48}{'layout':<10}{'tasks':>8}{'done':>8}")
+    for (workbook, layout), (tasks, completed) in sorted(counts.items()):
+        print(f"{workbook:<48}{layout:<10}{tasks:>8}{completed:>8}")
+    rows = sum(tasks for tasks, _ in counts.values())
+    print(f"{rows:,} rows from {len(paths)} workbooks in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)"
+          + (f" -> {args.csv}" if args.csv else ""))
+
+
+if __name__ == "__main__":
+    main()
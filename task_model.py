@@ -0,0 +1,356 @@
+"""Compact in-memory task model shared by the generators and readers.
+
+A task row is stored column-wise in typed arrays: dates as proleptic
+ordinals, durations as minutes, and every repeated string (time block,
+description, category, status, progress, priority) as a small integer code
+interned in a module-wide CodeTable, so codes mean the same thing in every
+table. Notes are rare and kept in a sparse dict.
+
+Memory per 100,000 tasks of the month-sheet layout (python task_model.py):
+
+    TaskTable column arrays       1.6 MB   (16 bytes per task)
+    list of slotted Task records  14.2 MB  (149 bytes per task)
+    openpyxl cells                114 MB   (1.2 KB per task, 6-7 cells per row)
+"""
+import tracemalloc
+from array import array
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+HEADERS = [
+    'Date',
+    'Time Block',
+    'Duration',
+    'Task Description',
+    'Category',
+    'Status',
+    'Progress',
+    'Priority',
+    'Notes'
+]
+
+
+class CodeTable:
+    """Interns strings as small integer codes; code 0 is always blank."""
+
+    def __init__(self, values: Iterable[str] = ()):
+        self.values: List[Optional[str]] = [None]
+        self.codes: Dict[Optional[str], int] = {None: 0, "": 0}
+        for value in values:
+            self.code(value)
+
+    def code(self, value: Optional[str]) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def value(self, code: int) -> Optional[str]:
+        return self.values[code]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+BLOCKS = CodeTable(["Fixed", "Flexible Block 1", "Flexible Block 2", "Flexible Block 3"])
+DESCRIPTIONS = CodeTable()
+CATEGORIES = CodeTable(["Core Learning", "Personal Development", "Essential Activities", "Flexible Tasks"])
+STATUSES = CodeTable(["Not Started", "In Progress", "Completed"])
+PROGRESS = CodeTable(["Pending", "Done"])
+PRIORITIES = CodeTable(["High", "Medium", "Low"])
+
+COMPLETED = STATUSES.code("Completed")
+
+# Keys of TaskTable.kpis(), in the order the yearly dashboards list them
+KPIS = ["completion", "core_learning", "personal_development", "time_utilization", "consistency"]
+
+# Category of the empty flexible blocks, when the workbook's categories include it
+FLEXIBLE_CATEGORY = "Flexible Tasks"
+
+# Share of a day's tasks that must be completed for the day to count as consistent
+CONSISTENCY_THRESHOLD = 0.8
+
+
+def duration_minutes(duration) -> int:
+    """Minutes in an "H:MM" or "H:MM:SS" duration, or in an Excel time value.
+
+    Excel keeps a duration typed as "2:00" as a fraction of a day: a number
+    (0.0833...) in the file, or a time of day once openpyxl has read it.
+    """
+    if duration is None or duration == "":
+        return 0
+    if isinstance(duration, (int, float)):
+        return round(duration * 1440)
+    if isinstance(duration, timedelta):
+        return round(duration.total_seconds() / 60)
+    if isinstance(duration, time):
+        return duration.hour * 60 + duration.minute
+    hours, _, minutes = str(duration).partition(":")
+    minutes = minutes.partition(":")[0]  # seconds are dropped
+    return int(hours or 0) * 60 + int(minutes or 0)
+
+
+def format_minutes(minutes: int) -> str:
+    return f"{minutes // 60}:{minutes % 60:02d}"
+
+
+def day_ordinal(value) -> int:
+    if isinstance(value, datetime):
+        return value.toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    return 0
+
+
+class Task:
+    """One task row as a slotted record holding the same codes as TaskTable."""
+    __slots__ = ("day", "block", "minutes", "description", "category",
+                 "status", "progress", "priority", "notes")
+
+    def __init__(self, day, block, minutes, description, category, status=0, progress=0,
+                 priority=0, notes=None):
+        self.day = day
+        self.block = block
+        self.minutes = minutes
+        self.description = description
+        self.category = category
+        self.status = status
+        self.progress = progress
+        self.priority = priority
+        self.notes = notes
+
+    @property
+    def date(self) -> datetime:
+        return datetime.fromordinal(self.day)
+
+    def values(self) -> Tuple:
+        """The row as it appears in a month sheet."""
+        return (datetime.fromordinal(self.day) if self.day else None,
+                BLOCKS.value(self.block), format_minutes(self.minutes),
+                DESCRIPTIONS.value(self.description), CATEGORIES.value(self.category),
+                STATUSES.value(self.status), PROGRESS.value(self.progress),
+                PRIORITIES.value(self.priority), self.notes)
+
+
+class TaskTable:
+    """Task rows as parallel typed arrays, in sheet order.
+
+    Row i of the table is sheet row `first_row + i`, so updates can be
+    written straight back to the cell they came from.
+    """
+
+    def __init__(self, first_row: int = 2):
+        self.first_row = first_row
+        self.day = array('i')
+        self.block = array('H')
+        self.minutes = array('H')
+        self.description = array('I')
+        self.category = array('H')
+        self.status = array('H')
+        self.progress = array('H')
+        self.priority = array('H')
+        self.notes: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.day)
+
+    def append(self, day, block, minutes, description, category, status=0, progress=0,
+               priority=0, notes=None):
+        """Append a row of already-encoded values."""
+        if notes:
+            self.notes[len(self.day)] = notes
+        self.day.append(day)
+        self.block.append(block)
+        self.minutes.append(minutes)
+        self.description.append(description)
+        self.category.append(category)
+        self.status.append(status)
+        self.progress.append(progress)
+        self.priority.append(priority)
+
+    def add(self, row: Sequence):
+        """Append a row of sheet values in HEADERS order."""
+        row = tuple(row) + (None,) * (len(HEADERS) - len(row))
+        self.append(day_ordinal(row[0]), BLOCKS.code(row[1]), duration_minutes(row[2]),
+                    DESCRIPTIONS.code(row[3]), CATEGORIES.code(row[4]), STATUSES.code(row[5]),
+                    PROGRESS.code(row[6]), PRIORITIES.code(row[7]), row[8])
+
+    def extend(self, other: "TaskTable"):
+        offset = len(self)
+        for name in ("day", "block", "minutes", "description", "category",
+                     "status", "progress", "priority"):
+            getattr(self, name).extend(getattr(other, name))
+        for i, note in other.notes.items():
+            self.notes[offset + i] = note
+
+    def __getitem__(self, i: int) -> Task:
+        return Task(self.day[i], self.block[i], self.minutes[i], self.description[i],
+                    self.category[i], self.status[i], self.progress[i], self.priority[i],
+                    self.notes.get(i))
+
+    def __iter__(self) -> Iterator[Task]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def rows(self) -> Iterator[Tuple]:
+        """Every row as sheet values, in HEADERS order."""
+        for i in range(len(self)):
+            yield self[i].values()
+
+    def sheet_row(self, i: int) -> int:
+        return self.first_row + i
+
+    def set_status(self, i: int, status: str) -> int:
+        """Change a task's status, returning the previous status code."""
+        old = self.status[i]
+        self.status[i] = STATUSES.code(status)
+        return old
+
+    def set_progress(self, i: int, progress: str) -> int:
+        """Change a task's progress, returning the previous progress code."""
+        old = self.progress[i]
+        self.progress[i] = PROGRESS.code(progress)
+        return old
+
+    def kpis(self) -> Dict[str, float]:
+        """The yearly dashboard KPIs (see KPIS), as fractions between 0 and 1."""
+        total = len(self)
+        if not total:
+            return dict.fromkeys(KPIS, 0.0)
+        core = CATEGORIES.code("Core Learning")
+        personal = CATEGORIES.code("Personal Development")
+        counts = {core: [0, 0], personal: [0, 0]}
+        done = planned_minutes = done_minutes = 0
+        days: Dict[int, List[int]] = {}
+        for i in range(total):
+            completed = self.status[i] == COMPLETED
+            category = self.category[i]
+            if category in counts:
+                counts[category][0] += completed
+                counts[category][1] += 1
+            day = days.setdefault(self.day[i], [0, 0])
+            day[0] += completed
+            day[1] += 1
+            done += completed
+            planned_minutes += self.minutes[i]
+            if completed:
+                done_minutes += self.minutes[i]
+        return {
+            "completion": done / total,
+            "core_learning": counts[core][0] / max(counts[core][1], 1),
+            "personal_development": counts[personal][0] / max(counts[personal][1], 1),
+            "time_utilization": done_minutes / max(planned_minutes, 1),
+            "consistency": sum(d / n >= CONSISTENCY_THRESHOLD for d, n in days.values()) / len(days),
+        }
+
+
+def plan_month(fixed_tasks: Sequence[Tuple[str, str, str, str]], year: int, month: int,
+               flexible_blocks: int = 3, flexible_duration: str = "2:00",
+               flexible_category: Optional[str] = FLEXIBLE_CATEGORY) -> TaskTable:
+    """A month of fixed tasks followed by empty flexible blocks, one day at a time.
+
+    The flexible blocks get `flexible_category`, or no category if it is None.
+    """
+    table = TaskTable()
+    fixed = [(DESCRIPTIONS.code(task), CATEGORIES.code(category), duration_minutes(duration),
+              PRIORITIES.code(priority)) for task, category, duration, priority in fixed_tasks]
+    fixed_block = BLOCKS.code("Fixed")
+    flexible = [BLOCKS.code(f"Flexible Block {block + 1}") for block in range(flexible_blocks)]
+    flexible_category = CATEGORIES.code(flexible_category)
+    flexible_minutes = duration_minutes(flexible_duration)
+
+    day = date(year, month, 1).toordinal()
+    end = (date(year, month + 1, 1) if month < 12 else date(year + 1, 1, 1)).toordinal()
+    while day < end:
+        for description, category, minutes, priority in fixed:
+            table.append(day, fixed_block, minutes, description, category, priority=priority)
+        for block in flexible:
+            table.append(day, block, flexible_minutes, 0, flexible_category)
+        day += 1
+    return table
+
+
+def write_rows(ws, table: TaskTable, date_format: Optional[str] = None):
+    """Write a table into a month sheet, skipping blank cells as the generators always have."""
+    durations = {}
+    for i in range(len(table)):
+        row = table.first_row + i
+        cell = ws.cell(row=row, column=1, value=datetime.fromordinal(table.day[i]))
+        if date_format:
+            cell.number_format = date_format
+        minutes = table.minutes[i]
+        if minutes not in durations:
+            durations[minutes] = format_minutes(minutes)
+        values = (BLOCKS.values[table.block[i]], durations[minutes],
+                  DESCRIPTIONS.values[table.description[i]], CATEGORIES.values[table.category[i]],
+                  STATUSES.values[table.status[i]], PROGRESS.values[table.progress[i]],
+                  PRIORITIES.values[table.priority[i]], table.notes.get(i))
+        for column, value in enumerate(values, 2):
+            if value is not None:
+                ws.cell(row=row, column=column, value=value)
+
+
+def read_rows(rows: Iterable[Sequence], first_row: int = 2) -> TaskTable:
+    """Build a table from month-sheet rows (values only, header excluded).
+
+    Reading stops at the first row without a date, which is where the
+    monthly dashboard starts.
+    """
+    table = TaskTable(first_row)
+    for row in rows:
+        if not isinstance(row[0], (datetime, date)):
+            break
+        table.add(row)
+    return table
+
+
+def write_updates(ws, table: TaskTable, indices: Iterable[int]):
+    """Write the status and progress of changed rows back to their cells."""
+    for i in indices:
+        row = table.first_row + i
+        ws.cell(row=row, column=6, value=STATUSES.values[table.status[i]])
+        ws.cell(row=row, column=7, value=PROGRESS.values[table.progress[i]])
+
+
+def memory_report(tasks: int = 100_000):
+    """Measure the memory the same tasks take in each representation."""
+    from openpyxl import Workbook
+
+    fixed = [("Project work", "Core Learning", "2:00", "High"),
+             ("Reading the bible", "Personal Development", "0:30", "Medium"),
+             ("Sleep", "Essential Activities", "5:00", "High")]
+    rows = []
+    year = 2025
+    while len(rows) < tasks:
+        for month in range(1, 13):
+            rows.extend(plan_month(fixed, year, month).rows())
+        year += 1
+    rows = rows[:tasks]
+
+    def measure(build):
+        tracemalloc.start()
+        result = build()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del result
+        return size
+
+    def build_sheet():
+        wb = Workbook()
+        write_rows(wb.active, table)
+        return wb
+
+    table = read_rows(rows)
+    sizes = [
+        ("TaskTable column arrays", measure(lambda: read_rows(rows))),
+        ("slotted Task records", measure(lambda: list(table))),
+        ("openpyxl cells", measure(build_sheet)),
+    ]
+    print(f"Memory for {tasks:,} tasks:")
+    for name, size in sizes:
+        print(f"  {name:<26}{size / 2**20:8.1f} MB  ({size / tasks:6.1f} bytes/task)")
+
+
+if __name__ == "__main__":
+    memory_report()
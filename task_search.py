@@ -0,0 +1,256 @@
+"""Search task descriptions and notes across every task workbook and backup.
+
+The text of the Task Description and Notes cells is split into lowercase
+words and kept in an inverted index: each word maps to the entries
+(workbook, sheet, row, date, category, column) it appears in. The index
+lives in a SQLite file next to the workbooks, so a query reads only the
+postings of its own words and answers in milliseconds however many years
+are indexed.
+
+Every search first brings the index up to date. Files whose size and
+modification time are unchanged are skipped. For the others, each sheet
+is fingerprinted by a CRC of its XML in the zip and of the shared strings
+its cells refer to (where its text is kept), and only sheets whose
+fingerprint changed are read again. Editing a note on one month sheet
+re-indexes that sheet alone.
+
+    python task_search.py huawei practice                 # every word must appear
+    python task_search.py "huaw*" --since 2025-01-01      # prefix match, date filter
+    python task_search.py bible --category "Personal Development" --latest
+"""
+import argparse
+import os
+import re
+import sqlite3
+import time
+import zipfile
+import zlib
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from task_history import BACKUP_NAME, discover
+from task_ingest import sheet_records
+from workbook_watch import sheet_members
+
+INDEX_FILE = ".task_search.sqlite"
+INDEX_VERSION = 2
+
+SHARED_STRINGS = "xl/sharedStrings.xml"
+
+TEXT_FIELDS = ("description", "notes")
+
+WORD = re.compile(r"\w+")
+
+SHARED_STRING = re.compile(rb"<si>(.*?)</si>", re.S)
+SHARED_STRING_CELL = re.compile(rb'(<c\b[^>]*?\bt="s"[^>]*>\s*<v>)(\d+)(?=</v>)')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, backup INTEGER);
+CREATE TABLE IF NOT EXISTS sheets (
+    id INTEGER PRIMARY KEY, path TEXT, sheet TEXT, fingerprint INTEGER, UNIQUE (path, sheet));
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY, sheet_id INTEGER, row INTEGER, day INTEGER,
+    category TEXT, field TEXT, text TEXT);
+CREATE INDEX IF NOT EXISTS entries_sheet ON entries (sheet_id);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT, entry_id INTEGER, PRIMARY KEY (term, entry_id)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_entry ON postings (entry_id);
+"""
+
+
+def words(text: str) -> List[str]:
+    return WORD.findall(text.lower())
+
+
+def sheet_entries(rows: Iterable[Tuple]) -> List[Tuple[int, int, str, str, str]]:
+    """(row, day ordinal, category, field, text) for every task row with text, in any layout."""
+    entries = []
+    for record in sheet_records(rows):
+        for field, text in zip(TEXT_FIELDS, (record.task, record.notes)):
+            if text:
+                entries.append((record.row, record.date.toordinal(), record.category or "", field, text))
+    return entries
+
+
+def sheet_fingerprints(path: str) -> Dict[str, int]:
+    """A checksum per sheet that changes whenever the sheet's cell values can have."""
+    with zipfile.ZipFile(path) as zf:
+        members = sheet_members(zf)
+        names = set(zf.namelist())
+        strings = SHARED_STRING.findall(zf.read(SHARED_STRINGS)) if SHARED_STRINGS in names else []
+        fingerprints = {}
+        for sheet, member in members.items():
+            xml = zf.read(member) if member in names else b""
+            # Hash the text in place of the shared string numbers, which shift as other sheets change
+            parts = SHARED_STRING_CELL.split(xml)
+            for i in range(2, len(parts), 3):
+                index = int(parts[i])
+                parts[i] = strings[index] if index < len(strings) else parts[i]
+            fingerprints[sheet] = zlib.crc32(b"".join(parts))
+    return fingerprints
+
+
+class SearchIndex:
+    """The inverted index on disk, with incremental updates per sheet."""
+
+    def __init__(self, path: str = INDEX_FILE):
+        self.db = sqlite3.connect(path)
+        version = self.db.execute("PRAGMA user_version").fetchone()[0]
+        if version != INDEX_VERSION:
+            for table in ("files", "sheets", "entries", "postings"):
+                self.db.execute(f"DROP TABLE IF EXISTS {table}")
+            self.db.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def _drop_sheet(self, sheet_id: int):
+        self.db.execute("DELETE FROM postings WHERE entry_id IN "
+                        "(SELECT id FROM entries WHERE sheet_id = ?)", (sheet_id,))
+        self.db.execute("DELETE FROM entries WHERE sheet_id = ?", (sheet_id,))
+        self.db.execute("DELETE FROM sheets WHERE id = ?", (sheet_id,))
+
+    def _add_sheet(self, path: str, sheet: str, fingerprint: int, entries) -> int:
+        sheet_id = self.db.execute("INSERT INTO sheets (path, sheet, fingerprint) VALUES (?, ?, ?)",
+                                   (path, sheet, fingerprint)).lastrowid
+        for row, day, category, field, text in entries:
+            entry_id = self.db.execute(
+                "INSERT INTO entries (sheet_id, row, day, category, field, text) VALUES (?, ?, ?, ?, ?, ?)",
+                (sheet_id, row, day, category, field, text)).lastrowid
+            self.db.executemany("INSERT OR IGNORE INTO postings VALUES (?, ?)",
+                                ((term, entry_id) for term in set(words(text))))
+        return len(entries)
+
+    def update_file(self, path: str) -> int:
+        """Re-index the sheets of one workbook that changed; returns how many were read."""
+        from openpyxl import load_workbook
+
+        key = os.path.abspath(path)
+        stat = os.stat(path)
+        known = self.db.execute("SELECT size, mtime_ns FROM files WHERE path = ?", (key,)).fetchone()
+        if known == (stat.st_size, stat.st_mtime_ns):
+            return 0
+
+        fingerprints = sheet_fingerprints(path)
+        indexed = {sheet: (sheet_id, fingerprint) for sheet_id, sheet, fingerprint in self.db.execute(
+            "SELECT id, sheet, fingerprint FROM sheets WHERE path = ?", (key,))}
+        changed = [sheet for sheet, fingerprint in fingerprints.items()
+                   if indexed.get(sheet, (None, None))[1] != fingerprint]
+        for sheet, (sheet_id, _) in indexed.items():
+            if sheet not in fingerprints or sheet in changed:
+                self._drop_sheet(sheet_id)
+        if changed:
+            wb = load_workbook(path, read_only=True, data_only=True)
+            try:
+                for sheet in changed:
+                    self._add_sheet(key, sheet, fingerprints[sheet],
+                                    sheet_entries(wb[sheet].iter_rows(values_only=True)))
+            finally:
+                wb.close()
+        backup = BACKUP_NAME.match(os.path.basename(path)) is not None
+        self.db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                        (key, stat.st_size, stat.st_mtime_ns, backup))
+        self.db.commit()
+        return len(changed)
+
+    def update(self, paths: List[str]) -> Tuple[int, int]:
+        """Bring the index up to date with these files, forgetting any others.
+
+        Returns (files changed, sheets read).
+        """
+        keep = {os.path.abspath(path) for path in paths}
+        for (path,) in self.db.execute("SELECT path FROM files").fetchall():
+            if path not in keep:
+                for (sheet_id,) in self.db.execute("SELECT id FROM sheets WHERE path = ?", (path,)).fetchall():
+                    self._drop_sheet(sheet_id)
+                self.db.execute("DELETE FROM files WHERE path = ?", (path,))
+        self.db.commit()
+        files = sheets = 0
+        for path in paths:
+            read = self.update_file(path)
+            files += read > 0
+            sheets += read
+        return files, sheets
+
+    def search(self, query: str, since: Optional[date] = None, until: Optional[date] = None,
+               category: Optional[str] = None, field: Optional[str] = None,
+               latest: bool = False, limit: Optional[int] = 20) -> List[Tuple]:
+        """(date, workbook, sheet, row, category, field, text) of entries holding every query word.
+
+        A word ending in "*" matches any word it starts. Newest entries come
+        first; `latest` leaves out backups.
+        """
+        matches, params = [], []
+        for term in query.lower().split():
+            term_words = words(term)
+            for i, word in enumerate(term_words):
+                if term.endswith("*") and i == len(term_words) - 1:
+                    matches.append("SELECT entry_id FROM postings WHERE term >= ? AND term < ?")
+                    params += [word, word[:-1] + chr(ord(word[-1]) + 1)]
+                else:
+                    matches.append("SELECT entry_id FROM postings WHERE term = ?")
+                    params.append(word)
+        if not matches:
+            return []
+        sql = ("SELECT e.day, s.path, s.sheet, e.row, e.category, e.field, e.text "
+               "FROM entries e JOIN sheets s ON s.id = e.sheet_id JOIN files f ON f.path = s.path "
+               f"WHERE e.id IN ({' INTERSECT '.join(matches)})")
+        if since:
+            sql += " AND e.day >= ?"
+            params.append(since.toordinal())
+        if until:
+            sql += " AND e.day <= ?"
+            params.append(until.toordinal())
+        if category:
+            sql += " AND lower(e.category) = lower(?)"
+            params.append(category)
+        if field:
+            sql += " AND e.field = ?"
+            params.append(field)
+        if latest:
+            sql += " AND NOT f.backup"
+        sql += " ORDER BY e.day DESC, s.path, s.sheet, e.row"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return [(date.fromordinal(row[0]),) + row[1:] for row in self.db.execute(sql, params)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search task descriptions and notes in every workbook.")
+    parser.add_argument("query", nargs="*", help='words that must all appear; "word*" matches a prefix')
+    parser.add_argument("--root", default=".", help="directory holding the workbooks and backups/")
+    parser.add_argument("--since", type=date.fromisoformat, help="only tasks on or after this date")
+    parser.add_argument("--until", type=date.fromisoformat, help="only tasks on or before this date")
+    parser.add_argument("--category", help="only tasks in this category")
+    parser.add_argument("--field", choices=TEXT_FIELDS, help="search only this column")
+    parser.add_argument("--latest", action="store_true", help="leave out backups")
+    parser.add_argument("--limit", type=int, default=20, help="most results shown (0 for all)")
+    parser.add_argument("--index", default=None, help=f"index file (default: ROOT/{INDEX_FILE})")
+    args = parser.parse_args()
+
+    index = SearchIndex(args.index or os.path.join(args.root, INDEX_FILE))
+    try:
+        start = time.perf_counter()
+        files, sheets = index.update(discover(args.root))
+        if files:
+            print(f"Indexed {sheets} changed sheets in {files} workbooks "
+                  f"in {time.perf_counter() - start:.2f}s")
+        if not args.query:
+            return
+        start = time.perf_counter()
+        results = index.search(" ".join(args.query), args.since, args.until, args.category,
+                               args.field, args.latest, args.limit)
+        elapsed = time.perf_counter() - start
+    finally:
+        index.close()
+
+    for day, path, sheet, row, category, field, text in results:
+        print(f"{day.isoformat()}  {os.path.basename(path)} {sheet}!{row}  "
+              f"[{category or '-'}] {field}: {text}")
+    print(f"{len(results)} results in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import Callable, List, Optional, Sequence, Tuple
+
+
+class Timer:
+    """A callback due at a given tick of the engine."""
+    __slots__ = ("expires", "callback", "cancelled")
+
+    def __init__(self, expires: int, callback: Callable[[int, float], None]):
+        self.expires = expires
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TimerWheel:
+    """Hierarchical timing wheel counting in whole ticks.
+
+    Level 0 holds timers due within `slots` ticks, level 1 within slots**2
+    ticks and so on; a level's slot is cascaded down when the wheel reaches
+    it. Adding a timer and advancing one tick are O(1) apart from the
+    timers that actually expire or cascade.
+    """
+
+    def __init__(self, slots: int = 64, levels: int = 4):
+        self.slots = slots
+        self.levels = levels
+        self.current = 0
+        self.wheels = [[[] for _ in range(slots)] for _ in range(levels)]
+        self.overflow: List[Timer] = []
+        self.count = 0
+
+    def add(self, timer: Timer, _counted: bool = False):
+        if not _counted:
+            self.count += 1
+        delta = timer.expires - self.current
+        span = self.slots
+        for level in range(self.levels):
+            if delta < span:
+                index = (max(timer.expires, self.current) // (span // self.slots)) % self.slots
+                self.wheels[level][index].append(timer)
+                return
+            span *= self.slots
+        self.overflow.append(timer)
+
+    def advance(self) -> List[Timer]:
+        """Move to the next tick and return the timers due on it."""
+        self.current += 1
+        span = self.slots
+        for level in range(1, self.levels):
+            if self.current % span:
+                break
+            index = (self.current // span) % self.slots
+            bucket, self.wheels[level][index] = self.wheels[level][index], []
+            for timer in bucket:
+                self.add(timer, _counted=True)
+            span *= self.slots
+        else:
+            if self.current % span == 0 and self.overflow:
+                pending, self.overflow = self.overflow, []
+                for timer in pending:
+                    self.add(timer, _counted=True)
+
+        index = self.current % self.slots
+        expired, self.wheels[0][index] = self.wheels[0][index], []
+        self.count -= len(expired)
+        return expired
+
+
+class Countdown:
+    """Counts down a number of ticks, calling on_tick each tick and on_finish at zero."""
+
+    def __init__(self, engine: "TimerEngine", ticks: int, name: str = "",
+                 on_tick: Optional[Callable[["Countdown", int, float], None]] = None,
+                 on_finish: Optional[Callable[["Countdown", float], None]] = None):
+        self.engine = engine
+        self.name = name
+        self.remaining = ticks
+        self.on_tick = on_tick
+        self.on_finish = on_finish
+        self.finished = False
+        self._timer = engine.call_later(1, self._tick)
+
+    def _tick(self, tick: int, lateness: float):
+        self.remaining -= 1
+        if self.on_tick:
+            self.on_tick(self, self.remaining, lateness)
+        if self.remaining > 0:
+            self._timer = self.engine.call_later(1, self._tick)
+        else:
+            self.finished = True
+            if self.on_finish:
+                self.on_finish(self, lateness)
+
+    def cancel(self):
+        self._timer.cancel()
+        self.finished = True
+
+
+class TimerEngine:
+    """Runs any number of timers from one asyncio task with one wakeup per tick.
+
+    Tick n is due at origin + n * tick on the monotonic clock, so however
+    long callbacks or the event loop take, lateness never accumulates: a
+    late tick only delays that tick, and missed ticks are caught up at once.
+    """
+
+    def __init__(self, tick: float = 1.0, slots: int = 64, levels: int = 4):
+        self.tick = tick
+        self.wheel = TimerWheel(slots, levels)
+        self.origin: Optional[float] = None
+        self.wakeups: List[float] = []
+        self.record_wakeups = False
+        self._stopped = False
+
+    def call_later(self, ticks: int, callback: Callable[[int, float], None]) -> Timer:
+        """Call callback(tick, lateness) `ticks` ticks from the current one."""
+        timer = Timer(self.wheel.current + max(int(ticks), 1), callback)
+        self.wheel.add(timer)
+        return timer
+
+    def countdown(self, seconds: float, name: str = "", on_tick=None, on_finish=None) -> Countdown:
+        return Countdown(self, round(seconds / self.tick), name, on_tick, on_finish)
+
+    def deadline(self, tick: int) -> float:
+        return self.origin + tick * self.tick
+
+    def stop(self):
+        self._stopped = True
+
+    async def run(self, until_idle: bool = True):
+        """Tick until stopped, or until no timers are left if until_idle."""
+        self.origin = time.monotonic() - self.wheel.current * self.tick
+        self._stopped = False
+        while not self._stopped and (self.wheel.count or not until_idle):
+            due = self.deadline(self.wheel.current + 1)
+            delay = due - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            # Catch up on every tick whose deadline has passed
+            while self.deadline(self.wheel.current + 1) <= time.monotonic():
+                tick = self.wheel.current + 1
+                lateness = time.monotonic() - self.deadline(tick)
+                if self.record_wakeups:
+                    self.wakeups.append(lateness)
+                for timer in self.wheel.advance():
+                    if not timer.cancelled:
+                        timer.callback(tick, lateness)
+
+
+def parse_duration(duration: str) -> int:
+    """Seconds in an "H:MM" duration as used in the task sheets' Duration column."""
+    hours, minutes = duration.split(":")
+    return int(hours) * 3600 + int(minutes) * 60
+
+
+class TimeBlockSession:
+    """Runs time blocks back to back on a TimerEngine, Pomodoro style.
+
+    `blocks` is a sequence of (task, duration) pairs, durations in the
+    "H:MM" format of the task sheets or in seconds. The hooks receive the
+    task name so a task manager can mark rows In Progress on start and
+    Completed on finish.
+    """
+
+    def __init__(self, engine: TimerEngine, blocks: Sequence[Tuple[str, object]],
+                 on_start: Optional[Callable[[str, int], None]] = None,
+                 on_tick: Optional[Callable[[str, int], None]] = None,
+                 on_finish: Optional[Callable[[str], None]] = None,
+                 on_complete: Optional[Callable[[], None]] = None):
+        self.engine = engine
+        self.blocks = [(task, parse_duration(d) if isinstance(d, str) else int(d)) for task, d in blocks]
+        self.on_start = on_start
+        self.on_tick = on_tick
+        self.on_finish = on_finish
+        self.on_complete = on_complete
+        self.index = -1
+        self.current: Optional[Countdown] = None
+
+    def start(self):
+        self._next()
+        return self
+
+    def _next(self):
+        self.index += 1
+        if self.index >= len(self.blocks):
+            if self.on_complete:
+                self.on_complete()
+            return
+        task, seconds = self.blocks[self.index]
+        if self.on_start:
+            self.on_start(task, seconds)
+        self.current = self.engine.countdown(
+            seconds, task,
+            on_tick=lambda c, remaining, _: self.on_tick and self.on_tick(c.name, remaining),
+            on_finish=self._finished)
+
+    def _finished(self, countdown: Countdown, lateness: float):
+        if self.on_finish:
+            self.on_finish(countdown.name)
+        self._next()
+
+
+def pomodoro(task: str, cycles: int = 4, work: str = "0:25", short_break: str = "0:05",
+             long_break: str = "0:15") -> List[Tuple[str, str]]:
+    """Blocks for a classic Pomodoro run on one task."""
+    blocks = []
+    for cycle in range(1, cycles + 1):
+        blocks.append((task, work))
+        blocks.append(("Long break" if cycle == cycles else "Short break",
+                       long_break if cycle == cycles else short_break))
+    return blocks
+
+
+async def benchmark(timers: int, seconds: float, tick: float):
+    """Run many concurrent countdowns and report how late each tick fires."""
+    engine = TimerEngine(tick)
+    engine.record_wakeups = True
+    fired = 0
+    callback_lateness: List[float] = []
+
+    def on_tick(countdown, remaining, lateness):
+        nonlocal fired
+        fired += 1
+        if fired % 97 == 0:
+            callback_lateness.append(time.monotonic() - engine.deadline(engine.wheel.current))
+
+    ticks = round(seconds / tick)
+    rng = random.Random(0)
+    for i in range(timers):
+        engine.countdown(rng.randint(ticks // 2, ticks) * tick, f"timer {i}", on_tick=on_tick)
+
+    start = time.monotonic()
+    await engine.run()
+    elapsed = time.monotonic() - start
+
+    def summary(values: List[float]) -> str:
+        values = sorted(values)
+        p99 = values[min(len(values) - 1, int(len(values) * 0.99))]
+        return (f"p50 {statistics.median(values) * 1000:.3f} ms, "
+                f"p99 {p99 * 1000:.3f} ms, max {values[-1] * 1000:.3f} ms")
+
+    print(f"{timers} countdowns, {fired} tick callbacks over {len(engine.wakeups)} ticks "
+          f"in {elapsed:.2f}s (expected {ticks * tick:.2f}s)")
+    print(f"Tick wakeup lateness:     {summary(engine.wakeups)}")
+    print(f"Callback lateness:        {summary(callback_lateness)}")
+    print(f"Final drift vs schedule:  {(elapsed - ticks * tick) * 1000:.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drift-free countdowns on a hierarchical timer wheel.")
+    parser.add_argument("--bench", action="store_true", help="measure wakeup accuracy under load")
+    parser.add_argument("--timers", type=int, default=10000)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--tick", type=float, default=0.1)
+    parser.add_argument("--count", type=int, default=10, help="countdown length when not benchmarking")
+    args = parser.parse_args()
+
+    if args.bench:
+        asyncio.run(benchmark(args.timers, args.seconds, args.tick))
+        return
+
+    # Same output as Day4.py, without the drift of sleeping one second at a time
+    engine = TimerEngine(1.0)
+    print(args.count)
+    engine.countdown(args.count,
+                     on_tick=lambda c, remaining, _: remaining and print(remaining),
+                     on_finish=lambda c, _: print("Countdown complete"))
+    asyncio.run(engine.run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""Row-level diff between two snapshots of a task workbook.
+
+Sheets are streamed with openpyxl's read-only reader, and rows are keyed
+by (date, time block, task). The remaining columns are hashed, so each
+sheet is compared in one linear pass: rows of the old sheet go into a
+dict, and each new row either matches, changes or is added. Rows left
+over were removed.
+
+Sheets whose zip member CRC is the same in both files are skipped without
+parsing. That is only safe while the shared strings they refer to are
+unchanged. Excel appends new strings to the shared-string table, but if
+an existing string moved, no sheet is skipped.
+"""
+import argparse
+import glob
+import os
+import zipfile
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+from xml.etree import ElementTree
+
+from openpyxl import load_workbook
+
+from task_history import snapshot_source
+from workbook_watch import MAIN_NS, sheet_members
+
+# Header names accepted for each part of a row's key
+KEY_ALIASES = {
+    "date": ("Date",),
+    "block": ("Time Block", "Time"),
+    "task": ("Task Description",),
+}
+
+SHARED_STRINGS = "xl/sharedStrings.xml"
+
+
+def shared_strings(zf: zipfile.ZipFile) -> List[str]:
+    try:
+        data = zf.read(SHARED_STRINGS)
+    except KeyError:
+        return []
+    return ["".join(t.text or "" for t in si.iter(f"{MAIN_NS}t"))
+            for si in ElementTree.fromstring(data).iter(f"{MAIN_NS}si")]
+
+
+def unchanged_sheets(old_path: str, new_path: str) -> List[str]:
+    """Sheets whose XML is byte-identical and resolves to the same strings."""
+    with zipfile.ZipFile(old_path) as old, zipfile.ZipFile(new_path) as new:
+        old_members, new_members = sheet_members(old), sheet_members(new)
+        old_crcs = {info.filename: info.CRC for info in old.infolist()}
+        new_crcs = {info.filename: info.CRC for info in new.infolist()}
+        if old_crcs.get(SHARED_STRINGS) != new_crcs.get(SHARED_STRINGS):
+            old_strings = shared_strings(old)
+            if shared_strings(new)[:len(old_strings)] != old_strings:
+                return []
+        return [name for name, member in old_members.items()
+                if name in new_members and old_crcs[member] == new_crcs.get(new_members[name])]
+
+
+def _text(value) -> str:
+    if isinstance(value, datetime) and value == datetime(value.year, value.month, value.day):
+        return value.date().isoformat()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return "" if value is None else str(value)
+
+
+class SheetRows:
+    """A task sheet's rows as (key, hash, values), in sheet order."""
+
+    def __init__(self, ws):
+        self.ws = ws
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None) or ()
+        self.headers = [str(h).strip() if h is not None else "" for h in header]
+        self.key_columns: List[int] = []
+        for aliases in KEY_ALIASES.values():
+            index = next((self.headers.index(a) for a in aliases if a in self.headers), None)
+            if index is not None:
+                self.key_columns.append(index)
+        self.value_columns = [i for i in range(len(self.headers))
+                              if i not in self.key_columns and self.headers[i]]
+
+    @property
+    def is_task_sheet(self) -> bool:
+        return "Date" in self.headers
+
+    def __iter__(self) -> Iterator[Tuple[Tuple, int, Tuple]]:
+        seen: Dict[Tuple, int] = {}
+        width = len(self.headers)
+        for row in self.ws.iter_rows(min_row=2, max_col=width, values_only=True):
+            row = tuple(row) + (None,) * (width - len(row))
+            if all(value is None for value in row):
+                continue
+            key = tuple(_text(row[i]) for i in self.key_columns)
+            # Rows with the same key (such as blank time slots) are told apart by order
+            occurrence = seen[key] = seen.get(key, -1) + 1
+            values = tuple(row[i] for i in self.value_columns)
+            yield key + (occurrence,), hash(values), values
+
+
+def diff_sheet(old: SheetRows, new: SheetRows) -> Dict[str, List]:
+    """Added, removed and changed rows between two versions of a sheet."""
+    pending = {key: (digest, values) for key, digest, values in old}
+    added, changed = [], []
+    for key, digest, values in new:
+        previous = pending.pop(key, None)
+        if previous is None:
+            added.append((key, values))
+        elif previous[0] != digest or previous[1] != values:
+            changes = [(new.headers[column], before, after)
+                       for column, before, after in zip(new.value_columns, previous[1], values)
+                       if before != after]
+            changed.append((key, changes))
+    removed = list(pending.items())
+    return {"added": added, "removed": [(key, values) for key, (_, values) in removed],
+            "changed": changed}
+
+
+def diff_workbooks(old_path: str, new_path: str, sheets: Optional[List[str]] = None):
+    """Yield (sheet, status, diff) for every sheet in either workbook.
+
+    status is "unchanged" (skipped by hash), "added", "removed",
+    "not a task sheet" or "compared".
+    """
+    skip = set(unchanged_sheets(old_path, new_path))
+    old_wb = load_workbook(old_path, read_only=True)
+    new_wb = load_workbook(new_path, read_only=True)
+    try:
+        names = list(new_wb.sheetnames) + [n for n in old_wb.sheetnames if n not in new_wb.sheetnames]
+        for name in names:
+            if sheets and name not in sheets:
+                continue
+            if name in skip:
+                yield name, "unchanged", None
+            elif name not in old_wb.sheetnames:
+                yield name, "added", None
+            elif name not in new_wb.sheetnames:
+                yield name, "removed", None
+            else:
+                old_rows, new_rows = SheetRows(old_wb[name]), SheetRows(new_wb[name])
+                if not (old_rows.is_task_sheet and new_rows.is_task_sheet):
+                    yield name, "not a task sheet", None
+                else:
+                    yield name, "compared", diff_sheet(old_rows, new_rows)
+    finally:
+        old_wb.close()
+        new_wb.close()
+
+
+def _describe_key(key: Tuple) -> str:
+    *parts, occurrence = key
+    text = " | ".join(part for part in parts if part)
+    return f"{text} (#{occurrence + 1})" if occurrence else text
+
+
+def latest_backups(folder: str = "backups") -> Tuple[str, str]:
+    """The two most recent snapshots in the backup folder."""
+    paths = sorted(glob.glob(os.path.join(folder, "*.xlsx")), key=lambda p: snapshot_source(p)[1])
+    if len(paths) < 2:
+        raise SystemExit(f"Need at least two backups in {folder}/ to compare")
+    return paths[-2], paths[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show row-level changes between two workbook snapshots.")
+    parser.add_argument("old", nargs="?", help="older snapshot")
+    parser.add_argument("new", nargs="?", help="newer snapshot")
+    parser.add_argument("--latest", action="store_true", help="compare the two newest files in backups/")
+    parser.add_argument("--sheet", action="append", help="only compare this sheet (repeatable)")
+    parser.add_argument("--summary", action="store_true", help="print counts only")
+    args = parser.parse_args()
+
+    if args.latest:
+        args.old, args.new = latest_backups()
+    if not (args.old and args.new):
+        parser.error("give two snapshots, or --latest")
+
+    print(f"--- {args.old}\n+++ {args.new}")
+    totals = {"added": 0, "removed": 0, "changed": 0}
+    for name, status, diff in diff_workbooks(args.old, args.new, args.sheet):
+        if diff is None:
+            if status != "unchanged" or args.summary:
+                print(f"{name}: {status}")
+            continue
+        counts = {kind: len(rows) for kind, rows in diff.items()}
+        for kind, count in counts.items():
+            totals[kind] += count
+        if not any(counts.values()):
+            print(f"{name}: no row changes")
+            continue
+        print(f"{name}: {counts['added']} added, {counts['removed']} removed, {counts['changed']} changed")
+        if args.summary:
+            continue
+        for key, values in diff["removed"]:
+            print(f"  - {_describe_key(key)}")
+        for key, values in diff["added"]:
+            print(f"  + {_describe_key(key)}")
+        for key, changes in diff["changed"]:
+            detail = "; ".join(f"{column}: {_text(before) or '(blank)'} -> {_text(after) or '(blank)'}"
+                               for column, before, after in changes)
+            print(f"  ~ {_describe_key(key)}: {detail}")
+    print(f"Total: {totals['added']} added, {totals['removed']} removed, {totals['changed']} changed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import argparse
+import functools
+import io
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from openpyxl import Workbook
+from openpyxl.worksheet.worksheet import Worksheet
+
+# Set to an output path to profile every TaskManagerExcel/EnhancedTaskManager
+# created in the process. A .json path gets a Chrome trace (chrome://tracing,
+# Perfetto), anything else gets one JSON object per line.
+PROFILE_ENV = "TASKMANAGER_PROFILE"
+
+# Set to 0 to skip memory tracking, which slows openpyxl down several times
+PROFILE_MEMORY_ENV = "TASKMANAGER_PROFILE_MEMORY"
+
+
+def _rows(target) -> int:
+    if isinstance(target, Worksheet):
+        return target.max_row
+    if isinstance(target, Workbook):
+        return sum(ws.max_row for ws in target.worksheets)
+    return 0
+
+
+class PhaseProfiler:
+    """Records wall time, CPU time, memory and rows written for nested phases.
+
+    Memory is tracked with tracemalloc: `alloc_bytes` is what the phase
+    allocated and still held when it finished, `peak_bytes` the most it held
+    at once. Phases may nest; a parent's peak includes its children's.
+    Rows are the rows a phase added to the worksheet it was given, or the
+    rows of the sheet or workbook it created; a phase given a whole workbook
+    (such as a save) reports every row in it.
+    """
+
+    def __init__(self, output: Optional[str] = None, track_memory: bool = True):
+        self.output = output
+        self.track_memory = track_memory
+        self.events: List[Dict] = []
+        self._stack: List[Dict] = []
+        self._origin = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str, target=None, **details):
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        frame = {"peak": 0}
+        if self.track_memory:
+            frame["mem"] = tracemalloc.get_traced_memory()[0]
+            if self._stack:
+                self._stack[-1]["peak"] = max(self._stack[-1]["peak"], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        rows_before = _rows(target) if isinstance(target, Worksheet) else 0
+        self._stack.append(frame)
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        record = {}
+        try:
+            yield record
+        finally:
+            wall_end = time.perf_counter()
+            cpu_end = time.process_time()
+            self._stack.pop()
+            event = {
+                "phase": name,
+                "start_s": round(wall - self._origin, 6),
+                "wall_s": round(wall_end - wall, 6),
+                "cpu_s": round(cpu_end - cpu, 6),
+                "rows": _rows(target) - rows_before,
+                "depth": len(self._stack),
+            }
+            event.update(record)
+            if self.track_memory:
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(frame["peak"], peak)
+                event["alloc_bytes"] = current - frame["mem"]
+                event["peak_bytes"] = peak - frame["mem"]
+                if self._stack:
+                    self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak)
+            if isinstance(target, Worksheet):
+                event["sheet"] = target.title
+            event.update(details)
+            self.events.append(event)
+            if not self._stack:
+                self.write()
+
+    def wrap(self, name: str, method):
+        """Wrap a method so every call is recorded as a phase."""
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            target = next((a for a in args if isinstance(a, (Worksheet, Workbook))), None)
+            with self.phase(name, target) as record:
+                result = method(*args, **kwargs)
+                # A phase that creates a sheet or workbook is credited with its rows
+                if isinstance(result, Worksheet) and not isinstance(target, Worksheet):
+                    record["rows"] = _rows(result)
+                elif target is None and isinstance(result, Workbook):
+                    record["rows"] = _rows(result)
+                return result
+        return wrapper
+
+    def write(self):
+        if not self.output:
+            return
+        with open(self.output, "w") as f:
+            if self.output.endswith(".json"):
+                json.dump(self.chrome_trace(), f)
+            else:
+                for event in self.events:
+                    f.write(json.dumps(event) + "\n")
+
+    def chrome_trace(self) -> Dict:
+        """The recorded phases as Chrome trace 'complete' events."""
+        pid, tid = os.getpid(), threading.get_ident()
+        return {"traceEvents": [
+            {"name": event["phase"], "ph": "X", "pid": pid, "tid": tid,
+             "ts": event["start_s"] * 1e6, "dur": event["wall_s"] * 1e6,
+             "args": {k: v for k, v in event.items() if k not in ("phase", "start_s", "wall_s")}}
+            for event in self.events
+        ]}
+
+    def summary(self) -> str:
+        """Per-phase totals, in the order phases first ran."""
+        totals: Dict[str, Dict] = {}
+        for event in self.events:
+            total = totals.setdefault(event["phase"], {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0,
+                                                       "alloc_bytes": 0, "rows": 0})
+            total["calls"] += 1
+            for key in ("wall_s", "cpu_s", "alloc_bytes", "rows"):
+                total[key] += event.get(key, 0)
+        lines = [f"{'phase':<34}{'calls':>6}{'wall s':>9}{'cpu s':>9}{'alloc MB':>10}{'rows':>8}"]
+        for name, total in sorted(totals.items(), key=lambda item: min(
+                e["start_s"] for e in self.events if e["phase"] == item[0])):
+            lines.append(f"{name:<34}{total['calls']:>6}{total['wall_s']:>9.3f}{total['cpu_s']:>9.3f}"
+                         f"{total['alloc_bytes'] / 2**20:>10.2f}{total['rows']:>8}")
+        return "\n".join(lines)
+
+
+def instrument(manager, profiler: PhaseProfiler):
+    """Record every phase listed in the manager's `profiled_phases`."""
+    for name in manager.profiled_phases:
+        method = getattr(manager, name, None)
+        if method is not None:
+            setattr(manager, name, profiler.wrap(name, method))
+    manager.profiler = profiler
+    return profiler
+
+
+def instrument_from_env(manager) -> Optional[PhaseProfiler]:
+    """Instrument the manager if TASKMANAGER_PROFILE is set; otherwise do nothing."""
+    output = os.environ.get(PROFILE_ENV)
+    if not output:
+        return None
+    track_memory = os.environ.get(PROFILE_MEMORY_ENV, "1") != "0"
+    return instrument(manager, PhaseProfiler(output, track_memory))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the phases of a workbook generator.")
+    parser.add_argument("generator", choices=["progress", "enhanced"])
+    parser.add_argument("--output", help="write phases here (.json for a Chrome trace, else JSON lines)")
+    parser.add_argument("--save", help="also save the workbook to this path (default: in memory)")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip tracemalloc, which slows generation down noticeably")
+    args = parser.parse_args()
+
+    if args.generator == "progress":
+        from benchmark_generators import load_progress_checker
+        manager = load_progress_checker().TaskManagerExcel(args.save or io.BytesIO())
+    else:
+        from enhanced_routine_checker import EnhancedTaskManager
+        manager = EnhancedTaskManager(args.save or io.BytesIO())
+    profiler = instrument(manager, PhaseProfiler(args.output, not args.no_memory))
+
+    try:
+        with profiler.phase("total"):
+            manager.save_workbook(manager.create_workbook())
+    except Exception as e:
+        print(f"Generation failed: {type(e).__name__}: {e}", file=sys.stderr)
+    print(profiler.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""Check every task sheet of a workbook against the configured value lists.
+
+Dropdowns only stop bad values typed into Excel; pasted rows and older
+layouts get past them. This reports, with sheet and cell coordinates:
+
+    enum values      Status, Category, Priority, Progress and Task Type cells
+                     that are not in the list configured for the sheet's layout
+    dates            Date cells that are not dates, or that go backwards
+    durations        Duration cells that are neither "H:MM" text nor a time value
+
+A sheet's task rows end at the first section title in its Date column
+(such as "Monthly Dashboard"); the dashboard tables below are not checked.
+
+openpyxl takes over half a minute to stream 500k rows, so sheets are
+scanned straight from their XML with one regex that only matches the
+columns being checked. Shared strings are checked once per distinct
+string, so each cell costs a set lookup on its string index; inline
+strings are looked up by their raw XML text the same way.
+"""
+import argparse
+import re
+import sys
+import time
+import zipfile
+from bisect import bisect_left
+from collections import defaultdict
+from functools import lru_cache
+from xml.sax.saxutils import escape
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from workbook_diff import shared_strings
+from workbook_watch import sheet_members
+
+DURATION = re.compile(r"^\d{1,2}:[0-5]\d$")
+DURATION_BYTES = re.compile(rb"\d{1,2}:[0-5]\d$")
+DURATION_HEADERS = ("Duration", "Duration (in hrs)")
+
+FIRST_ROW = re.compile(rb'<row\b[^>]*>(.*?)</row>', re.S)
+HEADER_CELL = re.compile(rb'<c r="([A-Z]+)1"([^>]*?)(?:/>|>(.*?)</c>)', re.S)
+VALUE = re.compile(rb'<v>([^<]*)</v>|<t[^>]*>([^<]*)</t>')
+
+
+@lru_cache(maxsize=None)
+def configured_lists(headers: Tuple[str, ...]) -> Dict[str, List[str]]:
+    """Allowed values per column for the layout the headers belong to."""
+    if "Time Block" in headers:
+        from enhanced_routine_checker import EnhancedTaskManager
+        manager = EnhancedTaskManager()
+        return {column: options for column, options in zip(
+            ("Category", "Status", "Progress", "Priority"),
+            manager._validation_lists().values())}
+    if "Task Type" in headers:
+        from routine import EnhancedTaskManager
+        manager = EnhancedTaskManager()
+        return {
+            "Status": manager.status_options,
+            "Progress": manager.progress_options,
+            "Task Type": ["Daily", "Weekly", "Monthly"],
+            "Priority": list(manager.priority_colors.keys()),
+            "Category": manager.task_categories,
+        }
+    if "Due Time" in headers:
+        import routinerefined
+        return {routinerefined.HEADERS[ord(column) - ord("A")]: options
+                for column, options in routinerefined.VALIDATIONS.items()}
+    return {}
+
+
+class SheetCheck:
+    """The columns to check in one sheet and the shared strings each accepts."""
+
+    def __init__(self, headers: Dict[str, str], strings: List[str]):
+        self.lists = configured_lists(tuple(headers.values()))
+        self.columns: Dict[str, str] = {}
+        for column, header in headers.items():
+            if header == "Date" or header in self.lists or header in DURATION_HEADERS:
+                self.columns[column] = header
+        self.date_column = next((c for c, h in self.columns.items() if h == "Date"), None)
+        self.allowed = {header: set(options) for header, options in self.lists.items()}
+        # Every distinct shared string is checked once per column; cells then
+        # only look up their string index, kept as the bytes found in the XML
+        self.good_strings: Dict[str, Set[bytes]] = {}
+        # Inline strings are compared as the escaped bytes found in the XML
+        self.good_text: Dict[str, Set[bytes]] = {}
+        for column, header in self.columns.items():
+            if header != "Date":
+                self.good_strings[column] = {str(i).encode() for i, s in enumerate(strings)
+                                             if self.accepts(header, s)}
+                self.good_text[column] = {escape(option).encode("utf-8")
+                                          for option in self.lists.get(header, ())}
+
+    def accepts(self, header: str, value, number: bool = False) -> bool:
+        """Whether a cell value is allowed; `number` marks the text of a numeric cell."""
+        if header in DURATION_HEADERS:
+            return is_time_value(value) if number else isinstance(value, str) and bool(DURATION.match(value))
+        return not number and value in self.allowed[header]
+
+
+def is_time_value(text: str) -> bool:
+    """Whether a numeric cell holds a duration under a day, which is how Excel stores a typed "2:00".
+
+    The number is a fraction of a day, as task_model.duration_minutes reads it.
+    """
+    try:
+        return 0 <= float(text) < 1
+    except ValueError:
+        return False
+
+
+def _column_cells(xml: bytes, column: str) -> List[Tuple[bytes, bytes, bytes, bytes]]:
+    """(row, attributes, <v> text, inline text) for every non-empty cell of a column."""
+    pattern = re.compile(rb'<c r="' + column.encode() + rb'(\d+)"([^>]*)>(?:<f[^>]*/>|<f[^>]*>[^<]*</f>)?'
+                         rb'(?:<v>([^<]*)</v>|<is><t[^>]*>([^<]*)</t></is>)')
+    return pattern.findall(xml)
+
+
+def _cell_value(attrs: bytes, v: bytes, t: bytes, strings: List[str]) -> Tuple[str, object]:
+    """("s", text), ("str", text) or ("n", number text) for a matched cell."""
+    if b't="s"' in attrs:
+        return "s", strings[int(v)]
+    if b't="inlineStr"' in attrs:
+        return "str", t.decode("utf-8")
+    if b't="str"' in attrs:
+        return "str", v.decode("utf-8")
+    return "n", v.decode()
+
+
+def read_headers(xml: bytes, strings: List[str]) -> Dict[str, str]:
+    """Column letter to header text, from row 1."""
+    match = FIRST_ROW.search(xml)
+    headers = {}
+    if match and b'r="1"' in xml[match.start():match.start() + 40]:
+        for column, attrs, inner in HEADER_CELL.findall(match.group(1)):
+            value = VALUE.search(inner or b"")
+            if value is None:
+                continue
+            text = _cell_value(attrs, value.group(1) or b"", value.group(2) or b"", strings)[1]
+            headers[column.decode()] = str(text).strip()
+    return headers
+
+
+def check_sheet(xml: bytes, strings: List[str]) -> Iterator[Tuple[str, str, str, str]]:
+    """Yield (cell, column header, problem, value) for every violation in one sheet."""
+    headers = read_headers(xml, strings)
+    if "Date" not in headers.values():
+        return
+    check = SheetCheck(headers, strings)
+    if len(check.columns) < 2:
+        return
+
+    columns = {column: _column_cells(xml, column) for column in check.columns}
+    column = check.date_column
+    # t="s", t="str" and t="inlineStr" are text; numbers have no type or t="n"
+    text = [c for c in columns[column] if c[0] != b"1" and (b't="s' in c[1] or b't="i' in c[1])]
+    not_dates = []
+    if text:
+        rows_with_values = {row for other, others in columns.items() if other != column
+                            for row, _, _, _ in others}
+        for row, attrs, v, t in text:
+            if row not in rows_with_values:
+                # Text alone in the Date column is a section title such as "Monthly Dashboard":
+                # the task rows end there and the dashboards below are not checked
+                end = int(row)
+                columns = {c: cells[:bisect_left(cells, end, key=lambda cell: int(cell[0]))]
+                           for c, cells in columns.items()}
+                break
+            not_dates.append((row, attrs, v, t))
+
+    for other, header in check.columns.items():
+        if other == column:
+            continue
+        cells = columns[other]
+        good, accepted = check.good_strings[other], check.good_text[other]
+        problem = "not H:MM" if header in DURATION_HEADERS else "not in the configured list"
+        # Accepted strings are the common case and are filtered out here; only the rest is looked at
+        if header in DURATION_HEADERS:
+            suspects = [c for c in cells if not (c[2] in good and b't="s"' in c[1])
+                        and not (c[3] and DURATION_BYTES.match(c[3]))]
+        else:
+            suspects = [c for c in cells if not (c[2] in good and b't="s"' in c[1]) and c[3] not in accepted]
+        for row, attrs, v, t in suspects:
+            if row == b"1":
+                continue
+            kind, value = _cell_value(attrs, v, t, strings)
+            if not check.accepts(header, value, number=kind == "n"):
+                yield f"{other}{row.decode()}", header, problem, value
+
+    for row, attrs, v, t in not_dates:
+        yield f"{column}{row.decode()}", "Date", "not a date", _cell_value(attrs, v, t, strings)[1]
+    dates = [(row, float(v)) for row, attrs, v, t in columns[column]
+             if v and not (b't="s' in attrs or b't="i' in attrs)]
+    for (_, before), (row, serial) in zip(dates, dates[1:]):
+        if serial < before:
+            yield f"{column}{row.decode()}", "Date", "date goes backwards", f"{serial:g}"
+
+
+def validate(path: str, sheets: Optional[List[str]] = None) -> Iterator[Tuple[str, str, str, str, str]]:
+    """Yield (sheet, cell, column, problem, value) for every violation in the workbook."""
+    with zipfile.ZipFile(path) as zf:
+        strings = shared_strings(zf)
+        for name, member in sheet_members(zf).items():
+            if sheets and name not in sheets:
+                continue
+            for violation in check_sheet(zf.read(member), strings):
+                yield (name,) + violation
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate the enum, date and duration columns of a workbook.")
+    parser.add_argument("path")
+    parser.add_argument("--sheet", action="append", help="only check this sheet (repeatable)")
+    parser.add_argument("--limit", type=int, default=5,
+                        help="cells listed per kind of violation (0 lists them all)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    groups: Dict[Tuple[str, str, str], List[str]] = defaultdict(list)
+    for sheet, cell, column, problem, value in validate(args.path, args.sheet):
+        groups[(column, problem, value)].append(f"{sheet}!{cell}")
+    elapsed = time.perf_counter() - start
+
+    total = sum(len(cells) for cells in groups.values())
+    for (column, problem, value), cells in sorted(groups.items(), key=lambda g: -len(g[1])):
+        shown = cells if not args.limit else cells[:args.limit]
+        more = f" and {len(cells) - len(shown)} more" if len(cells) > len(shown) else ""
+        print(f"{column} {value!r}: {problem}, {len(cells)} cells: {', '.join(shown)}{more}")
+    print(f"{total} violations in {args.path} ({elapsed:.2f}s)")
+    sys.exit(1 if total else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""Refresh the dashboard of a task workbook whenever it is saved.
+
+The workbook is polled with os.stat. A change is only acted on once the
+file has stopped changing for the debounce period and opens as a complete
+zip, so a save still in progress is never read. The CRC of every zip
+member is compared with the last refresh, and only month sheets whose
+XML changed are read again.
+
+The dashboard sheet is then patched in place, without an openpyxl
+load/save round trip, which would drop the workbook's charts. Only that
+sheet's XML member is rewritten: the KPI values next to their labels, and
+a Month / Tasks / Completed / Completion table in columns D:G.
+"""
+import argparse
+import calendar
+import os
+import posixpath
+import re
+import tempfile
+import time
+import zipfile
+from typing import Dict, List, Optional, Tuple
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+from openpyxl import load_workbook
+from openpyxl.utils import column_index_from_string, get_column_letter
+
+from task_model import HEADERS, TaskTable, read_rows
+
+DASHBOARD_SHEETS = ("Yearly Dashboard",)
+
+# Dashboard labels, as written by Progress Checker and EnhancedTaskManager
+KPI_LABELS = {
+    "Overall Completion Rate": "completion",
+    "Overall Task Completion Rate": "completion",
+    "Core Learning Progress": "core_learning",
+    "Personal Development Score": "personal_development",
+    "Time Utilization": "time_utilization",
+    "Time Utilization Efficiency": "time_utilization",
+    "Consistency Score": "consistency",
+}
+
+# Top-left cell of the monthly summary table on the dashboard
+SUMMARY_COLUMN = "D"
+SUMMARY_HEADERS = ["Month", "Tasks", "Completed", "Completion"]
+
+MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+ROW = re.compile(r'<row\b[^>]*?\br="(\d+)"[^>]*?(?:/>|>.*?</row>)', re.S)
+CELL = re.compile(r'<c\b[^>]*?\br="([A-Z]+)(\d+)"[^>]*?(?:/>|>.*?</c>)', re.S)
+
+
+def member_crcs(path: str) -> Dict[str, int]:
+    with zipfile.ZipFile(path) as zf:
+        return {info.filename: info.CRC for info in zf.infolist()}
+
+
+def sheet_members(zf: zipfile.ZipFile) -> Dict[str, str]:
+    """Sheet name to the zip member holding its XML."""
+    rels = ElementTree.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    targets = {}
+    for rel in rels.iter(f"{PKG_REL_NS}Relationship"):
+        target = rel.get("Target")
+        targets[rel.get("Id")] = (target.lstrip("/") if target.startswith("/")
+                                  else posixpath.normpath(posixpath.join("xl", target)))
+    workbook = ElementTree.fromstring(zf.read("xl/workbook.xml"))
+    return {sheet.get("name"): targets[sheet.get(f"{REL_NS}id")]
+            for sheet in workbook.iter(f"{MAIN_NS}sheet")}
+
+
+class Percent(float):
+    """A fraction shown as a percentage.
+
+    Written as a number over numeric cells, so their '0%' format and the
+    charts reading them keep working; new cells and cells holding text get
+    "45%" text, as they have no percent format to show the number with.
+    """
+
+
+def _cell_xml(ref: str, value, style: Optional[str], text: bool = False) -> str:
+    style = f' s="{style}"' if style else ""
+    if isinstance(value, Percent) and text:
+        value = f"{value:.0%}"
+    if isinstance(value, (int, float)):
+        return f'<c r="{ref}"{style}><v>{value}</v></c>'
+    return f'<c r="{ref}"{style} t="inlineStr"><is><t>{escape(str(value))}</t></is></c>'
+
+
+def set_cells(xml: str, values: Dict[str, object]) -> str:
+    """Set cell values in a worksheet's XML, keeping each existing cell's style."""
+    by_row: Dict[int, Dict[str, object]] = {}
+    for ref, value in values.items():
+        column, row = re.match(r"([A-Z]+)(\d+)$", ref).groups()
+        by_row.setdefault(int(row), {})[column] = value
+
+    def patch_row(number: int, row_xml: Optional[str]) -> str:
+        cells = {}
+        open_tag = f'<row r="{number}">'
+        if row_xml is not None:
+            open_tag = re.match(r"<row\b[^>]*?(?=/?>)", row_xml).group(0)
+            open_tag = re.sub(r'\sspans="[^"]*"', "", open_tag) + ">"
+            for match in CELL.finditer(row_xml):
+                cells[column_index_from_string(match.group(1))] = match.group(0)
+        for column, value in by_row[number].items():
+            index = column_index_from_string(column)
+            old = cells.get(index)
+            head = old.split(">", 1)[0] if old else ""
+            style = re.search(r'\ss="(\d+)"', head)
+            text = not old or re.search(r'\st="(s|str|inlineStr)"', head) is not None
+            cells[index] = _cell_xml(f"{column}{number}", value, style and style.group(1), text)
+        return open_tag + "".join(cells[i] for i in sorted(cells)) + "</row>"
+
+    if "<sheetData/>" in xml:
+        xml = xml.replace("<sheetData/>", "<sheetData></sheetData>")
+    start = xml.index("<sheetData>") + len("<sheetData>")
+    end = xml.index("</sheetData>")
+    rows = {int(match.group(1)): match.group(0) for match in ROW.finditer(xml, start, end)}
+    for number in by_row:
+        rows[number] = patch_row(number, rows.get(number))
+    xml = xml[:start] + "".join(rows[n] for n in sorted(rows)) + xml[end:]
+
+    # Keep the dimension covering every cell, as readers size sheets from it
+    refs = [(int(m.group(2)), column_index_from_string(m.group(1))) for m in CELL.finditer(xml)]
+    if refs:
+        dimension = f"A1:{get_column_letter(max(c for _, c in refs))}{max(r for r, _ in refs)}"
+        xml = re.sub(r'<dimension ref="[^"]*"/>', f'<dimension ref="{dimension}"/>', xml, count=1)
+    return xml
+
+
+def replace_member(path: str, member: str, data: bytes):
+    """Rewrite one zip member, copying the rest, and swap the file in atomically."""
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, temp = tempfile.mkstemp(suffix=".xlsx", dir=folder)
+    try:
+        with os.fdopen(fd, "wb") as f, zipfile.ZipFile(path) as zin, \
+                zipfile.ZipFile(f, "w", zipfile.ZIP_DEFLATED) as zout:
+            for info in zin.infolist():
+                zout.writestr(info, data if info.filename == member else zin.read(info.filename))
+        os.replace(temp, path)
+    except BaseException:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+
+
+class WorkbookWatcher:
+    """Keeps the month tables and dashboard of one workbook up to date."""
+
+    def __init__(self, path: str, debounce: float = 1.0, interval: float = 0.25):
+        self.path = path
+        self.debounce = debounce
+        self.interval = interval
+        self.tables: Dict[str, TaskTable] = {}
+        self.crcs: Dict[str, int] = {}
+        self.stat: Optional[Tuple[int, int]] = None
+        self.latencies: List[float] = []
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def wait_until_settled(self) -> Optional[Tuple[int, int]]:
+        """Wait for the file to stop changing and open as a complete zip."""
+        stat = self._stat()
+        settled_since = time.monotonic()
+        while True:
+            time.sleep(self.interval)
+            current = self._stat()
+            if current != stat:
+                stat, settled_since = current, time.monotonic()
+                continue
+            if stat is not None and time.monotonic() - settled_since >= self.debounce:
+                try:
+                    with zipfile.ZipFile(self.path) as zf:
+                        zf.infolist()
+                    return stat
+                except (zipfile.BadZipFile, OSError):
+                    settled_since = time.monotonic()
+
+    def refresh(self) -> List[str]:
+        """Re-read changed month sheets and patch the dashboard; returns the sheets read."""
+        crcs = member_crcs(self.path)
+        with zipfile.ZipFile(self.path) as zf:
+            members = sheet_members(zf)
+        months = [name for name in calendar.month_name[1:] if name in members]
+        changed = [name for name in months
+                   if name not in self.tables or crcs.get(members[name]) != self.crcs.get(members[name])]
+        if changed:
+            wb = load_workbook(self.path, read_only=True, data_only=True)
+            try:
+                for name in changed:
+                    rows = wb[name].iter_rows(min_row=2, max_col=len(HEADERS), values_only=True)
+                    self.tables[name] = read_rows(rows)
+                dashboard = next((name for name in DASHBOARD_SHEETS if name in members), None)
+                labels = {}
+                if dashboard:
+                    for number, row in enumerate(wb[dashboard].iter_rows(max_col=1, values_only=True), 1):
+                        if row and row[0] in KPI_LABELS:
+                            labels[number] = KPI_LABELS[row[0]]
+            finally:
+                wb.close()
+            if dashboard:
+                self.update_dashboard(members[dashboard], labels, months)
+        self.crcs = member_crcs(self.path)
+        self.stat = self._stat()
+        return changed
+
+    def dashboard_values(self, labels: Dict[int, str], months: List[str]) -> Dict[str, object]:
+        year = TaskTable()
+        for name in months:
+            year.extend(self.tables[name])
+        kpis = year.kpis()
+        values = {f"B{row}": Percent(kpis[key]) for row, key in labels.items()}
+
+        first = column_index_from_string(SUMMARY_COLUMN)
+        columns = [get_column_letter(first + i) for i in range(len(SUMMARY_HEADERS))]
+        for column, header in zip(columns, SUMMARY_HEADERS):
+            values[f"{column}1"] = header
+        for row, name in enumerate(months, 2):
+            table = self.tables[name]
+            stats = table.kpis()
+            completed = round(stats["completion"] * len(table))
+            for column, value in zip(columns, (name, len(table), completed, Percent(stats["completion"]))):
+                values[f"{column}{row}"] = value
+        return values
+
+    def update_dashboard(self, member: str, labels: Dict[int, str], months: List[str]):
+        with zipfile.ZipFile(self.path) as zf:
+            xml = zf.read(member).decode("utf-8")
+        patched = set_cells(xml, self.dashboard_values(labels, months))
+        if patched != xml:
+            replace_member(self.path, member, patched.encode("utf-8"))
+
+    def watch(self, once: bool = False):
+        print(f"Refreshed {len(self.refresh())} month sheets of {self.path}")
+        if once:
+            return
+        print(f"Watching for saves (debounce {self.debounce}s); Ctrl+C to stop")
+        try:
+            while True:
+                time.sleep(self.interval)
+                if self._stat() == self.stat:
+                    continue
+                stat = self.wait_until_settled()
+                started = time.perf_counter()
+                try:
+                    changed = self.refresh()
+                except PermissionError:
+                    print("Workbook is locked by another program; will retry on the next save")
+                    self.stat = stat
+                    continue
+                done = time.time()
+                latency = done - stat[0] / 1e9
+                self.latencies.append(latency)
+                print(f"{time.strftime('%H:%M:%S')} refreshed {', '.join(changed) or 'no month sheets'} "
+                      f"in {time.perf_counter() - started:.3f}s, {latency:.3f}s after the save")
+        except KeyboardInterrupt:
+            if self.latencies:
+                ordered = sorted(self.latencies)
+                print(f"{len(ordered)} refreshes, median latency {ordered[len(ordered) // 2]:.3f}s, "
+                      f"max {ordered[-1]:.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh a task workbook's dashboard when it is saved.")
+    parser.add_argument("path", nargs="?", default="TaskManager2025.xlsx")
+    parser.add_argument("--debounce", type=float, default=1.0,
+                        help="seconds the file must stay unchanged before it is read")
+    parser.add_argument("--interval", type=float, default=0.25, help="polling interval in seconds")
+    parser.add_argument("--once", action="store_true", help="refresh once and exit")
+    args = parser.parse_args()
+
+    WorkbookWatcher(args.path, args.debounce, args.interval).watch(args.once)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+"""Output backends for the task workbook generators.
+
+Every backend writes the same plain month sheets (header row, task rows,
+column widths and dropdown validations where the format has them):
+
+    openpyxl    regular openpyxl Workbook, as the generators build
+    xlsxwriter  xlsxwriter in constant_memory mode, one row in memory at a time
+    csv         one CSV table with the sheet name as its first column
+    parquet     one Parquet file, one row group per sheet (needs pyarrow)
+
+A target is a path, a binary file object such as io.BytesIO, or "-" for
+stdout; stdout output is built in memory and never touches disk.
+"""
+import argparse
+import csv
+import io
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Font, PatternFill
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.datavalidation import DataValidation
+
+from task_model import (BLOCKS, CATEGORIES, DESCRIPTIONS, PRIORITIES, PROGRESS, STATUSES,
+                        TaskTable)
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+try:
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+HEADER_COLOR = "1F4E78"
+
+# openpyxl's format for datetime cells, used when a sheet does not set one
+DEFAULT_DATE_FORMAT = "yyyy-mm-dd h:mm:ss"
+
+# Rows covered by the dropdown validations, as in the generators
+VALIDATION_ROWS = 1000
+
+
+@dataclass
+class Sheet:
+    """A month sheet as a plain table.
+
+    `rows` is consumed once, in order, so it can be a generator. Sheets
+    built from a TaskTable keep it in `tasks` for backends that can write
+    its columns directly.
+    """
+    title: str
+    headers: List[str]
+    rows: Iterable[Sequence] = ()
+    widths: List[float] = field(default_factory=list)
+    validations: Dict[str, List[str]] = field(default_factory=dict)
+    date_format: str = DEFAULT_DATE_FORMAT
+    tasks: Optional[TaskTable] = None
+
+    @classmethod
+    def from_tasks(cls, title: str, headers: List[str], tasks: TaskTable, **options) -> "Sheet":
+        return cls(title, headers, tasks.rows(), tasks=tasks, **options)
+
+
+@contextmanager
+def output(target):
+    """A binary file object for a path, a file object, or "-" for stdout."""
+    if target == "-":
+        buffer = io.BytesIO()
+        yield buffer
+        sys.stdout.buffer.write(buffer.getvalue())
+        sys.stdout.buffer.flush()
+    elif isinstance(target, (str, os.PathLike)):
+        with open(target, "wb") as f:
+            yield f
+    else:
+        yield target
+
+
+def is_path(target) -> bool:
+    """Whether a target names a file on disk, rather than "-" or a file object."""
+    return target != "-" and isinstance(target, (str, os.PathLike))
+
+
+def with_extension(target, extension: str):
+    """Swap a path's .xlsx extension for the backend's; other targets pass through."""
+    if isinstance(target, str) and target.endswith(".xlsx"):
+        return target[:-len(".xlsx")] + extension
+    return target
+
+
+def _cell_text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.date().isoformat() if value == datetime(value.year, value.month, value.day) \
+            else value.isoformat(sep=" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+class OpenpyxlWriter:
+    name = "openpyxl"
+    extension = ".xlsx"
+
+    def write(self, sheets: Iterable[Sheet], target):
+        wb = Workbook()
+        wb.remove(wb.active)
+        header_font = Font(bold=True, color="FFFFFF")
+        header_fill = PatternFill(start_color=HEADER_COLOR, end_color=HEADER_COLOR, fill_type="solid")
+        for sheet in sheets:
+            ws = wb.create_sheet(sheet.title)
+            for col, header in enumerate(sheet.headers, 1):
+                cell = ws.cell(row=1, column=col, value=header)
+                cell.font = header_font
+                cell.fill = header_fill
+                cell.alignment = Alignment(horizontal="center")
+            for col, width in enumerate(sheet.widths, 1):
+                ws.column_dimensions[get_column_letter(col)].width = width
+            for column, options in sheet.validations.items():
+                dv = DataValidation(type="list", formula1=f'"{",".join(options)}"', allow_blank=True)
+                ws.add_data_validation(dv)
+                dv.add(f"{column}2:{column}{VALIDATION_ROWS}")
+            for r, row in enumerate(sheet.rows, 2):
+                for c, value in enumerate(row, 1):
+                    if value is not None:
+                        cell = ws.cell(row=r, column=c, value=value)
+                        if isinstance(value, (datetime, date)):
+                            cell.number_format = sheet.date_format
+        with output(target) as f:
+            wb.save(f)
+
+
+class XlsxWriterWriter:
+    name = "xlsxwriter"
+    extension = ".xlsx"
+
+    def __init__(self, constant_memory: bool = True):
+        self.constant_memory = constant_memory
+
+    def write(self, sheets: Iterable[Sheet], target):
+        if xlsxwriter is None:
+            raise RuntimeError("xlsxwriter output needs xlsxwriter: pip install xlsxwriter")
+        with output(target) as f:
+            wb = xlsxwriter.Workbook(f, {"constant_memory": self.constant_memory})
+            header = wb.add_format({"bold": True, "font_color": "#FFFFFF",
+                                    "bg_color": f"#{HEADER_COLOR}", "align": "center"})
+            date_formats = {}
+            for sheet in sheets:
+                ws = wb.add_worksheet(sheet.title)
+                for col, width in enumerate(sheet.widths):
+                    ws.set_column(col, col, width)
+                ws.write_row(0, 0, sheet.headers, header)
+                if sheet.date_format not in date_formats:
+                    date_formats[sheet.date_format] = wb.add_format({"num_format": sheet.date_format})
+                date_format = date_formats[sheet.date_format]
+                for r, row in enumerate(sheet.rows, 1):
+                    for c, value in enumerate(row):
+                        if value is None:
+                            continue
+                        if isinstance(value, (datetime, date)):
+                            ws.write_datetime(r, c, value, date_format)
+                        else:
+                            ws.write(r, c, value)
+                for column, options in sheet.validations.items():
+                    ws.data_validation(f"{column}2:{column}{VALIDATION_ROWS}",
+                                       {"validate": "list", "source": options})
+            wb.close()
+
+
+class CsvWriter:
+    name = "csv"
+    extension = ".csv"
+
+    def write(self, sheets: Iterable[Sheet], target):
+        with output(target) as f:
+            text = io.TextIOWrapper(f, encoding="utf-8", newline="")
+            writer = csv.writer(text)
+            headers = None
+            for sheet in sheets:
+                if headers is None:
+                    headers = sheet.headers
+                    writer.writerow(["Sheet"] + headers)
+                elif sheet.headers != headers:
+                    raise ValueError(f"Sheet {sheet.title!r} has different headers; "
+                                     "CSV output needs one layout")
+                for row in sheet.rows:
+                    writer.writerow([sheet.title] + [_cell_text(value) for value in row])
+            text.flush()
+            text.detach()
+
+
+class ParquetWriter:
+    """Task sheets become typed columns: dates as date32, durations as
+    minutes, and the coded columns as dictionary-encoded strings. Other
+    sheets are converted column by column.
+    """
+    name = "parquet"
+    extension = ".parquet"
+
+    def write(self, sheets: Iterable[Sheet], target):
+        if pa is None:
+            raise RuntimeError("Parquet output needs pyarrow: pip install pyarrow")
+        sheets = iter(sheets)
+        with output(target) as f:
+            writer = None
+            generic: List[Sheet] = []
+            for sheet in sheets:
+                if sheet.tasks is None:
+                    generic.append(sheet)
+                    continue
+                table = self._task_table(sheet)
+                if writer is None:
+                    writer = pq.ParquetWriter(f, table.schema)
+                writer.write_table(table)
+            if generic:
+                if writer is not None:
+                    raise ValueError("Parquet output needs one layout for every sheet")
+                table = self._generic_table(generic)
+                writer = pq.ParquetWriter(f, table.schema)
+                writer.write_table(table)
+            if writer is not None:
+                writer.close()
+
+    @staticmethod
+    def _coded(codes, table) -> "pa.DictionaryArray":
+        codes = np.frombuffer(codes, dtype=codes.typecode).astype(np.int32)
+        indices = pa.array(codes - 1, mask=codes == 0)
+        return pa.DictionaryArray.from_arrays(indices, pa.array(table.values[1:], pa.string()))
+
+    def _task_table(self, sheet: Sheet) -> "pa.Table":
+        tasks = sheet.tasks
+        rows = len(tasks)
+        epoch = date(1970, 1, 1).toordinal()
+        days = np.frombuffer(tasks.day, dtype=np.int32) - epoch
+        notes = [tasks.notes.get(i) for i in range(rows)] if tasks.notes else [None] * rows
+        return pa.table({
+            "Sheet": pa.DictionaryArray.from_arrays(pa.array(np.zeros(rows, np.int32)),
+                                                    pa.array([sheet.title])),
+            "Date": pa.array(days).cast(pa.date32()),
+            "Time Block": self._coded(tasks.block, BLOCKS),
+            "Duration (min)": pa.array(np.frombuffer(tasks.minutes, dtype=np.uint16)),
+            "Task Description": self._coded(tasks.description, DESCRIPTIONS),
+            "Category": self._coded(tasks.category, CATEGORIES),
+            "Status": self._coded(tasks.status, STATUSES),
+            "Progress": self._coded(tasks.progress, PROGRESS),
+            "Priority": self._coded(tasks.priority, PRIORITIES),
+            "Notes": pa.array(notes, pa.string()),
+        })
+
+    @staticmethod
+    def _generic_table(sheets: List[Sheet]) -> "pa.Table":
+        headers = sheets[0].headers
+        columns: List[List] = [[] for _ in headers]
+        titles = []
+        for sheet in sheets:
+            if sheet.headers != headers:
+                raise ValueError(f"Sheet {sheet.title!r} has different headers; "
+                                 "Parquet output needs one layout")
+            for row in sheet.rows:
+                titles.append(sheet.title)
+                for column, value in zip(columns, row):
+                    column.append(value)
+                for column in columns[len(row):]:
+                    column.append(None)
+        arrays = {"Sheet": pa.array(titles).dictionary_encode()}
+        for header, values in zip(headers, columns):
+            try:
+                arrays[header] = pa.array(values)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                arrays[header] = pa.array([None if v is None else _cell_text(v) for v in values])
+        return pa.table(arrays)
+
+
+WRITERS: Dict[str, Callable] = {
+    "openpyxl": OpenpyxlWriter,
+    "xlsxwriter": XlsxWriterWriter,
+    "csv": CsvWriter,
+    "parquet": ParquetWriter,
+}
+
+
+def get_writer(writer):
+    """A backend instance from its name; backend instances are returned as they are."""
+    if isinstance(writer, str):
+        try:
+            return WRITERS[writer]()
+        except KeyError:
+            raise ValueError(f"Unknown writer {writer!r}; choose from {', '.join(WRITERS)}")
+    return writer
+
+
+def load_source(name: str):
+    """The sheets() callable and full openpyxl build for one of the generators."""
+    if name == "progress":
+        from benchmark_generators import load_progress_checker
+        manager = load_progress_checker().TaskManagerExcel()
+        manager.plan_year()
+        return manager.sheets, lambda target: manager.create_workbook().save(target)
+    if name == "enhanced":
+        from enhanced_routine_checker import EnhancedTaskManager
+        manager = EnhancedTaskManager()
+        manager.plan_year()
+        return manager.sheets, lambda target: manager.create_workbook().save(target)
+    import routinerefined
+    return routinerefined.task_sheets, routinerefined.create_task_workbook
+
+
+def benchmark(name: str, repeat: int):
+    """Write the same plan with every backend into memory and compare them."""
+    sheets, full = load_source(name)
+    runs = [(writer, lambda target, w=writer: get_writer(w).write(sheets(), target))
+            for writer in WRITERS]
+    runs.append(("openpyxl (full generator)", full))
+
+    print(f"{'writer':<28}{'time':>9}{'peak MB':>10}{'size KB':>10}")
+    for label, run in runs:
+        try:
+            best = float("inf")
+            for _ in range(repeat):
+                target = io.BytesIO()
+                start = time.perf_counter()
+                run(target)
+                best = min(best, time.perf_counter() - start)
+            tracemalloc.start()
+            run(io.BytesIO())
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        except Exception as e:
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            print(f"{label:<28}failed: {type(e).__name__}: {e}")
+            continue
+        print(f"{label:<28}{best:>8.3f}s{peak / 2**20:>10.1f}{len(target.getvalue()) / 1024:>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a generator's month sheets with any backend.")
+    parser.add_argument("source", choices=["progress", "enhanced", "refined"])
+    parser.add_argument("--writer", choices=list(WRITERS), default="xlsxwriter")
+    parser.add_argument("--output", default="-", help='output path, or "-" for stdout (default)')
+    parser.add_argument("--bench", action="store_true", help="compare every backend in memory")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.bench:
+        benchmark(args.source, args.repeat)
+        return
+    sheets, _ = load_source(args.source)
+    get_writer(args.writer).write(sheets(), args.output)
+
+
+if __name__ == "__main__":
+    main()